@@ -22,6 +22,7 @@ from __future__ import annotations
 import copy
 import collections.abc
 import functools
+import keyword
 import re
 import sys
 from typing import *
@@ -53,6 +54,22 @@ class Field:
 
 class MetaAST(type):
     def __new__(mcls, name, bases, dct):
+        # Field defaults are class attributes in the class body,
+        # which cannot coexist with the slots of the same name.
+        defaults = {}
+        for f_name in dct.get('__annotations__', ()):
+            if f_name in dct:
+                defaults[f_name] = dct.pop(f_name)
+
+        ast_base = globals().get('AST')
+        if ast_base is not None and any(
+            issubclass(base, ast_base) for base in bases
+        ):
+            dct['__slots__'] = (
+                tuple(dct.get('__slots__', ()))
+                + mcls._get_field_slots(name, bases, dct)
+            )
+
         cls = super().__new__(mcls, name, bases, dct)
 
         cls.__abstract_node__ = bool(dct.get('__abstract_node__'))
@@ -116,11 +133,7 @@ class MetaAST(type):
                 if f_type is object:
                     f_type = None
 
-                if f_name in dct:
-                    f_default = dct[f_name]
-                    delattr(cls, f_name)
-                else:
-                    f_default = None
+                f_default = defaults.get(f_name)
 
                 f_default = _check_annotation(f_type, f_fullname, f_default)
 
@@ -177,10 +190,150 @@ class MetaAST(type):
 
         cls._fields = fields
 
+        ast_base = globals().get('AST')
+        if ast_base is not None and issubclass(cls, ast_base):
+            cls.__ast_init__ = _make_init(cls)
+            cls._install_init()
+
+    def _install_init(cls):
+        mro = cls.__mro__[:cls.__mro__.index(AST)]
+        if not any(_has_custom_init(c) for c in mro):
+            cls.__init__ = cls.__ast_init__
+            return
+
+        # A custom __init__ eventually calls super().__init__(),
+        # which must not stop at the initializer generated for
+        # some base class, so those are replaced with ones that
+        # only initialize instances of their own class and defer
+        # to the next class in the MRO otherwise.  AST.__init__()
+        # then initializes all fields of the actual class.
+        for c in mro:
+            init = c.__dict__.get('__init__')
+            if init is not None and init is c.__dict__.get('__ast_init__'):
+                c.__init__ = _make_forwarding_init(c)
+
+    @staticmethod
+    def _get_field_slots(name, bases, dct):
+        """Return the slots for the fields of a new AST class.
+
+        Abstract nodes and mixins have no slots of their own, as
+        several such bases with slots cannot be combined.  Their fields
+        get slots in the first concrete class that inherits them.
+        """
+        if dct.get('__abstract_node__'):
+            return ()
+
+        fields = []
+        for base in bases:
+            fields.extend(getattr(base, '_fields', ()))
+
+        annotations = dct.get('__annotations__', {})
+        fields.extend(annotations)
+        for field in dct.get(f'_{name}__fields', ()):
+            fields.append(field[0] if isinstance(field, tuple) else field)
+
+        # Skip fields that already have a slot in a base class, as
+        # well as fields overridden by properties and the like.
+        taken = set(dct)
+        for base in bases:
+            for c in base.__mro__:
+                taken.update(c.__dict__)
+
+        return tuple(
+            f for f in dict.fromkeys(fields) if f not in taken)
+
     def get_field(cls, name):
         return cls._fields.get(name)
 
 
+_MISSING = object()
+
+
+def _has_custom_init(cls):
+    init = cls.__dict__.get('__init__')
+    return (
+        init is not None
+        and init is not cls.__dict__.get('__ast_init__')
+        and not getattr(init, '_ast_forwarding', False)
+        and cls is not ImmutableASTMixin
+    )
+
+
+def _make_forwarding_init(cls):
+    ast_init = cls.__ast_init__
+
+    def __init__(self, **kwargs):
+        if type(self) is cls:
+            ast_init(self, **kwargs)
+        else:
+            super(cls, self).__init__(**kwargs)
+
+    __init__._ast_forwarding = True
+    __init__.__qualname__ = f'{cls.__qualname__}.__init__'
+    return __init__
+
+
+def _make_init(cls):
+    """Generate the field initializer of an AST class.
+
+    The generated function takes the fields as keyword-only
+    arguments and only calls the default factories of fields
+    that were not passed, which is a lot faster than the generic
+    loop over the fields in AST._init_generic().
+    """
+    if cls.__abstract_node__:
+        def __init__(self, **kwargs):
+            raise ASTError(
+                f'cannot instantiate abstract AST node '
+                f'{self.__class__.__name__!r}')
+        return __init__
+
+    if (
+        (__debug__ and _check_type is _check_type_real)
+        or any(
+            keyword.iskeyword(f_name) or f_name in ('self', '_')
+            for f_name in cls._fields
+        )
+    ):
+        return AST._init_generic
+
+    args = []
+    body = ['_setattr(self, "_frozen_tree", False)']
+    ns = {'_setattr': object.__setattr__, '_MISSING': _MISSING}
+
+    for i, (f_name, field) in enumerate(cls._fields.items()):
+        if isinstance(getattr(cls, f_name, None), property):
+            # Field overriden as a property in a subclass.
+            continue
+
+        default = field.default
+        if default is None:
+            args.append(f'{f_name}=None')
+        elif callable(default):
+            args.append(f'{f_name}=_MISSING')
+            ns[f'_default_{i}'] = default
+            body.append(
+                f'if {f_name} is _MISSING: {f_name} = _default_{i}()')
+        else:
+            args.append(f'{f_name}=_default_{i}')
+            ns[f'_default_{i}'] = default
+
+        body.append(f'_setattr(self, {f_name!r}, {f_name})')
+
+    # See ImmutableASTMixin.
+    frozen = issubclass(cls, ImmutableASTMixin)
+    body.append(f'_setattr(self, "_frozen", {frozen})')
+
+    # Like AST._init_generic(), ignore unknown keyword arguments.
+    params = ', '.join(
+        ['self', '*', *args, '**_'] if args else ['self', '**_'])
+    src = f'def __init__({params}):\n    ' + '\n    '.join(body)
+    exec(src, ns)
+    init = ns['__init__']
+    init.__qualname__ = f'{cls.__qualname__}.__init__'
+    return init
+
+
 def _check_type_passthrough(type_, value, raise_error):
     pass
 
@@ -237,12 +390,21 @@ class AST(object, metaclass=MetaAST):
     # by the AST system and so annotating them would interfere!
     __fields = []  # type: List[str]
     __ast_frozen_fields__ = frozenset()  # type: AbstractSet[str]
+    __ast_mutable_fields__ = frozenset()  # type: AbstractSet[str]
+
+    __slots__ = (
+        # Set on nodes that must not be modified, either by
+        # ImmutableASTMixin or by freeze().
+        '_frozen',
+        # Set by freeze() on all nodes of a frozen tree.
+        '_frozen_tree',
+    )
 
     def __init__(self, **kwargs):
-        if type(self).__abstract_node__:
-            raise ASTError(
-                f'cannot instantiate abstract AST node '
-                f'{self.__class__.__name__!r}')
+        type(self).__ast_init__(self, **kwargs)
+
+    def _init_generic(self, **kwargs):
+        object.__setattr__(self, '_frozen_tree', False)
 
         should_check_types = __debug__ and _check_type is _check_type_real
         for field_name, field in self.__class__._fields.items():
@@ -266,19 +428,44 @@ class AST(object, metaclass=MetaAST):
                 # Field overriden as a property in a subclass.
                 pass
 
+        object.__setattr__(
+            self, '_frozen', isinstance(self, ImmutableASTMixin))
+
+    __ast_init__ = _init_generic
+
+    def __setstate__(self, state):
+        # Pickled state of slotted objects is a (dict, slots) pair.
+        # The frozen flags may be restored after other fields, so
+        # bypass the overloaded setattr.
+        for part in (state if isinstance(state, tuple) else (state,)):
+            for name, value in (part or {}).items():
+                object.__setattr__(self, name, value)
+
     def __copy__(self):
         copied = self.__class__()
         for field, value in iter_fields(self, include_meta=False):
-            setattr(copied, field, value)
+            if self._frozen_tree:
+                # The copy is mutable, so it must not share
+                # containers with the frozen original.
+                value = _copy_container(value)
+            object.__setattr__(copied, field, value)
         return copied
 
     def __deepcopy__(self, memo):
+        if self._frozen_tree:
+            # Frozen trees are never modified, so it is safe
+            # to share them instead of copying.
+            return self
         copied = self.__class__()
         for field, value in iter_fields(self, include_meta=False):
-            setattr(copied, field, copy.deepcopy(value, memo))
+            object.__setattr__(copied, field, copy.deepcopy(value, memo))
         return copied
 
     def _checked_setattr(self, name, value):
+        if self._frozen and (
+            self._frozen_tree or name not in self.__ast_mutable_fields__
+        ):
+            raise TypeError(f'cannot set {name} on immutable {self!r}')
         super().__setattr__(name, value)
         field = self._fields.get(name)
         if field:
@@ -287,6 +474,10 @@ class AST(object, metaclass=MetaAST):
                 raise TypeError(f'cannot set immutable {name} on {self!r}')
 
     def __setattr__(self, name, value):
+        if self._frozen and (
+            self._frozen_tree or name not in self.__ast_mutable_fields__
+        ):
+            raise TypeError(f'cannot set {name} on immutable {self!r}')
         object.__setattr__(self, name, value)
 
     if __debug__ and _check_type is _check_type_real:
@@ -306,20 +497,18 @@ class AST(object, metaclass=MetaAST):
 
 
 class ImmutableASTMixin:
-    __frozen = False
-    # This uses type comments because type annotations are interpreted
-    # by the AST system and so annotating them would interfere!
-    __ast_mutable_fields__ = frozenset()  # type: AbstractSet[str]
+    """Nodes that cannot be modified after construction.
+
+    Fields listed in __ast_mutable_fields__ may still be set.
+    Unlike freeze(), this only applies to the node itself and
+    not to its children.
+    """
+
+    __slots__ = ()
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.__frozen = True
-
-    def __setattr__(self, name, value):
-        if self.__frozen and name not in self.__ast_mutable_fields__:
-            raise TypeError(f'cannot set {name} on immutable {self!r}')
-        else:
-            super().__setattr__(name, value)
+        object.__setattr__(self, '_frozen', True)
 
 
 @markup.serializer.serializer.register(AST)
@@ -350,6 +539,41 @@ def is_ast_node(obj):
     return _is_ast_node_type(obj.__class__)
 
 
+def freeze(node):
+    """Make the tree rooted at *node* immutable, in place.
+
+    Setting a field on any node of a frozen tree raises TypeError,
+    and copy.deepcopy() returns frozen nodes as is, so a frozen tree
+    can be shared freely.  To modify a frozen tree, copy.copy() the
+    nodes on the way to the change: the shallow copy of a frozen node
+    is mutable and has its own containers, but still shares the
+    (frozen) children.  Containers of frozen nodes must not be modified
+    in place.
+
+    Returns *node*.
+    """
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif is_ast_node(value) and not value._frozen_tree:
+            object.__setattr__(value, '_frozen', True)
+            object.__setattr__(value, '_frozen_tree', True)
+            for _, field_val in iter_fields(value, include_meta=False):
+                stack.append(field_val)
+    return node
+
+
+def _copy_container(value):
+    if isinstance(value, (list, set, dict)):
+        return value.copy()
+    else:
+        return value
+
+
 _marker = object()
 
 
@@ -0,0 +1,82 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from __future__ import annotations
+from typing import *
+
+import bisect
+import math
+
+
+# Upper bounds (in seconds) of the default latency buckets.
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Counts observed values in buckets with fixed upper bounds.
+
+    Values greater than the largest bound are counted in an implicit
+    "+Inf" bucket.
+
+    >>> h = Histogram(buckets=(1, 10))
+    >>> h.observe(0.5)
+    >>> h.observe(5)
+    >>> h.observe(50)
+    >>> h.get_buckets()
+    [(1, 1), (10, 2), (inf, 3)]
+    >>> h.quantile(0.5)
+    10
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self._bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_buckets(self) -> List[Tuple[float, int]]:
+        """Return (upper bound, cumulative count) pairs."""
+        result = []
+        total = 0
+        for bound, count in zip(self._bounds + (math.inf,), self._counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Return the upper bound of the bucket containing quantile *q*."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in self.get_buckets():
+            if total >= rank:
+                return bound
+        return math.inf
+
+    def reset(self) -> None:
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
@@ -20,8 +20,11 @@
 from __future__ import annotations
 from typing import *  # NoQA
 
+import hashlib
 import logging
+import mmap
 import os
+import struct
 import sys
 import types
 import re
@@ -308,6 +311,376 @@ class Spec(parsing.Spec):
         return ret
 
 
+# Compiled parser tables.
+#
+# Unpickling a parsing.Spec re-introspects the grammar modules and
+# rebuilds thousands of symbol, production and action objects, which
+# dominates the import-to-first-parse time of every compiler process.
+# Instead, the LR tables are dumped into a flat file of int32 arrays
+# that is memory-mapped on load and consulted directly by CompiledLr.
+#
+# The action and goto tables are packed with row displacement: the
+# entry for (state, symbol) lives at `base[state] + symbol` if the
+# `check` array at that position is equal to `base[state]`.  Identical
+# rows share their base.  An action value `v > 0` means "shift and go
+# to state v - 1", `v < 0` means "reduce by production -v - 1".
+
+TABLES_MAGIC = b'EDBLRT01'
+
+# magic, grammar fingerprint, byte order marker, number of states,
+# terminals, non-terminals, productions, action and goto table sizes,
+# and the size of the symbol names blob.
+_TABLES_HEADER = struct.Struct('=8s32s8i')
+_BYTEORDER_MARK = 0x01020304
+
+
+def grammar_fingerprint(mod) -> bytes:
+    """Return a hash identifying the grammar defined by *mod*.
+
+    The hash covers the sources of the grammar package and the names
+    of the token classes, since the set of keywords is defined outside
+    of the grammar package.
+    """
+    h = hashlib.blake2b(TABLES_MAGIC, digest_size=32)
+
+    grammar_dir = os.path.dirname(mod.__file__)
+    for fn in sorted(os.listdir(grammar_dir)):
+        if fn.endswith('.py'):
+            h.update(fn.encode())
+            with open(os.path.join(grammar_dir, fn), 'rb') as f:
+                h.update(f.read())
+
+    for name in sorted(mod.__dict__):
+        if isinstance(mod.__dict__[name], TokenMeta):
+            h.update(name.encode())
+            h.update(b'\x00')
+
+    return h.digest()
+
+
+def _qualname(obj) -> str:
+    return f'{obj.__module__}:{obj.__qualname__}'
+
+
+def _resolve_qualname(name: str):
+    modname, _, qualname = name.partition(':')
+    obj = sys.modules[modname]
+    for attr in qualname.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _pack_rows(rows: Sequence[Dict[int, int]], n_states: int):
+    """Pack sparse table rows using row displacement."""
+    base = [0] * n_states
+    check: List[int] = []
+    value: List[int] = []
+
+    # Occupied slots and used bases are tracked as bitmasks, so that
+    # the candidate bases for a row can be computed with a handful of
+    # big integer operations instead of probing every offset.
+    occupied = 0
+    used_bases = 0
+    size = 0
+
+    row_bases: Dict[Tuple[Tuple[int, int], ...], int] = {}
+
+    order = sorted(range(n_states), key=lambda s: -len(rows[s]))
+    for state in order:
+        row = tuple(sorted(rows[state].items()))
+        try:
+            base[state] = row_bases[row]
+            continue
+        except KeyError:
+            pass
+
+        cols = [col for col, _ in row] or [0]
+        free = ~occupied & ((1 << (size + cols[-1] + 1)) - 1)
+        candidates = ~used_bases
+        for col in cols:
+            candidates &= free >> col
+        b = (candidates & -candidates).bit_length() - 1
+
+        end = b + cols[-1] + 1
+        if end > size:
+            check.extend([-1] * (end - size))
+            value.extend([0] * (end - size))
+            size = end
+        for col, val in row:
+            check[b + col] = b
+            value[b + col] = val
+            occupied |= 1 << (b + col)
+
+        used_bases |= 1 << b
+        row_bases[row] = base[state] = b
+
+    return base, check, value
+
+
+def write_parser_tables(spec: parsing.Spec, mod, path: str) -> None:
+    """Dump the LR tables of *spec* built from *mod* into *path*."""
+    if not spec.pureLR:
+        raise ValueError(f'grammar {mod.__name__} is not LR(1)')
+
+    # Skinny specs only retain the symbol map and the tables, so
+    # collect everything from those.
+    terms = sorted(
+        sym for sym in spec._sym2spec.values()
+        if isinstance(sym, parsing.TokenSpec) and sym.name != '<e>')
+    nonterms = sorted(
+        sym for sym in spec._sym2spec.values()
+        if isinstance(sym, parsing.NontermSpec))
+    prods = sorted({
+        action.production
+        for state_actions in spec._action
+        for sym, actions in state_actions.items()
+        for action in actions
+        if isinstance(action, parsing.ReduceAction) and sym.name != '<e>'
+    })
+
+    term_idx = {t: i for i, t in enumerate(terms)}
+    nonterm_idx = {nt: i for i, nt in enumerate(nonterms)}
+    prod_idx = {p: i for i, p in enumerate(prods)}
+
+    names: List[str] = []
+    names.extend(_qualname(t.tokenType) for t in terms)
+    names.extend(_qualname(nt.nontermType) for nt in nonterms)
+    for p in prods:
+        method = p.qualified.rpartition('.')[2]
+        names.append(f'{_qualname(p.lhs.nontermType)}.{method}')
+
+    n_states = len(spec._action)
+    action_rows = []
+    for state_actions in spec._action:
+        row = {}
+        for sym, actions in state_actions.items():
+            if sym not in term_idx:
+                # Epsilon is never fed to the parser.
+                continue
+            action, = actions
+            if isinstance(action, parsing.ShiftAction):
+                row[term_idx[sym]] = action.nextState + 1
+            else:
+                row[term_idx[sym]] = -(prod_idx[action.production] + 1)
+        action_rows.append(row)
+
+    goto_rows = []
+    for state_gotos in spec._goto:
+        goto_rows.append({
+            nonterm_idx[sym]: next_state
+            for sym, next_state in state_gotos.items()
+        })
+
+    action_base, action_check, action_value = _pack_rows(
+        action_rows, n_states)
+    goto_base, goto_check, goto_value = _pack_rows(goto_rows, n_states)
+
+    prod_lhs = [nonterm_idx[p.lhs] for p in prods]
+    prod_nrhs = [len(p.rhs) for p in prods]
+
+    names_blob = '\n'.join(names).encode('utf-8')
+    name_offsets = [0]
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name.encode()) + 1)
+
+    ints = [
+        action_base, action_check, action_value,
+        goto_base, goto_check, goto_value,
+        prod_lhs, prod_nrhs,
+        name_offsets,
+    ]
+
+    header = _TABLES_HEADER.pack(
+        TABLES_MAGIC, grammar_fingerprint(mod), _BYTEORDER_MARK,
+        n_states, len(terms), len(nonterms), len(prods),
+        len(action_check), len(goto_check), len(names_blob))
+
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        for arr in ints:
+            f.write(struct.pack(f'={len(arr)}i', *arr))
+        f.write(names_blob)
+    os.replace(tmp, path)
+
+
+class _SymbolSpec:
+    """A symbol specification of a compiled grammar.
+
+    This is what parsing.Token and parsing.Nonterm expect to find in
+    the `_sym2spec` mapping of the parser spec.
+    """
+
+    __slots__ = ('name', 'prec', 'index')
+
+    def __init__(self, name: str, index: int):
+        self.name = name
+        self.prec = 'none'
+        self.index = index
+
+    def __repr__(self):
+        return self.name
+
+
+class CompiledSpec:
+    """Memory-mapped LR tables written by write_parser_tables()."""
+
+    def __init__(self, buf: mmap.mmap):
+        (_, _, _, n_states, n_terms, n_nonterms, n_prods, n_action,
+         n_goto, _) = _TABLES_HEADER.unpack_from(buf)
+
+        ints = memoryview(buf)[_TABLES_HEADER.size:]
+        n_names = n_terms + n_nonterms + n_prods
+        sizes = [
+            n_states, n_action, n_action,
+            n_states, n_goto, n_goto,
+            n_prods, n_prods,
+            n_names + 1,
+        ]
+        arrays = []
+        offset = 0
+        for size in sizes:
+            arrays.append(ints[offset:offset + size * 4].cast('i'))
+            offset += size * 4
+
+        (self._action_base, self._action_check, self._action_value,
+         self._goto_base, self._goto_check, self._goto_value,
+         self._prod_lhs, self._prod_nrhs,
+         self._name_offsets) = arrays
+
+        self._names = ints[offset:]
+        self._n_terms = n_terms
+        self._n_nonterms = n_nonterms
+        self._buf = buf
+
+        # Reduce methods and non-terminal classes are only resolved
+        # when a production is first reduced.
+        self._methods: List[Any] = [None] * n_prods
+        self._nonterm_types: List[Any] = [None] * n_nonterms
+
+        self._sym2spec: Dict[type, _SymbolSpec] = {}
+        for i in range(n_terms):
+            tok_type = _resolve_qualname(self._get_name(i))
+            self._sym2spec[tok_type] = _SymbolSpec(tok_type.__name__, i)
+
+    @classmethod
+    def load(cls, mod, path: str) -> Optional[CompiledSpec]:
+        """Load the tables for *mod*, or return None if they are stale."""
+        try:
+            with open(path, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, fingerprint, byteorder, *_ = (
+                _TABLES_HEADER.unpack_from(buf))
+            if (magic != TABLES_MAGIC
+                    or byteorder != _BYTEORDER_MARK
+                    or fingerprint != grammar_fingerprint(mod)):
+                buf.close()
+                return None
+            return cls(buf)
+        except (struct.error, ValueError, LookupError, AttributeError):
+            logger.info('Ignoring malformed parser tables in %s', path)
+            buf.close()
+            return None
+
+    def _get_name(self, i: int) -> str:
+        start = self._name_offsets[i]
+        end = self._name_offsets[i + 1] - 1
+        return str(self._names[start:end], 'utf-8')
+
+    def get_action(self, state: int, term: int) -> int:
+        i = self._action_base[state] + term
+        if i < len(self._action_check) and self._action_check[i] == (
+                self._action_base[state]):
+            return self._action_value[i]
+        else:
+            return 0
+
+    def get_goto(self, state: int, nonterm: int) -> int:
+        i = self._goto_base[state] + nonterm
+        return self._goto_value[i]
+
+    def get_production(self, prod: int):
+        method = self._methods[prod]
+        lhs = self._prod_lhs[prod]
+        if method is None:
+            method = self._methods[prod] = _resolve_qualname(
+                self._get_name(self._n_terms + self._n_nonterms + prod))
+
+        nonterm_type = self._nonterm_types[lhs]
+        if nonterm_type is None:
+            nonterm_type = _resolve_qualname(self._get_name(
+                self._n_terms + lhs))
+            self._sym2spec[nonterm_type] = _SymbolSpec(
+                nonterm_type.__name__, self._n_terms + lhs)
+            self._nonterm_types[lhs] = nonterm_type
+
+        return nonterm_type, method, lhs, self._prod_nrhs[prod]
+
+
+class CompiledLr:
+    """LR(1) parser driver operating on a CompiledSpec.
+
+    Implements the subset of the parsing.Lr interface used by Parser.
+    """
+
+    def __init__(self, spec: CompiledSpec):
+        self._spec = spec
+        self.verbose = False
+        self.reset()
+
+    @property
+    def spec(self):
+        return self._spec
+
+    @property
+    def start(self):
+        return self._start
+
+    def reset(self):
+        self._start = None
+        self._stack = [(None, 0)]
+
+    def token(self, token):
+        """Feed a token to the parser."""
+        spec = self._spec
+        stack = self._stack
+        term = spec._sym2spec[type(token)].index
+
+        while True:
+            action = spec.get_action(stack[-1][1], term)
+            if action > 0:
+                stack.append((token, action - 1))
+                return
+            elif action == 0:
+                raise parsing.UnexpectedToken(
+                    'Unexpected token: %r' % (token,))
+
+            nonterm_type, method, lhs, nrhs = spec.get_production(
+                -action - 1)
+            if nrhs:
+                rhs = [sym for sym, _ in stack[-nrhs:]]
+                del stack[-nrhs:]
+            else:
+                rhs = []
+
+            sym = nonterm_type(self)
+            result = method(sym, *rhs)
+            if result is None:
+                result = sym
+
+            stack.append((result, spec.get_goto(stack[-1][1], lhs)))
+
+    def eoi(self):
+        """Signal end-of-input to the parser."""
+        self.token(parsing.EndOfInput(self))
+        self._stack.pop()
+        self._start = [self._stack[1][0]]
+
+
 def _derive_hint(
     input: str,
     message: str,
@@ -354,10 +727,27 @@ class Parser:
                 return spec
 
         mod = self.get_parser_spec_module()
+        debug = self.get_debug()
+        tables_path = self.localpath(mod, "tables")
+
+        if not debug:
+            spec = CompiledSpec.load(mod, tables_path)
+            if spec is not None:
+                self.__class__.parser_spec = spec
+                return spec
+
         spec = Spec(
             mod, pickleFile=self.localpath(mod, "pickle"),
-            skinny=not self.get_debug(), logFile=self.localpath(mod, "log"),
-            verbose=self.get_debug())
+            skinny=not debug, logFile=self.localpath(mod, "log"),
+            verbose=debug)
+
+        if not debug:
+            try:
+                write_parser_tables(spec, mod, tables_path)
+            except OSError as e:
+                logger.info(
+                    'Could not write parser tables for %s: %s',
+                    mod.__name__, e)
 
         self.__class__.parser_spec = spec
         return spec
@@ -379,7 +769,11 @@ class Parser:
     def reset_parser(self, input):
         if not self.parser:
             self.lexer = self.get_lexer()
-            self.parser = parsing.Lr(self.get_parser_spec())
+            spec = self.get_parser_spec()
+            if isinstance(spec, CompiledSpec):
+                self.parser = CompiledLr(spec)
+            else:
+                self.parser = parsing.Lr(spec)
             self.parser.parser_data = self.parser_data
             self.parser.verbose = self.get_debug()
 
@@ -0,0 +1,67 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from __future__ import annotations
+from typing import *
+
+import contextlib
+import time
+
+
+class PhaseTimer:
+    """Accumulates the time spent in named phases of a computation.
+
+    Phases may nest.  The time of a nested phase is *excluded* from the
+    time of the enclosing phase, so the recorded durations always add
+    up to the total time spent inside the outermost phases.
+
+    >>> t = PhaseTimer()
+    >>> with t.phase('compile'):
+    ...     with t.phase('codegen'):
+    ...         pass
+    >>> sorted(t.phases)
+    ['codegen', 'compile']
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        # Time spent in nested phases, one entry per active phase.
+        self._nested: List[float] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested.pop()
+            self.add(name, elapsed - nested)
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def add(self, name: str, duration: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def drain_into(self, phases: Dict[str, float]) -> None:
+        """Add recorded durations to *phases* and reset the timer."""
+        for name, duration in self.phases.items():
+            phases[name] = phases.get(name, 0.0) + duration
+        self.phases = {}
@@ -92,7 +92,6 @@ pub const UNRESERVED_KEYWORDS: &[&str] = &[
 
 pub const FUTURE_RESERVED_KEYWORDS: &[&str] = &[
     // Keep in sync with `tokenizer::is_keyword`
-    "analyze",
     "anyarray",
     "begin",
     "case",
@@ -102,7 +101,6 @@ pub const FUTURE_RESERVED_KEYWORDS: &[&str] = &[
     "do",
     "end",
     "execute",
-    "explain",
     "fetch",
     "get",
     "global",
@@ -138,6 +136,7 @@ pub const CURRENT_RESERVED_KEYWORDS: &[&str] = &[
     "__std__",
     "abort",
     "alter",
+    "analyze",
     "and",
     "anytuple",
     "anytype",
@@ -153,6 +152,7 @@ pub const CURRENT_RESERVED_KEYWORDS: &[&str] = &[
     "else",
     "empty",
     "exists",
+    "explain",
     "extending",
     "false",
     "filter",
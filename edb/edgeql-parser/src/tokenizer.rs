@@ -841,6 +841,7 @@ pub fn is_keyword(s: &str) -> bool {
         | "__edgedbtpl__"
         | "abort"
         | "alter"
+        | "analyze"
         | "and"
         | "anytuple"
         | "anytype"
@@ -856,6 +857,7 @@ pub fn is_keyword(s: &str) -> bool {
         | "else"
         | "empty"
         | "exists"
+        | "explain"
         | "extending"
         | "false"
         | "filter"
@@ -891,7 +893,6 @@ pub fn is_keyword(s: &str) -> bool {
           // Keep in sync with keywords::CURRENT_RESERVED_KEYWORDS
         // # Future reserved keywords #
           // Keep in sync with keywords::FUTURE_RESERVED_KEYWORDS
-        | "analyze"
         | "anyarray"
         | "begin"
         | "case"
@@ -901,7 +902,6 @@ pub fn is_keyword(s: &str) -> bool {
         | "do"
         | "end"
         | "execute"
-        | "explain"
         | "fetch"
         | "get"
         | "global"
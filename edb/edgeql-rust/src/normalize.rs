@@ -211,7 +211,7 @@ pub fn normalize<'x>(text: &'x str)
             }
             Kind::Keyword
             if (matches!(&(&tok.value[..].to_uppercase())[..],
-                "CONFIGURE"|"CREATE"|"ALTER"|"DROP"|"START"))
+                "CONFIGURE"|"CREATE"|"ALTER"|"DROP"|"START"|"EXPLAIN"))
             => {
                 let processed_source = serialize_tokens(&tokens);
                 return Ok(Entry {
@@ -23,4 +23,5 @@ from . import ast  # NOQA
 from .tokenizer import Source, NormalizedSource  # NOQA
 from .codegen import generate_source  # NOQA
 from .parser import parse, parse_fragment, parse_block  # NOQA
+from .parser import parse_block_cached, parse_block_iter  # NOQA
 from .parser.grammar import keywords  # NOQA
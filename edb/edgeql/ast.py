@@ -85,12 +85,13 @@ class DescribeGlobal(s_enum.StrEnum):
 class Base(ast.AST):
     __abstract_node__ = True
     __ast_hidden__ = {'context'}
+    # The parent link is set by the source generator (see
+    # edgeql.codegen._fix_parent_links).
+    __slots__ = ('_parent',)
     context: parsing.ParserContext
     # System-generated comment.
     system_comment: str
 
-    # parent: typing.Optional[Base]
-
 
 class OffsetLimitMixin(Base):
     __abstract_node__ = True
@@ -687,6 +688,7 @@ class DropObject(ObjectDDL):
 
 
 class CreateExtendingObject(CreateObject, BasesMixin):
+    __abstract_node__ = True
     final: bool = False
 
 
@@ -700,6 +702,7 @@ class Rename(NamedDDL):
 
 class MigrationCommand:
 
+    __slots__ = ()
     __abstract_node__ = True
     object_class: qltypes.SchemaObjectClass = (
         qltypes.SchemaObjectClass.MIGRATION)
@@ -1198,6 +1201,12 @@ class DescribeStmt(Statement):
     options: Options
 
 
+class ExplainStmt(Statement):
+
+    query: Query
+    analyze: bool = False
+
+
 #
 # SDL
 #
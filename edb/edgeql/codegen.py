@@ -1937,6 +1937,12 @@ class EdgeQLSourceGenerator(codegen.SourceGenerator):
             self.write(' ')
             self.visit(node.options)
 
+    def visit_ExplainStmt(self, node: qlast.ExplainStmt) -> None:
+        self.write('EXPLAIN ')
+        if node.analyze:
+            self.write('ANALYZE ')
+        self.visit(node.query)
+
     def visit_Options(self, node: qlast.Options) -> None:
         for i, opt in enumerate(node.options.values()):
             if i > 0:
@@ -2002,26 +2008,32 @@ def _fix_parent_links(node: qlast.Base) -> qlast.Base:
     # Using AST.parent is an anti-pattern. Instead write code
     # that uses singledispatch and maintains a proper context.
 
-    node._parent = None
+    # Parent links are not part of the tree, so they are set
+    # on frozen trees too.
+    _set_parent(node, None)
 
     for _field, value in base.iter_fields(node):
         if isinstance(value, dict):
             for n in value.values():
                 if base.is_ast_node(n):
                     _fix_parent_links(n)
-                    n._parent = node
+                    _set_parent(n, node)
 
         elif typeutils.is_container(value):
             for n in value:
                 if base.is_ast_node(n):
                     _fix_parent_links(n)
-                    n._parent = node
+                    _set_parent(n, node)
 
         elif base.is_ast_node(value):
             _fix_parent_links(value)
-            value._parent = node
+            _set_parent(value, node)
 
     return node
 
 
+def _set_parent(node: qlast.Base, parent: Optional[qlast.Base]) -> None:
+    object.__setattr__(node, '_parent', parent)
+
+
 generate_source = EdgeQLSourceGenerator.to_source
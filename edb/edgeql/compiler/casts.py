@@ -293,6 +293,7 @@ class CastCallableWrapper(s_func.CallableLike):
     # for the purposes of polymorphic resolution.
     def __init__(self, cast: s_casts.Cast) -> None:
         self._cast = cast
+        self.id = cast.id
 
     def has_inlined_defaults(self, schema: s_schema.Schema) -> bool:
         return False
@@ -26,6 +26,7 @@ from typing import *
 from dataclasses import dataclass, field as dc_field
 
 if TYPE_CHECKING:
+    from edb.common import phasetimer
     from edb.schema import functions as s_func
     from edb.schema import objects as s_obj
     from edb.schema import name as s_name
@@ -79,6 +80,10 @@ class GlobalCompilerOptions:
     #: multiplicity issues.
     validate_multiplicity: bool = False
 
+    #: If set, the time spent in the final cardinality and multiplicity
+    #: inference pass is recorded in the "inference" phase of this timer.
+    phase_timer: Optional[phasetimer.PhaseTimer] = None
+
 
 @dataclass
 class CompilerOptions(GlobalCompilerOptions):
@@ -26,6 +26,8 @@ from typing import *
 
 from edb import errors
 
+from edb.common import lru
+
 from edb.ir import ast as irast
 from edb.ir import utils as irutils
 
@@ -73,6 +75,18 @@ _SET_OF = ft.TypeModifier.SetOfType
 _OPTIONAL = ft.TypeModifier.OptionalType
 _SINGLETON = ft.TypeModifier.SingletonType
 
+# Number of overload resolution results kept by find_callable().
+RESOLUTION_CACHE_SIZE = 10000
+
+# Maps (callables generation of the schema, candidate ids, argument
+# type ids, named argument names and type ids) to the positions of
+# the matching candidates.
+_resolution_cache = lru.LRUMapping(maxsize=RESOLUTION_CACHE_SIZE)
+
+
+def clear_resolution_cache() -> None:
+    _resolution_cache.clear()
+
 
 def find_callable(
         candidates: Iterable[s_func.CallableLike], *,
@@ -80,6 +94,65 @@ def find_callable(
         kwargs: Mapping[str, Tuple[s_types.Type, irast.Set]],
         ctx: context.ContextLevel) -> List[BoundCall]:
 
+    callables = list(candidates)
+    key = _get_resolution_key(callables, args, kwargs, ctx=ctx)
+    if key is None:
+        return _find_callable(callables, args=args, kwargs=kwargs, ctx=ctx)
+
+    try:
+        positions = _resolution_cache[key]
+    except KeyError:
+        pass
+    else:
+        # Only the chosen candidates need to be bound again: this
+        # yields the implicit casts and, for polymorphic callables,
+        # the resolved types.
+        matched = []
+        for pos in positions:
+            call = try_bind_call_args(args, kwargs, callables[pos], ctx=ctx)
+            if call is None:
+                break
+            matched.append(call)
+        else:
+            return matched
+
+    matched = _find_callable(callables, args=args, kwargs=kwargs, ctx=ctx)
+    _resolution_cache[key] = tuple(
+        callables.index(call.func) for call in matched)
+    return matched
+
+
+def _get_resolution_key(
+        candidates: Sequence[s_func.CallableLike],
+        args: Sequence[Tuple[s_types.Type, irast.Set]],
+        kwargs: Mapping[str, Tuple[s_types.Type, irast.Set]], *,
+        ctx: context.ContextLevel) -> Optional[Hashable]:
+
+    schema = ctx.env.schema
+    if (
+        ctx.env.options.func_params is not None and
+        ctx.env.options.func_params.has_polymorphic(schema)
+    ):
+        # Resolution inside the bodies of polymorphic functions
+        # depends on the parameters of the function being compiled.
+        return None
+
+    return (
+        schema.get_callables_generation(),
+        tuple(c.id for c in candidates),
+        tuple(arg_type.id for arg_type, _ in args),
+        tuple(sorted(
+            (name, arg_type.id) for name, (arg_type, _) in kwargs.items()
+        )),
+    )
+
+
+def _find_callable(
+        candidates: Iterable[s_func.CallableLike], *,
+        args: Sequence[Tuple[s_types.Type, irast.Set]],
+        kwargs: Mapping[str, Tuple[s_types.Type, irast.Set]],
+        ctx: context.ContextLevel) -> List[BoundCall]:
+
     implicit_cast_distance = None
     matched = []
 
@@ -24,6 +24,7 @@ from __future__ import annotations
 from typing import *
 
 from collections import defaultdict
+import copy
 import textwrap
 
 from edb import errors
@@ -75,13 +76,16 @@ def compile_SelectQuery(
             sctx.partial_path_prefix = ctx.partial_path_prefix
             stmt.implicit_wrapper = True
 
+        # The query may be a shared (frozen) tree, so the implicit
+        # limit is not stored in it.
+        limit = expr.limit
         if (
             (ctx.expr_exposed or sctx.stmt is ctx.toplevel_stmt)
             and ctx.implicit_limit
-            and expr.limit is None
+            and limit is None
             and not ctx.inhibit_implicit_limit
         ):
-            expr.limit = qlast.IntegerConstant(value=str(ctx.implicit_limit))
+            limit = qlast.IntegerConstant(value=str(ctx.implicit_limit))
 
         stmt.result = compile_result_clause(
             expr.result,
@@ -101,7 +105,7 @@ def compile_SelectQuery(
             expr.offset, ctx=sctx)
 
         stmt.limit = clauses.compile_limit_offset_clause(
-            expr.limit, ctx=sctx)
+            limit, ctx=sctx)
 
         result = fini_stmt(stmt, expr, ctx=sctx, parent_ctx=ctx)
 
@@ -1186,6 +1190,8 @@ def compile_result_clause(
                 # but also subject for further processing, so
                 # make sure we don't mangle it with an implicit
                 # limit.
+                if rexpr is result_expr:
+                    rexpr = copy.copy(rexpr)
                 rexpr.limit = qlast.TypeCast(
                     expr=qlast.Set(),
                     type=qlast.TypeName(
@@ -24,6 +24,8 @@ from __future__ import annotations
 
 from typing import *
 
+import contextlib
+
 from edb import errors
 
 from edb.ir import ast as irast
@@ -118,22 +120,28 @@ def fini_expression(
 
     cardinality = qltypes.Cardinality.AT_MOST_ONE
     if ctx.path_scope is not None:
-        # The inference context object will be shared between
-        # cardinality and multiplicity inferrers.
-        inf_ctx = inference.make_ctx(env=ctx.env)
-        # Simple expressions have no scope.
-        cardinality = inference.infer_cardinality(
-            ir,
-            scope_tree=ctx.path_scope,
-            ctx=inf_ctx,
+        timer = ctx.env.options.phase_timer
+        inference_phase: ContextManager[None] = (
+            timer.phase('inference') if timer is not None
+            else contextlib.nullcontext()
         )
-        multiplicity: Optional[qltypes.Multiplicity] = None
-        if ctx.env.options.validate_multiplicity:
-            multiplicity = inference.infer_multiplicity(
+        with inference_phase:
+            # The inference context object will be shared between
+            # cardinality and multiplicity inferrers.
+            inf_ctx = inference.make_ctx(env=ctx.env)
+            # Simple expressions have no scope.
+            cardinality = inference.infer_cardinality(
                 ir,
                 scope_tree=ctx.path_scope,
                 ctx=inf_ctx,
             )
+            multiplicity: Optional[qltypes.Multiplicity] = None
+            if ctx.env.options.validate_multiplicity:
+                multiplicity = inference.infer_multiplicity(
+                    ir,
+                    scope_tree=ctx.path_scope,
+                    ctx=inf_ctx,
+                )
 
     # Fix up weak namespaces
     _rewrite_weak_namespaces(ir, ctx)
@@ -22,6 +22,7 @@
 
 from __future__ import annotations
 
+import copy
 import functools
 from typing import *
 
@@ -604,6 +605,8 @@ def _normalize_view_ptr_expr(
                 and ctx.implicit_limit
                 and isinstance(qlexpr, qlast.OffsetLimitMixin)
                 and not qlexpr.limit):
+            # The expression may be a part of a cached, frozen tree.
+            qlexpr = copy.copy(qlexpr)
             qlexpr.limit = qlast.IntegerConstant(value=str(ctx.implicit_limit))
 
         with ctx.newscope(fenced=True) as shape_expr_ctx:
@@ -177,6 +177,22 @@ class TraceContextBase:
 
             extra_name = '|'.join(qlcodegen.generate_source(e) for e in exprs)
 
+        elif isinstance(decl, qlast.CreateIndex):
+            # Indexes are defined by their expr, kind and predicate,
+            # so we need to add those to the "extra_name".
+            exprs = [decl.expr]
+
+            for cmd in decl.commands:
+                if (
+                    isinstance(cmd, qlast.SetField)
+                    and cmd.name in {'kind', 'predicate'}
+                ):
+                    assert cmd.value, "sdl SetField should always have value"
+                    assert isinstance(cmd.value, qlast.Expr)
+                    exprs.append(cmd.value)
+
+            extra_name = '|'.join(qlcodegen.generate_source(e) for e in exprs)
+
         if extra_name:
             fq_name = s_name.QualName(
                 module=fq_name.module,
@@ -638,9 +654,19 @@ def trace_Index(
     *,
     ctx: DepTraceContext,
 ) -> None:
+    exprs = [ExprDependency(expr=node.expr)]
+    for cmd in node.commands:
+        if (
+            isinstance(cmd, qlast.SetField)
+            and cmd.name in {'predicate', 'include'}
+        ):
+            assert cmd.value, "sdl SetField should always have value"
+            assert isinstance(cmd.value, qlast.Expr)
+            exprs.append(ExprDependency(expr=cmd.value))
+
     _register_item(
         node,
-        hard_dep_exprs=[ExprDependency(expr=node.expr)],
+        hard_dep_exprs=exprs,
         source=ctx.depstack[-1][1],
         subject=ctx.depstack[-1][1],
         ctx=ctx,
@@ -769,7 +795,8 @@ def _register_item(
     op = orig_op = copy.copy(decl)
 
     if ctx.depstack:
-        op.sdl_alter_if_exists = True
+        if isinstance(op, qlast.CreateObject):
+            op.sdl_alter_if_exists = True
         top_parent = parent = copy.copy(ctx.depstack[0][0])
         _clear_nonessential_subcommands(parent)
         for entry, _ in ctx.depstack[1:]:
@@ -830,7 +857,10 @@ def _register_item(
             elif (isinstance(cmd, qlast.SetField)
                   and not cmd.special_syntax
                   and not isinstance(cmd.value, qlast.BaseConstant)
-                  and not isinstance(op, qlast.CreateAlias)):
+                  and not isinstance(op, qlast.CreateAlias)
+                  # the predicate and included properties of an index
+                  # are a part of its definition
+                  and not isinstance(decl, qlast.CreateIndex)):
                 subcmds.append(cmd)
             else:
                 commands.append(cmd)
@@ -21,11 +21,30 @@ from __future__ import annotations
 
 from typing import *
 
+import copy
+import hashlib
+
+from edb.common import ast
+from edb.common import lru
+
 from . import parser as qlparser
 from .. import ast as qlast
 from .. import tokenizer as qltokenizer
 
 
+# Number of parsed statement blocks kept by parse_block_cached().
+PARSE_CACHE_SIZE = 1000
+# Sources longer than this are never cached, there is little point
+# in keeping the trees of large scripts and migrations around.
+PARSE_CACHE_MAX_SOURCE_LEN = 64 * 1024
+
+# Number of parsed expression fragments kept by parse_fragment_cached().
+FRAGMENT_CACHE_SIZE = 10000
+
+_block_cache = lru.LRUMapping(maxsize=PARSE_CACHE_SIZE)
+_fragment_cache = lru.LRUMapping(maxsize=FRAGMENT_CACHE_SIZE)
+
+
 def append_module_aliases(tree, aliases):
     modaliases = []
     for alias, module in aliases.items():
@@ -47,6 +66,26 @@ def parse_fragment(source: Union[qltokenizer.Source, str]) -> qlast.Base:
     return parser.parse(source)
 
 
+def parse_fragment_cached(text: str) -> qlast.Base:
+    """Parse an expression fragment, re-using previously parsed trees.
+
+    This is meant for schema expressions (defaults, computables,
+    constraints, etc), which are re-parsed from text whenever a schema
+    is unpickled.  The cached tree is never handed out: callers get
+    a deep copy of it, which they are free to modify, as the trees
+    of schema expressions end up in DDL trees that are normalized
+    in place.
+    """
+    if len(text) > PARSE_CACHE_MAX_SOURCE_LEN:
+        return parse_fragment(text)
+
+    tree = _fragment_cache.get(text)
+    if tree is None:
+        tree = parse_fragment(text)
+        _fragment_cache[text] = tree
+    return copy.deepcopy(tree)
+
+
 def parse(
     source: Union[qltokenizer.Source, str],
     module_aliases: Optional[Mapping[Optional[str], str]] = None,
@@ -69,6 +108,89 @@ def parse_block(source: Union[qltokenizer.Source, str]) -> List[qlast.Base]:
     return parser.parse(source)
 
 
+class _StatementSource(qltokenizer.Source):
+    """A single statement of a tokenized block.
+
+    Shares the text of the whole block, so that parser contexts
+    point at the right place of the original source.
+    """
+
+    def __init__(self, source: qltokenizer.Source, tokens: List[Any]):
+        self._source = source
+        self._tokens = tokens
+        self._cache_key: Optional[bytes] = None
+
+    def text(self) -> str:
+        return self._source.text()
+
+    def cache_key(self) -> bytes:
+        if self._cache_key is None:
+            # Token positions are byte offsets in the UTF-8 encoded
+            # text, the last token is the EOF of the whole block.
+            start = self._tokens[0].start()[2]
+            end = self._tokens[-2].end()[2]
+            span = self.text().encode('utf-8')[start:end]
+            self._cache_key = hashlib.blake2b(span).digest()
+        return self._cache_key
+
+
+def parse_block_iter(
+    source: Union[qltokenizer.Source, str],
+) -> Iterator[qlast.Base]:
+    """Parse a block of statements lazily, one statement at a time.
+
+    Unlike parse_block(), this never holds the trees of the whole
+    block at once, and a syntax error is only raised once the
+    statements preceding it have been consumed.
+    """
+    if isinstance(source, str):
+        source = qltokenizer.Source.from_string(source)
+    tokens = source.tokens()
+    eof = tokens[-1]
+    parser = qlparser.EdgeQLBlockParser()
+    for start, end in qltokenizer.iter_statement_spans(tokens):
+        stmt_source = _StatementSource(source, tokens[start:end] + [eof])
+        yield from parser.parse(stmt_source)
+
+
+def parse_block_cached(source: qltokenizer.Source) -> List[qlast.Base]:
+    """Parse *source* like parse_block(), re-using previously parsed trees.
+
+    Trees are cached by the token stream key of the source, so the
+    same normalized query compiled under a different session state
+    is only parsed once.  Queries are frozen (see ast.freeze()) and
+    returned as is, since the compiler does not modify them.  Other
+    statements, DDL in particular, are modified during compilation,
+    so callers always get a deep copy of those.
+    """
+    text = source.text()
+    if len(text) > PARSE_CACHE_MAX_SOURCE_LEN:
+        return parse_block(source)
+
+    key = (type(source), source.cache_key())
+    entry = _block_cache.get(key)
+    # Sources with the same token stream may still differ in
+    # whitespace, comments and extracted constants, which would
+    # make the parser contexts of the cached tree point at the
+    # wrong positions.
+    if entry is None or entry[0] != text:
+        statements = parse_block(source)
+        for stmt in statements:
+            if isinstance(stmt, qlast.Query):
+                ast.freeze(stmt)
+        _block_cache[key] = (text, statements)
+    else:
+        statements = entry[1]
+
+    # Deep copies of frozen trees are the trees themselves.
+    return copy.deepcopy(statements)
+
+
+def clear_parse_cache():
+    _block_cache.clear()
+    _fragment_cache.clear()
+
+
 def parse_sdl(expr: str):
     parser = qlparser.EdgeSDLParser()
     return parser.parse(expr)
@@ -41,6 +41,10 @@ class Stmt(Nonterm):
         # DESCRIBE
         self.val = kids[0].val
 
+    def reduce_ExplainStmt(self, *kids):
+        # EXPLAIN
+        self.val = kids[0].val
+
     def reduce_ExprStmt(self, *kids):
         self.val = kids[0].val
 
@@ -180,6 +184,15 @@ class DescribeFormat(Nonterm):
         )
 
 
+class ExplainStmt(Nonterm):
+
+    def reduce_EXPLAIN_ExprStmt(self, *kids):
+        self.val = qlast.ExplainStmt(query=kids[1].val)
+
+    def reduce_EXPLAIN_ANALYZE_ExprStmt(self, *kids):
+        self.val = qlast.ExplainStmt(query=kids[2].val, analyze=True)
+
+
 class DescribeStmt(Nonterm):
 
     def reduce_DESCRIBE_SCHEMA(self, *kids):
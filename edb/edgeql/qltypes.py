@@ -175,6 +175,22 @@ class Multiplicity(s_enum.StrEnum):
     MANY = 'MANY'
 
 
+class IndexKind(s_enum.StrEnum):
+    BTree = 'BTree'
+    Hash = 'Hash'
+    GIN = 'GIN'
+    GiST = 'GiST'
+    SPGiST = 'SPGiST'
+    BRIN = 'BRIN'
+
+    @classmethod
+    def _missing_(cls, name):
+        # We want both `kind := 'gin'` and `kind := 'GIN'` to work.
+        for member in cls:
+            if member.value.lower() == name.lower():
+                return member
+
+
 class DescribeLanguage(s_enum.StrEnum):
     DDL = 'DDL'
     SDL = 'SDL'
@@ -101,6 +101,39 @@ class NormalizedSource(Source):
         return cls(normalize(text), text)
 
 
+_OPEN_BRACKETS = frozenset({'{', '(', '['})
+_CLOSE_BRACKETS = frozenset({'}', ')', ']'})
+
+
+def iter_statement_spans(
+    tokens: Sequence[Token],
+) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) token index ranges of top-level statements.
+
+    Statements are delimited by semicolons outside of any brackets,
+    the range of a statement includes its terminating semicolon.
+    Empty statements and the final EOF token are skipped.  Unbalanced
+    brackets make the rest of the input a single statement, so that
+    the parser can report the error.
+    """
+    depth = 0
+    start = 0
+    for i, tok in enumerate(tokens):
+        kind = tok.kind()
+        if kind in _OPEN_BRACKETS:
+            depth += 1
+        elif kind in _CLOSE_BRACKETS:
+            depth -= 1
+        elif kind == ';' and depth == 0:
+            if i > start:
+                yield start, i + 1
+            start = i + 1
+        elif kind == 'EOF':
+            if i > start:
+                yield start, i
+            return
+
+
 def tokenize(eql: str) -> List[Token]:
     try:
         return _tokenize(eql)
@@ -148,36 +148,91 @@ def find_subject_ptrs(ast: qlast.Base) -> Set[str]:
     return ptrs
 
 
+def _replace_paths(
+    node: Any,
+    replace: Callable[[qlast.Path], qlast.Base],
+    *,
+    include_self: bool = True,
+) -> Any:
+    """Return *node* with all paths in it replaced by *replace*.
+
+    Only the nodes on the way to a replaced path are copied, the rest
+    of the tree is shared with *node*.  Like find_paths(), this only
+    looks at the descendants of *node* unless *include_self* is set.
+    """
+    if isinstance(node, list):
+        items = [_replace_paths(n, replace) for n in node]
+        if any(new is not old for new, old in zip(items, node)):
+            return items
+        return node
+    elif not ast.is_ast_node(node):
+        return node
+
+    changes: Dict[str, Any] = {}
+    for field, value in ast.iter_fields(node, include_meta=False):
+        if node._fields[field].hidden:
+            continue
+        new_value = _replace_paths(value, replace)
+        if new_value is not value:
+            changes[field] = new_value
+
+    if changes:
+        node = copy.copy(node)
+        for field, new_value in changes.items():
+            setattr(node, field, new_value)
+
+    if include_self and isinstance(node, qlast.Path) and node.steps:
+        return replace(node)
+    else:
+        return node
+
+
+def _replace_steps(
+    path: qlast.Path,
+    start: int,
+    end: int,
+    new_step: qlast.Base,
+) -> qlast.Path:
+    path = copy.copy(path)
+    path.steps = [*path.steps[:start], new_step, *path.steps[end:]]
+    return path
+
+
 def subject_paths_substitute(
     ast: qlast.Base_T,
     subject_ptrs: Dict[str, qlast.Expr],
 ) -> qlast.Base_T:
-    ast = copy.deepcopy(ast)
-    for path in find_paths(ast):
-        if path.partial and isinstance(path.steps[0], qlast.Ptr):
-            path.steps[0] = subject_paths_substitute(
-                subject_ptrs[path.steps[0].ptr.name],
+    def replace(path: qlast.Path) -> qlast.Base:
+        step0 = path.steps[0]
+        if path.partial and isinstance(step0, qlast.Ptr):
+            return _replace_steps(path, 0, 1, subject_paths_substitute(
+                subject_ptrs[step0.ptr.name],
                 subject_ptrs,
-            )
+            ))
         elif (
-            isinstance(path.steps[0], qlast.Subject)
-            and len(path.steps)
+            isinstance(step0, qlast.Subject)
+            and len(path.steps) > 1
             and isinstance(path.steps[1], qlast.Ptr)
         ):
-            path.steps[0:2] = [subject_paths_substitute(
+            return _replace_steps(path, 0, 2, subject_paths_substitute(
                 subject_ptrs[path.steps[1].ptr.name],
                 subject_ptrs,
-            )]
-    return ast
+            ))
+        else:
+            return path
+
+    return _replace_paths(ast, replace, include_self=False)
 
 
 def subject_substitute(
         ast: qlast.Base_T, new_subject: qlast.Expr) -> qlast.Base_T:
-    ast = copy.deepcopy(ast)
-    for path in find_paths(ast):
+    def replace(path: qlast.Path) -> qlast.Base:
         if isinstance(path.steps[0], qlast.Subject):
-            path.steps[0] = new_subject
-    return ast
+            return _replace_steps(path, 0, 1, new_subject)
+        else:
+            return path
+
+    return _replace_paths(ast, replace, include_self=False)
 
 
 def contains_dml(ql_expr: qlast.Base) -> bool:
@@ -115,6 +115,8 @@ class OutputVar(ImmutableBaseExpr):
 class EdgeQLPathInfo(Base):
     """A general mixin providing EdgeQL-specific metadata on certain nodes."""
 
+    __abstract_node__ = True
+
     # Ignore the below fields in AST visitor/transformer.
     __ast_meta__ = {
         'path_scope', 'path_outputs', 'path_id', 'is_distinct',
@@ -252,9 +254,9 @@ class TupleElementBase(ImmutableBase):
     name: typing.Optional[typing.Union[OutputVar, str]]
 
     def __init__(self, path_id: irast.PathId,
-                 name: typing.Optional[typing.Union[OutputVar, str]]=None):
-        self.path_id = path_id
-        self.name = name
+                 name: typing.Optional[typing.Union[OutputVar, str]]=None,
+                 **kwargs) -> None:
+        super().__init__(path_id=path_id, name=name, **kwargs)
 
     def __repr__(self):
         return f'<{self.__class__.__name__} ' \
@@ -267,8 +269,7 @@ class TupleElement(TupleElementBase):
 
     def __init__(self, path_id: irast.PathId, val: BaseExpr, *,
                  name: typing.Optional[typing.Union[OutputVar, str]]=None):
-        super().__init__(path_id, name)
-        self.val = val
+        super().__init__(path_id, name, val=val)
 
     def __repr__(self):
         return f'<{self.__class__.__name__} ' \
@@ -285,10 +286,8 @@ class TupleVarBase(OutputVar):
     def __init__(self, elements: typing.List[TupleElementBase], *,
                  named: bool=False, nullable: bool=False,
                  typeref: typing.Optional[irast.TypeRef]=None):
-        self.elements = elements
-        self.named = named
-        self.nullable = nullable
-        self.typeref = typeref
+        super().__init__(elements=elements, named=named, nullable=nullable,
+                         typeref=typeref)
 
     def __repr__(self):
         return f'<{self.__class__.__name__} [{self.elements!r}]'
@@ -301,10 +300,8 @@ class TupleVar(TupleVarBase):
     def __init__(self, elements: typing.List[TupleElement], *,
                  named: bool=False, nullable: bool=False,
                  typeref: typing.Optional[irast.TypeRef]=None):
-        self.elements = elements
-        self.named = named
-        self.nullable = nullable
-        self.typeref = typeref
+        super().__init__(elements, named=named, nullable=nullable,
+                         typeref=typeref)
 
 
 class BaseParamRef(ImmutableBaseExpr):
@@ -26,6 +26,7 @@ from edb.pgsql import ast as pgast
 from edb.common.ast import codegen
 from edb.common import exceptions
 from edb.common import markup
+from edb.common import typeutils
 
 
 class SQLSourceGeneratorContext(markup.MarkupExceptionContext):
@@ -62,9 +63,51 @@ class SQLSourceGeneratorError(errors.InternalServerError):
 
 
 class SQLSourceGenerator(codegen.SourceGenerator):
+
+    # Visitor functions by node class, resolved on first use.
+    _visitors = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._visitors = {}
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.param_index = {}
+        if not self.pretty:
+            self.write = self._write_compact
+
+    def visit(self, node):
+        try:
+            visitor = self._visitors[node.__class__]
+        except KeyError:
+            visitor = self._resolve_visitor(node)
+        return visitor(self, node)
+
+    @classmethod
+    def _resolve_visitor(cls, node):
+        if typeutils.is_container(node):
+            visitor = cls.container_visit
+        else:
+            visitor = getattr(
+                cls, 'visit_' + node.__class__.__name__, cls.generic_visit)
+        cls._visitors[node.__class__] = visitor
+        return visitor
+
+    def _write_compact(self, *x, delimiter=None):
+        # write() without the pretty-printing bookkeeping: line breaks
+        # and indentation are collapsed into a single space.
+        if self.new_lines:
+            self.result.append(' ')
+            self.new_lines = 0
+        for chunk in x:
+            if not isinstance(chunk, str):
+                raise ValueError(
+                    'invalid text chunk in codegen: {!r}'.format(chunk))
+        if delimiter:
+            self.result.append(delimiter.join(x))
+        else:
+            self.result.extend(x)
 
     @classmethod
     def to_source(
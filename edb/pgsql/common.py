@@ -78,6 +78,9 @@ def quote_bytea_literal(data: bytes) -> str:
         return "''::bytea"
 
 
+# Identifiers repeat a lot in generated SQL (column names are
+# object ids, range variable aliases are reused across queries).
+@functools.lru_cache(maxsize=4096)
 def needs_quoting(string):
     isalnum = (string and not string[0].isdecimal() and
                string.replace('_', 'a').isalnum())
@@ -223,7 +226,7 @@ def get_pointer_backend_name(id, module_name, *, catenate=False, aspect=None):
     if aspect is None:
         aspect = 'table'
 
-    if aspect not in ('table', 'index', 'inhview'):
+    if aspect not in ('table', 'index', 'target-index', 'inhview'):
         raise ValueError(
             f'unexpected aspect for pointer backend name: {aspect!r}')
 
@@ -300,7 +303,7 @@ def get_function_backend_name(name, backend_name, catenate=False):
 
 def get_constraint_backend_name(
         id, module_name, catenate=True, *, aspect=None):
-    if aspect not in ('trigproc',):
+    if aspect not in ('trigproc', 'stmttrigproc'):
         raise ValueError(
             f'unexpected aspect for constraint backend name: {aspect!r}')
 
@@ -23,8 +23,10 @@ from typing import *
 
 from edb import errors
 
+from edb.common import ast
 from edb.common import debug
 from edb.common import exceptions as edgedb_error
+from edb.common import phasetimer
 
 from edb.ir import ast as irast
 
@@ -109,16 +111,21 @@ def compile_ir_to_sql(
     explicit_top_cast: Optional[irast.TypeRef]=None,
     use_named_params: bool=False,
     expected_cardinality_one: bool=False,
-    pretty: bool=True
+    pretty: bool=True,
+    phase_timer: Optional[phasetimer.PhaseTimer]=None,
 ) -> Tuple[str, Dict[str, pgast.Param]]:
 
-    qtree = compile_ir_to_sql_tree(
-        ir_expr,
-        output_format=output_format,
-        ignore_shapes=ignore_shapes,
-        explicit_top_cast=explicit_top_cast,
-        use_named_params=use_named_params,
-        expected_cardinality_one=expected_cardinality_one)
+    if phase_timer is None:
+        phase_timer = phasetimer.PhaseTimer()
+
+    with phase_timer.phase('ir_to_sql'):
+        qtree = compile_ir_to_sql_tree(
+            ir_expr,
+            output_format=output_format,
+            ignore_shapes=ignore_shapes,
+            explicit_top_cast=explicit_top_cast,
+            use_named_params=use_named_params,
+            expected_cardinality_one=expected_cardinality_one)
 
     if debug.flags.edgeql_compile:  # pragma: no cover
         debug.header('SQL Tree')
@@ -130,8 +137,9 @@ def compile_ir_to_sql(
         argmap = {}
 
     # Generate query text
-    codegen = _run_codegen(qtree, pretty=pretty)
-    sql_text = ''.join(codegen.result)
+    with phase_timer.phase('codegen'):
+        codegen = _run_codegen(qtree, pretty=pretty)
+        sql_text = ''.join(codegen.result)
 
     if debug.flags.edgeql_compile:  # pragma: no cover
         debug.header('SQL')
@@ -164,6 +172,28 @@ def _run_codegen(
     return codegen
 
 
+def get_path_aliases(qtree: pgast.Base) -> Dict[str, irast.PathId]:
+    """Return a map of range var aliases in *qtree* to their path ids.
+
+    The aliases are the names under which the relations appear in the
+    generated SQL (and in the backend query plans of it), and the path
+    ids are those of the EdgeQL sets the relations produce.
+    """
+    aliases = {}
+
+    rvars = ast.find_children(
+        qtree,
+        lambda n: isinstance(n, (pgast.RelRangeVar, pgast.RangeSubselect)),
+        force_traversal=True,
+    )
+    for rvar in rvars:
+        path_id = getattr(rvar.query, 'path_id', None)
+        if rvar.alias is not None and path_id is not None:
+            aliases[rvar.alias.aliasname] = path_id
+
+    return aliases
+
+
 def new_external_rvar(
     *,
     rel_name: Tuple[str, ...],
@@ -59,7 +59,8 @@ class TextSearchIndexColumn(IndexColumn):
 class Index(tables.InheritableTableObject):
     def __init__(
             self, name, table_name, unique=True, expr=None, predicate=None,
-            inherit=False, metadata=None, columns=None):
+            inherit=False, metadata=None, columns=None, method=None,
+            include=None):
         super().__init__(inherit=inherit, metadata=metadata)
 
         assert table_name[1] != 'feature'
@@ -72,6 +73,8 @@ class Index(tables.InheritableTableObject):
         self.predicate = predicate
         self.unique = unique
         self.expr = expr
+        self.method = method
+        self.include = list(include) if include else []
 
         if self.name_in_catalog != self.name:
             self.add_metadata('fullname', self.name)
@@ -151,20 +154,31 @@ class Index(tables.InheritableTableObject):
                 ;
         ''')
 
-    def creation_code(self, block: base.PLBlock) -> str:
+    def creation_code(
+        self,
+        block: base.PLBlock,
+        *,
+        concurrently: bool = False,
+    ) -> str:
         if self.expr:
             expr = self.expr
         else:
             expr = ', '.join(qi(c) for c in self.columns)
 
         code = '''
-            CREATE {unique} INDEX {name}
-                ON {table} ({expr}) {predicate}'''.format(
+            CREATE {unique} INDEX {concurrently} {name}
+                ON {table} {method}({expr}) {include} {predicate}'''.format(
 
             unique='UNIQUE' if self.unique else '',
+            concurrently='CONCURRENTLY' if concurrently else '',
             name=qn(self.name_in_catalog),
             table=qn(*self.table_name),
+            method=('USING {} '.format(self.method)
+                    if self.method else ''),
             expr=expr,
+            include=('INCLUDE ({})'.format(
+                     ', '.join(qi(c) for c in self.include))
+                     if self.include else ''),
             predicate=('WHERE {}'.format(self.predicate)
                        if self.predicate else '')
         )
@@ -223,6 +237,7 @@ class Index(tables.InheritableTableObject):
         return self.__class__(
             name=self.name, table_name=self.table_name, unique=self.unique,
             expr=self.expr, predicate=self.predicate, columns=self.columns,
+            method=self.method, include=self.include,
             metadata=self.metadata.copy()
             if self.metadata is not None else None)
 
@@ -244,11 +259,17 @@ class TextSearchIndex(Index):
         super().__init__(name, table_name)
         self.add_columns(columns)
 
-    def creation_code(self, block: base.PLBlock) -> str:
+    def creation_code(
+        self,
+        block: base.PLBlock,
+        *,
+        concurrently: bool = False,
+    ) -> str:
         code = \
-            'CREATE INDEX %(name)s ON %(table)s ' \
+            'CREATE INDEX %(concurrently)s %(name)s ON %(table)s ' \
             'USING gin((%(cols)s)) %(predicate)s' % \
-            {'name': qn(self.name),
+            {'concurrently': 'CONCURRENTLY' if concurrently else '',
+             'name': qn(self.name),
              'table': qn(*self.table_name),
              'cols': ' || '.join(c.code(block) for c in self.columns),
              'predicate': ('WHERE %s' % self.predicate
@@ -277,15 +298,21 @@ class IndexExists(base.Condition):
 
 
 class CreateIndex(ddl.CreateObject):
-    def __init__(self, index, *, conditional=False, **kwargs):
+    def __init__(
+            self, index, *, conditional=False, concurrently=False, **kwargs):
         super().__init__(index, **kwargs)
         self.index = index
+        # CREATE INDEX CONCURRENTLY cannot run in a transaction
+        # block, so concurrent index creation code must be executed
+        # as a separate statement.
+        self.concurrently = concurrently
         if conditional:
             self.neg_conditions.add(
                 IndexExists((index.table_name[0], index.name_in_catalog)))
 
     def code(self, block: base.PLBlock) -> str:
-        return self.index.creation_code(block)
+        return self.index.creation_code(
+            block, concurrently=self.concurrently)
 
     @classmethod
     def pl_code(cls, index_desc_var: str, block: base.PLBlock) -> str:
@@ -337,15 +364,21 @@ class RenameIndexSimple(ddl.DDLOperation):
 
 
 class DropIndex(ddl.DropObject):
-    def __init__(self, index, *, conditional=False, **kwargs):
+    def __init__(
+            self, index, *, conditional=False, concurrently=False,
+            if_exists=False, **kwargs):
         super().__init__(index, **kwargs)
+        self.concurrently = concurrently
+        self.if_exists = if_exists
         if conditional:
             self.conditions.add(
                 IndexExists((index.table_name[0], index.name_in_catalog)))
 
     def code(self, block: base.PLBlock) -> str:
         name = qn(self.object.table_name[0], self.object.name_in_catalog)
-        return f'DROP INDEX {name}'
+        concurrently = ' CONCURRENTLY' if self.concurrently else ''
+        if_exists = ' IF EXISTS' if self.if_exists else ''
+        return f'DROP INDEX{concurrently}{if_exists} {name}'
 
     @classmethod
     def pl_code(cls, index_desc_var: str, block: base.PLBlock) -> str:
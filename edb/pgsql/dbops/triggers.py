@@ -58,7 +58,8 @@ class Trigger(tables.InheritableTableObject):
     def __init__(
             self, name, *, table_name, events, timing='after',
             granularity='row', procedure, condition=None, is_constraint=False,
-            deferred=False, inherit=False, metadata=None):
+            deferred=False, new_table=None, old_table=None, inherit=False,
+            metadata=None):
         super().__init__(inherit=inherit, metadata=metadata)
 
         self.name = name
@@ -70,6 +71,9 @@ class Trigger(tables.InheritableTableObject):
         self.condition = condition
         self.is_constraint = is_constraint
         self.deferred = deferred
+        # Names of the transition tables of the old and the new rows.
+        self.new_table = new_table
+        self.old_table = old_table
 
         if is_constraint and granularity != 'row':
             msg = 'invalid granularity for ' \
@@ -79,6 +83,11 @@ class Trigger(tables.InheritableTableObject):
         if deferred and not is_constraint:
             raise ValueError('only constraint triggers can be deferred')
 
+        if (new_table or old_table) and (is_constraint or timing != 'after'):
+            raise ValueError(
+                'only non-constraint AFTER triggers can have '
+                'transition tables')
+
     def rename(self, new_name):
         self.name = new_name
 
@@ -174,6 +183,7 @@ class Trigger(tables.InheritableTableObject):
             timing=self.timing, granularity=self.granularity,
             procedure=self.procedure, condition=self.condition,
             is_constraint=self.is_constraint, deferred=self.deferred,
+            new_table=self.new_table, old_table=self.old_table,
             metadata=self.metadata.copy())
 
     def __repr__(self):
@@ -196,10 +206,17 @@ class CreateTrigger(ddl.CreateObject):
                 TriggerExists(self.trigger.name, self.trigger.table_name))
 
     def code(self, block: base.PLBlock) -> str:
+        referencing = []
+        if self.trigger.old_table:
+            referencing.append(f'OLD TABLE AS {qi(self.trigger.old_table)}')
+        if self.trigger.new_table:
+            referencing.append(f'NEW TABLE AS {qi(self.trigger.new_table)}')
+
         return textwrap.dedent('''\
             CREATE {constr}TRIGGER {trigger_name} {timing} {events}
                    ON {table_name}
                    {deferred}
+                   {referencing}
                    FOR EACH {granularity} {condition}
                    EXECUTE PROCEDURE {procedure}
         ''').format(
@@ -210,6 +227,8 @@ class CreateTrigger(ddl.CreateObject):
             table_name=qn(*self.trigger.table_name),
             deferred=('DEFERRABLE INITIALLY DEFERRED'
                       if self.trigger.deferred else ''),
+            referencing=('REFERENCING ' + ' '.join(referencing)
+                         if referencing else ''),
             granularity=self.trigger.granularity, condition=(
                 'WHEN ({})'.format(self.trigger.condition)
                 if self.trigger.condition else ''),
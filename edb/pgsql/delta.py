@@ -62,6 +62,7 @@ from edb.common import ordered
 from edb.common import topological
 from edb.common import uuidgen
 
+from edb.ir import ast as irast
 from edb.ir import pathid as irpathid
 from edb.ir import typeutils as irtyputils
 from edb.ir import utils as irutils
@@ -1749,23 +1750,36 @@ class CompositeObjectMetaCommand(ObjectMetaCommand):
 
 
 class IndexCommand(sd.ObjectCommand, metaclass=CommandMeta):
-    pass
-
-
-class CreateIndex(IndexCommand, CreateObject, adapts=s_indexes.CreateIndex):
 
-    def apply(
+    # PostgreSQL access methods for index kinds.
+    index_methods = {
+        s_indexes.IndexKind.BTree: 'btree',
+        s_indexes.IndexKind.Hash: 'hash',
+        s_indexes.IndexKind.GIN: 'gin',
+        s_indexes.IndexKind.GiST: 'gist',
+        s_indexes.IndexKind.SPGiST: 'spgist',
+        s_indexes.IndexKind.BRIN: 'brin',
+    }
+
+    # GIN and GiST have no default operator classes for text, so
+    # index str expressions with trigrams, which support LIKE and
+    # ILIKE searches.
+    str_opclasses = {
+        s_indexes.IndexKind.GIN: 'edgedbext.gin_trgm_ops',
+        s_indexes.IndexKind.GiST: 'edgedbext.gist_trgm_ops',
+    }
+
+    def _compile_index_expr(
         self,
         schema: s_schema.Schema,
         context: sd.CommandContext,
-    ) -> s_schema.Schema:
-        schema = CreateObject.apply(self, schema, context)
-        index = self.scls
+        subject: s_indexes.IndexableSubject,
+        expr: s_expr.Expression,
+    ) -> Tuple[irast.Statement, List[pg_ast.BaseExpr]]:
+        """Compile an index expression into a list of SQL expressions.
 
-        parent_ctx = context.get_ancestor(
-            s_indexes.IndexSourceCommandContext, self)
-        subject_name = parent_ctx.op.classname
-        subject = schema.get(subject_name, default=None)
+        Tuples produce a SQL expression for each element.
+        """
         if not isinstance(subject, s_pointers.Pointer):
             singletons = [subject]
             path_prefix_anchor = ql_ast.Subject().name
@@ -1773,11 +1787,10 @@ class CreateIndex(IndexCommand, CreateObject, adapts=s_indexes.CreateIndex):
             singletons = []
             path_prefix_anchor = None
 
-        index_expr = index.get_expr(schema)
-        ir = index_expr.irast
+        ir = expr.irast
         if ir is None:
-            index_expr = type(index_expr).compiled(
-                index_expr,
+            expr = type(expr).compiled(
+                expr,
                 schema=schema,
                 options=qlcompiler.CompilerOptions(
                     modaliases=context.modaliases,
@@ -1788,32 +1801,152 @@ class CreateIndex(IndexCommand, CreateObject, adapts=s_indexes.CreateIndex):
                     apply_query_rewrites=not context.stdmode,
                 ),
             )
-            ir = index_expr.irast
-
-        table_name = common.get_backend_name(
-            schema, subject, catenate=False)
+            ir = expr.irast
 
         sql_tree = compiler.compile_ir_to_sql_tree(
             ir.expr, singleton_mode=True)
-        sql_expr = codegen.SQLSourceGenerator.to_source(sql_tree)
 
         if isinstance(sql_tree, pg_ast.ImplicitRowExpr):
-            # Trim the parentheses to avoid PostgreSQL choking on double
-            # parentheses. since it expects only a single set around the column
-            # list.
-            sql_expr = sql_expr[1:-1]
+            return ir, list(sql_tree.args)
+        else:
+            return ir, [sql_tree]
+
+    def _make_pg_index(
+        self,
+        schema: s_schema.Schema,
+        context: sd.CommandContext,
+        index: s_indexes.Index,
+        subject: s_indexes.IndexableSubject,
+    ) -> dbops.Index:
+        kind = index.get_kind(schema)
+
+        ir, sql_exprs = self._compile_index_expr(
+            schema, context, subject, index.get_expr(schema))
+
+        # The expression type may be a tuple that only exists in
+        # the schema the expression was compiled in.
+        ir_schema = ir.schema
+        expr_type = ir.stype
+        if isinstance(expr_type, s_types.Tuple):
+            expr_types = list(expr_type.get_subtypes(ir_schema))
+        else:
+            expr_types = [expr_type]
+
+        str_t = ir_schema.get('std::str', type=s_scalars.ScalarType)
+        opclass = self.str_opclasses.get(kind)
+
+        columns = []
+        for i, sql_expr in enumerate(sql_exprs):
+            column = codegen.SQLSourceGenerator.to_source(sql_expr)
+            if (
+                opclass is not None
+                and i < len(expr_types)
+                and isinstance(expr_types[i], s_scalars.ScalarType)
+                and expr_types[i].issubclass(ir_schema, str_t)
+                and not expr_types[i].is_enum(ir_schema)
+            ):
+                column = f'{column} {opclass}'
+            columns.append(column)
+
+        predicate = index.get_predicate(schema)
+        if predicate is not None:
+            _, pred_exprs = self._compile_index_expr(
+                schema, context, subject, predicate)
+            sql_predicate = codegen.SQLSourceGenerator.to_source(
+                pred_exprs[0])
+        else:
+            sql_predicate = None
+
+        include = index.get_include(schema)
+        include_columns = []
+        if include is not None:
+            _, incl_exprs = self._compile_index_expr(
+                schema, context, subject, include)
+            for incl_expr in incl_exprs:
+                if (
+                    not isinstance(incl_expr, pg_ast.ColumnRef)
+                    or len(incl_expr.name) != 1
+                ):
+                    raise errors.SchemaDefinitionError(
+                        f'{index.get_verbosename(schema)} can only include '
+                        f'properties stored in the table of '
+                        f'{subject.get_verbosename(schema)}',
+                    )
+                include_columns.append(incl_expr.name[0])
 
+        table_name = common.get_backend_name(
+            schema, subject, catenate=False)
         module_name = index.get_name(schema).module
         index_name = common.get_index_backend_name(
             index.id, module_name, catenate=False)
-        pg_index = dbops.Index(
-            name=index_name[1], table_name=table_name, expr=sql_expr,
+
+        return dbops.Index(
+            name=index_name[1], table_name=table_name,
+            expr=', '.join(columns), predicate=sql_predicate,
+            method=self.index_methods[kind], include=include_columns,
             unique=False, inherit=True,
             metadata={'schemaname': str(index.get_name(schema))})
-        self.pgops.add(dbops.CreateIndex(pg_index, priority=3))
+
+
+class CreateIndex(IndexCommand, CreateObject, adapts=s_indexes.CreateIndex):
+
+    def apply(
+        self,
+        schema: s_schema.Schema,
+        context: sd.CommandContext,
+    ) -> s_schema.Schema:
+        schema = CreateObject.apply(self, schema, context)
+        index = self.scls
+
+        parent_ctx = context.get_ancestor(
+            s_indexes.IndexSourceCommandContext, self)
+        subject_name = parent_ctx.op.classname
+        subject = schema.get(subject_name, default=None)
+
+        pg_index = self._make_pg_index(schema, context, index, subject)
+        if self._can_build_online(schema, context, index, subject):
+            # The index is built concurrently before the DDL
+            # transaction runs, so here we only need to record its
+            # metadata.  This also means that the index only becomes
+            # visible in the schema once it has been built.
+            delta_root = context.get_ancestor(sd.DeltaRootContext, self).op
+            delta_root.online_index_builds.append(pg_index)
+            self.pgops.add(dbops.SetMetadata(
+                pg_index, pg_index.metadata, priority=3))
+        else:
+            self.pgops.add(dbops.CreateIndex(pg_index, priority=3))
 
         return schema
 
+    def _can_build_online(
+        self,
+        schema: s_schema.Schema,
+        context: sd.CommandContext,
+        index: s_indexes.Index,
+        subject: s_indexes.IndexableSubject,
+    ) -> bool:
+        if not context.online_index_build:
+            return False
+
+        # Tables and columns created by the same command are empty,
+        # and do not exist yet when the online build runs, so indexes
+        # on them are created in the DDL transaction as usual.
+        orig_schema = context.top().original_schema
+        if orig_schema.get_by_id(subject.id, None) is None:
+            return False
+
+        for field in ('expr', 'predicate', 'include'):
+            expr = index.get_field_value(schema, field)
+            if expr is None:
+                continue
+            if expr.refs is None:
+                return False
+            for ref in expr.refs.objects(schema):
+                if orig_schema.get_by_id(ref.id, None) is None:
+                    return False
+
+        return True
+
 
 class RenameIndex(IndexCommand, RenameObject, adapts=s_indexes.RenameIndex):
 
@@ -1837,7 +1970,25 @@ class AlterIndexOwned(
 
 
 class AlterIndex(IndexCommand, AlterObject, adapts=s_indexes.AlterIndex):
-    pass
+
+    def apply(
+        self,
+        schema: s_schema.Schema,
+        context: sd.CommandContext,
+    ) -> s_schema.Schema:
+        schema = AlterObject.apply(self, schema, context)
+        index = self.scls
+
+        if self.has_attribute_value('include'):
+            # The included properties have changed, so the index
+            # has to be rebuilt.  The kind and the predicate are
+            # a part of the identity of the index and never change.
+            subject = index.get_subject(schema)
+            pg_index = self._make_pg_index(schema, context, index, subject)
+            self.pgops.add(dbops.DropIndex(pg_index, priority=3))
+            self.pgops.add(dbops.CreateIndex(pg_index, priority=3))
+
+        return schema
 
 
 class DeleteIndex(IndexCommand, DeleteObject, adapts=s_indexes.DeleteIndex):
@@ -2300,6 +2451,13 @@ class PointerMetaCommand(MetaCommand, sd.ObjectCommand,
 
             self.pgops.add(alter_table)
 
+            if (
+                isinstance(self, LinkMetaCommand)
+                and ptr.get_index_target(schema)
+            ):
+                self.pgops.add(dbops.CreateIndex(
+                    self._get_target_index(ptr, schema, inline=True)))
+
             update_qry = textwrap.dedent(f'''\
                 UPDATE {tab} AS {qi(orig_rel_alias)}
                 SET {qi(target_col)} = ({conv_sql_expr})
@@ -3001,12 +3159,6 @@ class LinkMetaCommand(CompositeObjectMetaCommand, PointerMetaCommand):
 
         ct = dbops.CreateTable(table=table)
 
-        index_name = common.edgedb_name_to_pg_name(
-            str(link.get_name(schema)) + 'target_id_default_idx')
-        index = dbops.Index(index_name, new_table_name, unique=False)
-        index.add_columns([tgt_col])
-        ci = dbops.CreateIndex(index)
-
         if conditional:
             c = dbops.CommandGroup(
                 neg_conditions=[dbops.TableExists(new_table_name)])
@@ -3014,7 +3166,10 @@ class LinkMetaCommand(CompositeObjectMetaCommand, PointerMetaCommand):
             c = dbops.CommandGroup()
 
         c.add_command(ct)
-        c.add_command(ci)
+
+        if link.get_index_target(schema):
+            index = cls._get_target_index(link, schema, inline=False)
+            c.add_command(dbops.CreateIndex(index))
 
         c.add_command(dbops.Comment(table, str(link.get_name(schema))))
 
@@ -3030,6 +3185,60 @@ class LinkMetaCommand(CompositeObjectMetaCommand, PointerMetaCommand):
 
         return create_c
 
+    @classmethod
+    def _get_target_index(cls, link, schema, *, inline):
+        """Return the index on the target column of *link*.
+
+        The target is stored either inline, in a column of the source
+        object table, or in the "target" column of the link table.
+        """
+        if inline:
+            ptr_stor_info = types.get_pointer_storage_info(
+                link, schema=schema)
+            table_name = common.get_backend_name(
+                schema, link.get_source(schema), catenate=False)
+            column_name = ptr_stor_info.column_name
+            aspect = 'index'
+        else:
+            table_name = common.get_backend_name(
+                schema, link, catenate=False)
+            column_name = 'target'
+            aspect = 'target-index'
+
+        index_name = common.get_backend_name(
+            schema, link, catenate=False, aspect=aspect)[1]
+
+        return dbops.Index(
+            name=index_name, table_name=table_name,
+            unique=False, columns=[column_name], inherit=True)
+
+    def _update_target_indexes(self, link, schema):
+        index_target = link.get_index_target(schema)
+
+        ptr_stor_info = types.get_pointer_storage_info(
+            link, resolve_type=False, schema=schema)
+
+        # A single link with link properties is stored both inline
+        # and in a link table, so both indexes may need updating.
+        inline = []
+        if (
+            not link.generic(schema)
+            and not link.is_pure_computable(schema)
+            and ptr_stor_info.table_type == 'ObjectType'
+            and has_table(link.get_source(schema), schema)
+        ):
+            inline.append(True)
+        if has_table(link, schema):
+            inline.append(False)
+
+        for is_inline in inline:
+            index = self._get_target_index(link, schema, inline=is_inline)
+            if index_target:
+                self.pgops.add(dbops.CreateIndex(index, priority=3))
+            else:
+                self.pgops.add(dbops.DropIndex(
+                    index, conditional=True, priority=3))
+
     def schedule_endpoint_delete_action_update(
             self, link, orig_schema, schema, context):
         endpoint_delete_actions = context.get(
@@ -3082,8 +3291,6 @@ class CreateLink(LinkMetaCommand, adapts=s_links.CreateLink):
                 default_value = self.get_pointer_default(link, schema, context)
 
                 cols = self.get_columns(link, schema, default_value)
-                table_name = common.get_backend_name(
-                    schema, objtype.scls, catenate=False)
                 objtype_alter_table = objtype.op.get_alter_table(
                     schema, context)
 
@@ -3115,17 +3322,11 @@ class CreateLink(LinkMetaCommand, adapts=s_links.CreateLink):
                 if default_value is not None:
                     self.alter_pointer_default(link, schema, context)
 
-                index_name = common.get_backend_name(
-                    schema, link, catenate=False, aspect='index'
-                )[1]
-
-                pg_index = dbops.Index(
-                    name=index_name, table_name=table_name,
-                    unique=False, columns=[c.name for c in cols],
-                    inherit=True)
-
-                ci = dbops.CreateIndex(pg_index, priority=3)
-                extra_ops.append(ci)
+                if link.get_index_target(schema):
+                    pg_index = self._get_target_index(
+                        link, schema, inline=True)
+                    ci = dbops.CreateIndex(pg_index, priority=3)
+                    extra_ops.append(ci)
 
                 self.update_lineage_inhviews(schema, context, link)
 
@@ -3313,6 +3514,12 @@ class AlterLink(LinkMetaCommand, adapts=s_links.AlterLink):
                 self.schedule_endpoint_delete_action_update(
                     link, orig_schema, schema, context)
 
+            if (
+                link.get_index_target(orig_schema)
+                != link.get_index_target(schema)
+            ):
+                self._update_target_indexes(link, schema)
+
         return schema
 
 
@@ -3858,18 +4065,34 @@ class UpdateEndpointDeleteActions(MetaCommand):
             schema, target, catenate=False, aspect=aspect)
 
     def get_trigger_proc_text(self, target, links, *,
-                              disposition, inline, schema):
+                              disposition, inline, schema, deferred=False):
         if inline:
             return self._get_inline_link_trigger_proc_text(
-                target, links, disposition=disposition, schema=schema)
+                target, links, disposition=disposition, schema=schema,
+                deferred=deferred)
         else:
             return self._get_outline_link_trigger_proc_text(
-                target, links, disposition=disposition, schema=schema)
+                target, links, disposition=disposition, schema=schema,
+                deferred=deferred)
+
+    def _get_deleted_ids_cond(self, deferred):
+        """Return an SQL condition matching the ids of deleted objects.
+
+        Deferred triggers must be constraint triggers, which can only
+        be row-level, so they check the deleted row.  All other
+        triggers are statement-level and process all deleted objects
+        from the *old_table* transition table at once.
+        """
+        if deferred:
+            return '= OLD.id'
+        else:
+            return 'IN (SELECT id FROM old_table)'
 
     def _get_outline_link_trigger_proc_text(
-            self, target, links, *, disposition, schema):
+            self, target, links, *, disposition, schema, deferred=False):
 
         chunks = []
+        deleted_ids = self._get_deleted_ids_cond(deferred)
 
         DA = s_links.LinkTargetDeleteAction
 
@@ -3892,7 +4115,7 @@ class UpdateEndpointDeleteActions(MetaCommand):
                     FROM
                         {tables}
                     WHERE
-                        q.{near_endpoint} = OLD.{id}
+                        q.{near_endpoint} {deleted_ids}
                     LIMIT 1;
 
                     IF FOUND THEN
@@ -3916,7 +4139,7 @@ class UpdateEndpointDeleteActions(MetaCommand):
                     END IF;
                 ''').format(
                     tables=tables,
-                    id='id',
+                    deleted_ids=deleted_ids,
                     tgtname=target.get_displayname(schema),
                     near_endpoint=near_endpoint,
                     far_endpoint=far_endpoint,
@@ -3933,11 +4156,11 @@ class UpdateEndpointDeleteActions(MetaCommand):
                         DELETE FROM
                             {link_table}
                         WHERE
-                            {endpoint} = OLD.{id};
+                            {endpoint} {deleted_ids};
                     ''').format(
                         link_table=link_table,
                         endpoint=common.quote_ident(near_endpoint),
-                        id='id'
+                        deleted_ids=deleted_ids,
                     )
 
                     chunks.append(text)
@@ -3957,12 +4180,13 @@ class UpdateEndpointDeleteActions(MetaCommand):
                             {source_table}.{id} IN (
                                 SELECT source
                                 FROM {tables}
-                                WHERE target = OLD.{id}
+                                WHERE target {deleted_ids}
                             );
                     ''').format(
                         source_table=common.get_backend_name(schema, source),
                         id='id',
                         tables=tables,
+                        deleted_ids=deleted_ids,
                     )
 
                     chunks.append(text)
@@ -3976,14 +4200,17 @@ class UpdateEndpointDeleteActions(MetaCommand):
                 endname text;
             BEGIN
                 {chunks}
-                RETURN OLD;
+                RETURN {ret};
             END;
-        ''').format(chunks='\n\n'.join(chunks))
+        ''').format(
+            chunks='\n\n'.join(chunks),
+            ret='OLD' if deferred else 'NULL',
+        )
 
         return text
 
     def _get_inline_link_trigger_proc_text(
-            self, target, links, *, disposition, schema):
+            self, target, links, *, disposition, schema, deferred=False):
 
         if disposition == 'source':
             raise RuntimeError(
@@ -3991,6 +4218,7 @@ class UpdateEndpointDeleteActions(MetaCommand):
                 'not make sense for inline links')
 
         chunks = []
+        deleted_ids = self._get_deleted_ids_cond(deferred)
 
         DA = s_links.LinkTargetDeleteAction
 
@@ -4010,7 +4238,7 @@ class UpdateEndpointDeleteActions(MetaCommand):
                     FROM
                         {tables}
                     WHERE
-                        q.{near_endpoint} = OLD.{id}
+                        q.{near_endpoint} {deleted_ids}
                     LIMIT 1;
 
                     IF FOUND THEN
@@ -4034,7 +4262,7 @@ class UpdateEndpointDeleteActions(MetaCommand):
                     END IF;
                 ''').format(
                     tables=tables,
-                    id='id',
+                    deleted_ids=deleted_ids,
                     tgtname=target.get_displayname(schema),
                     near_endpoint=near_endpoint,
                     far_endpoint=far_endpoint,
@@ -4056,7 +4284,7 @@ class UpdateEndpointDeleteActions(MetaCommand):
                         SET
                             {qi(link_col)} = NULL
                         WHERE
-                            {qi(link_col)} = OLD.id;
+                            {qi(link_col)} {deleted_ids};
                     ''')
 
                     chunks.append(text)
@@ -4077,12 +4305,13 @@ class UpdateEndpointDeleteActions(MetaCommand):
                             {source_table}.{id} IN (
                                 SELECT source
                                 FROM {tables}
-                                WHERE target = OLD.{id}
+                                WHERE target {deleted_ids}
                             );
                     ''').format(
                         source_table=common.get_backend_name(schema, source),
                         id='id',
                         tables=tables,
+                        deleted_ids=deleted_ids,
                     )
 
                     chunks.append(text)
@@ -4097,9 +4326,12 @@ class UpdateEndpointDeleteActions(MetaCommand):
                 links text[];
             BEGIN
                 {chunks}
-                RETURN OLD;
+                RETURN {ret};
             END;
-        ''').format(chunks='\n\n'.join(chunks))
+        ''').format(
+            chunks='\n\n'.join(chunks),
+            ret='OLD' if deferred else 'NULL',
+        )
 
         return text
 
@@ -4279,15 +4511,24 @@ class UpdateEndpointDeleteActions(MetaCommand):
                 schema, objtype, disposition=disposition,
                 deferred=deferred, inline=inline)
 
-            trigger = dbops.Trigger(
-                name=trigger_name, table_name=table_name,
-                events=('delete',), procedure=proc_name,
-                is_constraint=True, inherit=True, deferred=deferred)
+            if deferred:
+                trigger = dbops.Trigger(
+                    name=trigger_name, table_name=table_name,
+                    events=('delete',), procedure=proc_name,
+                    is_constraint=True, inherit=True, deferred=True)
+            else:
+                # Immediate actions are applied to all objects deleted
+                # by a statement at once.
+                trigger = dbops.Trigger(
+                    name=trigger_name, table_name=table_name,
+                    events=('delete',), procedure=proc_name,
+                    granularity='statement', old_table='old_table',
+                    inherit=True)
 
             if links:
                 proc_text = self.get_trigger_proc_text(
                     objtype, links, disposition=disposition,
-                    inline=inline, schema=schema)
+                    inline=inline, schema=schema, deferred=deferred)
 
                 trig_func = dbops.Function(
                     name=proc_name, text=proc_text, volatility='volatile',
@@ -4698,6 +4939,9 @@ class DeltaRoot(MetaCommand, adapts=sd.DeltaRoot):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._renames = {}
+        # Indexes that must be built with CREATE INDEX CONCURRENTLY
+        # outside of the DDL transaction before it runs.
+        self.online_index_builds: List[dbops.Index] = []
 
     def apply(
         self,
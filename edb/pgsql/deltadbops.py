@@ -164,6 +164,11 @@ class SchemaConstraintTableConstraint(ConstraintCommon, dbops.TableConstraint):
         return common.get_backend_name(
             self._schema, self._constraint, catenate=False, aspect='trigproc')
 
+    def get_stmt_trigger_procname(self):
+        return common.get_backend_name(
+            self._schema, self._constraint, catenate=False,
+            aspect='stmttrigproc')
+
     def get_trigger_condition(self):
         chunks = []
 
@@ -229,6 +234,66 @@ class SchemaConstraintTableConstraint(ConstraintCommon, dbops.TableConstraint):
 
         return text
 
+    def get_stmt_trigger_proc_text(self):
+        """Return the text of the statement-level INSERT trigger function.
+
+        Instead of probing the table hierarchy once for every inserted
+        row, the whole batch in the ``new_rows`` transition table is
+        checked with a single join.  The function is STABLE, so the
+        table hierarchy is seen as it was before the statement, and
+        the inserted rows do not match themselves.
+        """
+        chunks = []
+
+        constr_name = self.constraint_name()
+        raw_constr_name = self.constraint_name(quote=False)
+
+        errmsg = 'duplicate key value violates unique ' \
+                 'constraint {constr}'.format(constr=constr_name)
+
+        for expr, origin_expr in zip(self._exprdata, self._origin_exprdata):
+            exprdata = expr['exprdata']
+            origin_exprdata = origin_expr['exprdata']
+
+            schemaname, tablename = self.get_origin_table_name()
+            text = '''
+                PERFORM
+                    TRUE
+                  FROM
+                    {table} AS existing_rows
+                    INNER JOIN new_rows
+                        ON {existing_expr} = {new_rows_expr}
+                  LIMIT 1;
+                IF FOUND THEN
+                  RAISE unique_violation
+                      USING
+                          TABLE = '{tablename}',
+                          SCHEMA = '{schemaname}',
+                          CONSTRAINT = '{constr}',
+                          MESSAGE = '{errmsg}',
+                          DETAIL = {detail};
+                END IF;
+            '''.format(
+                existing_expr=origin_exprdata['existing'],
+                detail=common.quote_literal(
+                    f"Key ({origin_exprdata['plain']}) already exists."
+                ),
+                new_rows_expr=exprdata['new_rows'],
+                table=common.qname(
+                    schemaname,
+                    tablename + "_" + common.get_aspect_suffix("inhview")),
+                schemaname=schemaname,
+                tablename=tablename,
+                constr=raw_constr_name,
+                errmsg=errmsg,
+            )
+
+            chunks.append(text)
+
+        text = 'BEGIN\n' + '\n\n'.join(chunks) + '\nRETURN NULL;\nEND;'
+
+        return text
+
     def is_multiconstraint(self):
         """Determine if multiple database constraints are needed."""
         return self._scope != 'row' and len(self._exprdata) > 1
@@ -406,10 +471,15 @@ class AlterTableConstraintBase(dbops.AlterTableBaseMixin, dbops.CommandGroup):
 
         cname = constraint.raw_constraint_name()
 
+        # Inserted rows are checked in bulk by a statement-level
+        # trigger, which makes large INSERTs much cheaper.  Updates
+        # keep using the row-level trigger, as its condition skips
+        # the rows that do not change the constrained expressions.
         ins_trigger_name = common.edgedb_name_to_pg_name(cname + '_instrigger')
         ins_trigger = dbops.Trigger(
             name=ins_trigger_name, table_name=table_name, events=('insert', ),
-            procedure=proc_name, is_constraint=True, inherit=True)
+            procedure=constraint.get_stmt_trigger_procname(),
+            granularity='statement', new_table='new_rows', inherit=True)
         cr_ins_trigger = dbops.CreateTrigger(ins_trigger)
         cmds.append(cr_ins_trigger)
 
@@ -441,7 +511,7 @@ class AlterTableConstraintBase(dbops.AlterTableBaseMixin, dbops.CommandGroup):
 
         ins_trigger = dbops.Trigger(
             name=ins_trigger_name, table_name=table_name, events=('insert', ),
-            procedure='null', is_constraint=True, inherit=True)
+            procedure='null', granularity='statement', inherit=True)
 
         rn_ins_trigger = dbops.AlterTriggerRenameTo(
             ins_trigger, new_name=new_ins_trg_name)
@@ -465,7 +535,7 @@ class AlterTableConstraintBase(dbops.AlterTableBaseMixin, dbops.CommandGroup):
         ins_trigger_name = common.edgedb_name_to_pg_name(cname + '_instrigger')
         ins_trigger = dbops.Trigger(
             name=ins_trigger_name, table_name=table_name, events=('insert', ),
-            procedure='null', is_constraint=True, inherit=True)
+            procedure='null', granularity='statement', inherit=True)
 
         drop_ins_trigger = dbops.DropTrigger(ins_trigger)
 
@@ -486,10 +556,25 @@ class AlterTableConstraintBase(dbops.AlterTableBaseMixin, dbops.CommandGroup):
             name=proc_name, text=proc_text, volatility='stable',
             returns='trigger', language='plpgsql')
 
-        return [dbops.CreateOrReplaceFunction(func)]
+        stmt_proc_name = constraint.get_stmt_trigger_procname()
+        stmt_proc_text = constraint.get_stmt_trigger_proc_text()
+
+        stmt_func = dbops.Function(
+            name=stmt_proc_name, text=stmt_proc_text, volatility='stable',
+            returns='trigger', language='plpgsql')
+
+        return [
+            dbops.CreateOrReplaceFunction(func),
+            dbops.CreateOrReplaceFunction(stmt_func),
+        ]
 
-    def drop_constr_trigger_function(self, proc_name):
-        return [dbops.DropFunction(name=proc_name, args=())]
+    def drop_constr_trigger_function(self, constraint):
+        return [
+            dbops.DropFunction(
+                name=constraint.get_trigger_procname(), args=()),
+            dbops.DropFunction(
+                name=constraint.get_stmt_trigger_procname(), args=()),
+        ]
 
     def create_constraint(self, constraint):
         # Add the constraint normally to our table
@@ -528,6 +613,11 @@ class AlterTableConstraintBase(dbops.AlterTableBaseMixin, dbops.CommandGroup):
                 name=old_proc_name, args=(), new_name=new_proc_name)
             self.add_command(rename_proc)
 
+            rename_stmt_proc = dbops.RenameFunction(
+                name=old_constraint.get_stmt_trigger_procname(), args=(),
+                new_name=new_constraint.get_stmt_trigger_procname())
+            self.add_command(rename_stmt_proc)
+
             self.add_commands(
                 self.create_constr_trigger_function(new_constraint))
 
@@ -551,8 +641,7 @@ class AlterTableConstraintBase(dbops.AlterTableBaseMixin, dbops.CommandGroup):
     def drop_constraint(self, constraint):
         if constraint.requires_triggers():
             self.add_commands(self.drop_constr_trigger(self.name, constraint))
-            proc_name = constraint.get_trigger_procname()
-            self.add_commands(self.drop_constr_trigger_function(proc_name))
+            self.add_commands(self.drop_constr_trigger_function(constraint))
 
         # Drop the constraint normally from our table
         #
@@ -2780,6 +2780,9 @@ async def create_pg_extensions(conn: asyncpg.Connection) -> None:
         dbops.CreateExtension(
             dbops.Extension(name='uuid-ossp', schema='edgedbext'),
         ),
+        dbops.CreateExtension(
+            dbops.Extension(name='pg_trgm', schema='edgedbext'),
+        ),
     ])
     block = dbops.PLTopBlock()
     commands.generate(block)
@@ -141,8 +141,20 @@ class ConstraintMech:
             ref.name[0] = 'OLD'
         old_expr = codegen.SQLSourceGenerator.to_source(sql_expr)
 
+        # The same expression over the transition table of the rows
+        # inserted by a statement, and over the rows already stored
+        # in the table, for statement-level constraint triggers.
+        for ref in refs:
+            ref.name[0] = 'new_rows'
+        new_rows_expr = codegen.SQLSourceGenerator.to_source(sql_expr)
+
+        for ref in refs:
+            ref.name[0] = 'existing_rows'
+        existing_expr = codegen.SQLSourceGenerator.to_source(sql_expr)
+
         exprdata = dict(
-            plain=plain_expr, plain_chunks=chunks, new=new_expr, old=old_expr)
+            plain=plain_expr, plain_chunks=chunks, new=new_expr, old=old_expr,
+            new_rows=new_rows_expr, existing=existing_expr)
 
         return dict(
             exprdata=exprdata, is_multicol=is_multicol, is_trivial=is_trivial)
@@ -125,7 +125,10 @@ class AnnotationCommand(sd.QualifiedObjectCommand[Annotation],
         field: str,
         astnode: Type[qlast.DDLOperation],
     ) -> Optional[str]:
-        if field in {'abstract', 'inheritable'}:
+        if (
+            field in {'abstract', 'inheritable'}
+            and issubclass(astnode, qlast.CreateAnnotation)
+        ):
             return field
         else:
             return super().get_ast_attr_for_field(field, astnode)
@@ -237,7 +237,10 @@ class CastCommand(sd.QualifiedObjectCommand[Cast],
         field: str,
         astnode: Type[qlast.DDLOperation],
     ) -> Optional[str]:
-        if field in {'allow_assignment', 'allow_implicit'}:
+        if (
+            field in {'allow_assignment', 'allow_implicit'}
+            and issubclass(astnode, qlast.CreateCast)
+        ):
             return field
         else:
             return super().get_ast_attr_for_field(field, astnode)
@@ -546,7 +546,13 @@ class ConstraintCommand(
         field: str,
         astnode: Type[qlast.DDLOperation],
     ) -> Optional[str]:
-        if field in ('subjectexpr', 'args'):
+        if (
+            field in ('subjectexpr', 'args')
+            and issubclass(astnode, qlast.ConcreteConstraintOp)
+        ) or (
+            field == 'subjectexpr'
+            and issubclass(astnode, qlast.CreateConstraint)
+        ):
             return field
         elif (
             field == 'delegated'
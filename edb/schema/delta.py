@@ -22,6 +22,7 @@ from typing import *
 import collections
 import collections.abc
 import contextlib
+import copy
 import functools
 import itertools
 import uuid
@@ -1075,6 +1076,7 @@ class CommandContext:
         ] = None,
         backend_runtime_params: Optional[Any] = None,
         compat_ver: Optional[verutils.Version] = None,
+        online_index_build: bool = False,
     ) -> None:
         self.stack: List[CommandContextToken[Command]] = []
         self._cache: Dict[Hashable, Any] = {}
@@ -1100,6 +1102,9 @@ class CommandContext:
             List[Tuple[Command, Command, List[str]]],
         ] = collections.defaultdict(list)
         self.compat_ver = compat_ver
+        # Whether indexes on existing tables should be built
+        # without blocking writes to them.
+        self.online_index_build = online_index_build
 
     @property
     def modaliases(self) -> Mapping[Optional[str], str]:
@@ -2999,6 +3004,11 @@ class RenameObject(AlterObjectFragment[so.Object_T]):
     ) -> s_expr.Expression:
         from edb.ir import ast as irast
 
+        # The parsed expression may be shared with other expressions
+        # of the same text, so fix up a private copy.
+        expr = s_expr.Expression(
+            text=expr.text, _qlast=copy.deepcopy(expr.qlast))
+
         # Recompile the expression with reference tracking on so that we
         # can clean up the ast.
         field = cmd.get_schema_metaclass().get_field(fn)
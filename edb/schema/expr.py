@@ -78,7 +78,7 @@ class Expression(struct.MixedRTStruct, so.ObjectContainer, s_abc.Expression):
     @property
     def qlast(self) -> qlast_.Base:
         if self._qlast is None:
-            self._qlast = qlparser.parse_fragment(self.text)
+            self._qlast = qlparser.parse_fragment_cached(self.text)
         return self._qlast
 
     @property
@@ -315,7 +315,7 @@ class ExpressionShell(so.Shell):
     @property
     def qlast(self) -> qlast_.Base:
         if self._qlast is None:
-            self._qlast = qlparser.parse_fragment(self.text)
+            self._qlast = qlparser.parse_fragment_cached(self.text)
         return self._qlast
 
     def __repr__(self) -> str:
@@ -691,6 +691,8 @@ class VolatilitySubject(so.Object):
 class CallableLike:
     """A minimal callable object interface required by multidispatch."""
 
+    id: uuid.UUID
+
     def has_inlined_defaults(self, schema: s_schema.Schema) -> bool:
         raise NotImplementedError
 
@@ -1104,8 +1106,11 @@ class CreateCallableObject(
         node: qlast.DDLOperation,
     ) -> None:
         super()._apply_fields_ast(schema, context, node)
-        params = self._get_params_ast(schema, context, node)
-        node.params = [p[1] for p in params]
+        # Concrete constraints are callable, but refer to their
+        # abstract constraint instead of declaring parameters.
+        if isinstance(node, qlast.CallableObjectCommand):
+            params = self._get_params_ast(schema, context, node)
+            node.params = [p[1] for p in params]
 
 
 class DeleteCallableObject(
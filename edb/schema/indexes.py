@@ -43,6 +43,9 @@ if TYPE_CHECKING:
     from . import types as s_types
 
 
+IndexKind = qltypes.IndexKind
+
+
 class Index(
     referencing.ReferencedInheritingObject,
     s_anno.AnnotationSubject,
@@ -59,6 +62,37 @@ class Index(
         ddl_identity=True,
     )
 
+    kind = so.SchemaField(
+        IndexKind,
+        default=IndexKind.BTree,
+        coerce=True,
+        compcoef=0.909,
+        allow_ddl_set=True,
+        ddl_identity=True,
+    )
+
+    # If set, only the objects for which this expression is true
+    # are indexed.
+    predicate = so.SchemaField(
+        s_expr.Expression,
+        default=None,
+        coerce=True,
+        compcoef=0.909,
+        allow_ddl_set=True,
+        ddl_identity=True,
+    )
+
+    # A property or a tuple of properties that are stored in the
+    # index alongside the indexed expression, but are not part
+    # of the key.
+    include = so.SchemaField(
+        s_expr.Expression,
+        default=None,
+        coerce=True,
+        compcoef=0.909,
+        allow_ddl_set=True,
+    )
+
     def __repr__(self) -> str:
         cls = self.__class__
         return '<{}.{} {!r} at 0x{:x}>'.format(
@@ -103,6 +137,52 @@ class IndexableSubject(so.InheritingObject):
         return self.add_classref(schema, 'indexes', index)
 
 
+_field_descs = {
+    'expr': 'expression',
+    'predicate': 'predicate',
+    'include': 'included properties',
+}
+
+
+def _identity_fields_ast(
+    kind: Optional[IndexKind],
+    predicate: Optional[s_expr.Expression],
+) -> List[qlast.SetField]:
+    # Along with the expression, the kind and the predicate
+    # identify an index, so DDL referring to an existing index
+    # must specify them when they are not the default.
+    fields: List[qlast.SetField] = []
+    if kind is not None and kind is not IndexKind.BTree:
+        fields.append(qlast.SetField(
+            name='kind',
+            value=qlast.StringConstant.from_python(str(kind)),
+        ))
+    if predicate is not None:
+        fields.append(qlast.SetField(
+            name='predicate',
+            value=predicate.qlast,
+        ))
+    return fields
+
+
+def _validate_included_properties(expr: qlast.Base) -> None:
+    elements = expr.elements if isinstance(expr, qlast.Tuple) else [expr]
+    for el in elements:
+        if not (
+            isinstance(el, qlast.Path)
+            and el.partial
+            and len(el.steps) == 1
+            and isinstance(el.steps[0], qlast.Ptr)
+            and el.steps[0].direction in {None, '>'}
+            and el.steps[0].type is None
+        ):
+            raise errors.SchemaDefinitionError(
+                'index can only include properties of the indexed '
+                'object, e.g. (.name, .created_at)',
+                context=el.context,
+            )
+
+
 class IndexSourceCommandContext:
     pass
 
@@ -174,9 +254,24 @@ class IndexCommand(
         expr_text = expr.text
 
         assert expr_text is not None
-        expr_qual = cls._name_qual_from_exprs(schema, (expr_text,))
-
-        ptrs = ast.find_children(astnode, lambda n: isinstance(n, qlast.Ptr))
+        exprs = [expr_text]
+
+        # Indexes of different kinds or with different predicates
+        # may be defined on the same expression.  The default kind
+        # and the absence of a predicate are not included, so that
+        # the names of plain indexes only depend on the expression.
+        identity = cls._identity_from_ast(schema, astnode, context)
+        kind = identity.get('kind')
+        if kind is not None and kind is not IndexKind.BTree:
+            exprs.append(f'kind:{kind}')
+        predicate = identity.get('predicate')
+        if predicate is not None:
+            exprs.append(f'predicate:{predicate.text}')
+
+        expr_qual = cls._name_qual_from_exprs(schema, exprs)
+
+        ptrs = ast.find_children(
+            astnode.expr, lambda n: isinstance(n, qlast.Ptr))
         ptr_name_qual = '_'.join(ptr.ptr.name for ptr in ptrs)
         if not ptr_name_qual:
             ptr_name_qual = 'idx'
@@ -191,6 +286,38 @@ class IndexCommand(
         quals = sn.quals_from_fullname(name)
         return tuple(quals[-2:])
 
+    @classmethod
+    def _identity_from_ast(
+        cls,
+        schema: s_schema.Schema,
+        astnode: qlast.IndexCommand,
+        context: sd.CommandContext,
+    ) -> Dict[str, Any]:
+        identity: Dict[str, Any] = {}
+        for cmd in astnode.commands:
+            if (
+                not isinstance(cmd, qlast.SetField)
+                or cmd.name not in {'kind', 'predicate'}
+                or cmd.value is None
+            ):
+                continue
+
+            if cmd.name == 'kind':
+                value = qlcompiler.evaluate_ast_to_python_val(
+                    cmd.value, schema=schema)
+                try:
+                    identity['kind'] = IndexKind(value)
+                except ValueError:
+                    raise errors.SchemaDefinitionError(
+                        f'{value!r} is not a valid index kind',
+                        context=cmd.context,
+                    ) from None
+            else:
+                identity['predicate'] = s_expr.Expression.from_ast(
+                    cmd.value, schema, context.modaliases)
+
+        return identity
+
     @overload
     def get_object(
         self,
@@ -229,8 +356,14 @@ class IndexCommand(
             referrer_ctx = self.get_referrer_context_or_die(context)
             referrer = referrer_ctx.scls
             expr = self.get_ddl_identity('expr')
+            desc = f'index on ({expr.text})'
+            if self.has_ddl_identity('kind'):
+                desc = f'{self.get_ddl_identity("kind")} {desc}'
+            if self.has_ddl_identity('predicate'):
+                predicate = self.get_ddl_identity('predicate')
+                desc = f'{desc} with predicate ({predicate.text})'
             raise errors.InvalidReferenceError(
-                f"index on ({expr.text}) does not exist on "
+                f"{desc} does not exist on "
                 f"{referrer.get_verbosename(schema)}"
             ) from None
 
@@ -253,8 +386,35 @@ class IndexCommand(
                 orig_text=orig_text,
             ),
         )
+        identity = cls._identity_from_ast(schema, astnode, context)
+        for field, value in identity.items():
+            cmd.set_ddl_identity(field, value)
         return cmd
 
+    def _apply_fields_ast(
+        self,
+        schema: s_schema.Schema,
+        context: sd.CommandContext,
+        node: qlast.DDLOperation,
+    ) -> None:
+        super()._apply_fields_ast(schema, context, node)
+
+        if isinstance(node, (qlast.AlterIndex, qlast.DropIndex)):
+            kind: Optional[IndexKind] = None
+            predicate: Optional[s_expr.Expression] = None
+            if self.has_ddl_identity('kind'):
+                kind = self.get_ddl_identity('kind')
+            if self.has_ddl_identity('predicate'):
+                predicate = self.get_ddl_identity('predicate')
+            present = {
+                cmd.name for cmd in node.commands
+                if isinstance(cmd, qlast.SetField)
+            }
+            node.commands[:0] = [
+                field for field in _identity_fields_ast(kind, predicate)
+                if field.name not in present
+            ]
+
     def get_ast_attr_for_field(
         self,
         field: str,
@@ -274,9 +434,13 @@ class IndexCommand(
         track_schema_ref_exprs: bool=False,
     ) -> s_expr.Expression:
         from . import objtypes as s_objtypes
+        from . import scalars as s_scalars
 
         singletons: List[s_types.Type]
-        if field.name == 'expr':
+        if field.name in {'expr', 'predicate', 'include'}:
+            if field.name == 'include':
+                _validate_included_properties(value.qlast)
+
             # type ignore below, for the class is used as mixin
             parent_ctx = context.get_ancestor(
                 IndexSourceCommandContext,  # type: ignore
@@ -314,14 +478,52 @@ class IndexCommand(
             if expr.irast.cardinality.is_multi():
                 raise errors.ResultCardinalityMismatchError(
                     f'possibly more than one element returned by '
-                    f'the index expression where only singletons '
-                    f'are allowed')
+                    f'the index {_field_descs[field.name]} where only '
+                    f'singletons are allowed')
+
+            if field.name == 'predicate':
+                bool_t = schema.get('std::bool', type=s_scalars.ScalarType)
+                expr_type = expr.irast.stype
+                if not expr_type.issubclass(schema, bool_t):
+                    raise errors.SchemaDefinitionError(
+                        f'index predicate must be of type '
+                        f'{bool_t.get_displayname(schema)}, not '
+                        f'{expr_type.get_displayname(schema)}',
+                        context=self.source_context,
+                    )
 
             return expr
         else:
             return super().compile_expr_field(
                 schema, context, field, value, track_schema_ref_exprs)
 
+    def _validate_index_kind(
+        self,
+        schema: s_schema.Schema,
+        context: sd.CommandContext,
+    ) -> None:
+        index = self.scls
+        kind = index.get_kind(schema)
+
+        if (
+            index.get_include(schema) is not None
+            and kind not in {IndexKind.BTree, IndexKind.GiST}
+        ):
+            raise errors.SchemaDefinitionError(
+                f'{kind} indexes cannot include additional properties',
+                context=self.source_context,
+            )
+
+        if (
+            kind is IndexKind.Hash
+            and isinstance(index.get_expr(schema).qlast, qlast.Tuple)
+        ):
+            raise errors.SchemaDefinitionError(
+                'Hash indexes cannot be defined on more than one '
+                'expression',
+                context=self.source_context,
+            )
+
 
 class CreateIndex(
     IndexCommand,
@@ -330,6 +532,16 @@ class CreateIndex(
     astnode = qlast.CreateIndex
     referenced_astnode = qlast.CreateIndex
 
+    def _create_begin(
+        self,
+        schema: s_schema.Schema,
+        context: sd.CommandContext,
+    ) -> s_schema.Schema:
+        schema = super()._create_begin(schema, context)
+        if not context.canonical:
+            self._validate_index_kind(schema, context)
+        return schema
+
     @classmethod
     def _cmd_tree_from_ast(
         cls,
@@ -388,7 +600,14 @@ class CreateIndex(
         else:
             expr_ql = edgeql.parse_fragment(expr.text)
 
-        return astnode_cls(name=qlast.ObjectRef(name='idx'), expr=expr_ql)
+        return astnode_cls(
+            name=qlast.ObjectRef(name='idx'),
+            expr=expr_ql,
+            commands=_identity_fields_ast(
+                parent.get_kind(schema),
+                parent.get_predicate(schema),
+            ),
+        )
 
 
 class RenameIndex(
@@ -423,6 +642,43 @@ class AlterIndex(
 ):
     astnode = qlast.AlterIndex
 
+    @classmethod
+    def _cmd_tree_from_ast(
+        cls,
+        schema: s_schema.Schema,
+        astnode: qlast.DDLOperation,
+        context: sd.CommandContext,
+    ) -> sd.Command:
+        assert isinstance(astnode, qlast.AlterIndex)
+        for subcmd in astnode.commands:
+            if (
+                isinstance(subcmd, qlast.SetField)
+                and subcmd.name in {'kind', 'predicate'}
+                and subcmd.value is None
+            ):
+                raise errors.SchemaDefinitionError(
+                    f'cannot reset the {subcmd.name} of an index, '
+                    f'drop the index and create it again instead',
+                    context=subcmd.context,
+                )
+
+        cmd = super()._cmd_tree_from_ast(schema, astnode, context)
+        # The kind and the predicate only identify the index
+        # being altered, they cannot be changed.
+        cmd.discard_attribute('kind')
+        cmd.discard_attribute('predicate')
+        return cmd
+
+    def _alter_begin(
+        self,
+        schema: s_schema.Schema,
+        context: sd.CommandContext,
+    ) -> s_schema.Schema:
+        schema = super()._alter_begin(schema, context)
+        if not context.canonical:
+            self._validate_index_kind(schema, context)
+        return schema
+
 
 class DeleteIndex(
     IndexCommand,
@@ -439,6 +695,9 @@ class DeleteIndex(
     ) -> sd.Command:
         assert isinstance(astnode, qlast.DropIndex)
         cmd = super()._cmd_tree_from_ast(schema, astnode, context)
+        # The kind and the predicate only identify the index.
+        cmd.discard_attribute('kind')
+        cmd.discard_attribute('predicate')
 
         cmd.set_attribute_value(
             'expr',
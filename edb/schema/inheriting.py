@@ -514,8 +514,11 @@ class InheritingObjectCommand(sd.ObjectCommand[so.InheritingObjectT]):
         astnode: Type[qlast.DDLOperation],
     ) -> Optional[str]:
         if (
-            field in {'abstract', 'final'}
+            field == 'abstract'
             and issubclass(astnode, qlast.CreateObject)
+        ) or (
+            field == 'final'
+            and issubclass(astnode, qlast.CreateExtendingObject)
         ):
             return field
         else:
@@ -755,10 +758,13 @@ class CreateInheritingObject(
 
             if explicit_bases:
                 if isinstance(node, qlast.CreateObject):
-                    node.bases = [
-                        qlast.TypeName(maintype=utils.name_to_ast_ref(b))
-                        for b in explicit_bases
-                    ]
+                    # Concrete constraints and the like name their
+                    # base directly and have no "extending" clause.
+                    if isinstance(node, qlast.BasesMixin):
+                        node.bases = [
+                            qlast.TypeName(maintype=utils.name_to_ast_ref(b))
+                            for b in explicit_bases
+                        ]
                 else:
                     node.commands.append(
                         qlast.AlterAddInherit(
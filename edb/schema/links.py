@@ -117,6 +117,19 @@ class Link(
         compcoef=0.9,
         merge_fn=merge_actions)
 
+    # Whether the link target is indexed in the backing storage,
+    # which is what makes backward link traversals and target delete
+    # actions cheap.  Write-heavy links may opt out.
+    index_target = so.SchemaField(
+        bool,
+        default=True,
+        allow_ddl_set=True,
+        describe_visibility=(
+            so.DescribeVisibilityPolicy.SHOW_IF_EXPLICIT_OR_DERIVED_NOT_DEFAULT
+        ),
+        compcoef=0.909,
+    )
+
     def get_target(self, schema: s_schema.Schema) -> s_objtypes.ObjectType:
         return self.get_field_value(  # type: ignore[no-any-return]
             schema, 'target')
@@ -275,7 +288,10 @@ class LinkCommand(
         if context.declarative and node is not None:
             assert isinstance(node, (qlast.CreateConcreteLink,
                                      qlast.CreateLink))
-            if node.name.name == '__type__':
+            if (
+                isinstance(node, qlast.CreateConcreteLink)
+                and node.name.name == '__type__'
+            ):
                 node.is_required = True
         return node
 
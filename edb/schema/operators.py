@@ -124,7 +124,7 @@ class OperatorCommand(
         field: str,
         astnode: Type[qlast.DDLOperation],
     ) -> Optional[str]:
-        if field == 'abstract':
+        if field == 'abstract' and issubclass(astnode, qlast.CreateOperator):
             return field
         elif field == 'operator_kind':
             return 'kind'
@@ -65,6 +65,15 @@ STD_MODULES = frozenset(STD_LIB + (sn.UnqualName('stdgraphql'),))
 
 Schema_T = TypeVar('Schema_T', bound='Schema')
 
+# Changes to objects of these classes affect overload and cast
+# resolution, see Schema.get_callables_generation().
+_CALLABLE_CLASSES = (
+    s_func.Function,
+    s_func.Parameter,
+    s_oper.Operator,
+    s_casts.Cast,
+)
+
 
 class Schema(abc.ABC):
 
@@ -438,6 +447,17 @@ class Schema(abc.ABC):
     def get_last_migration(self) -> Optional[s_migrations.Migration]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_callables_generation(self) -> Hashable:
+        """Return a token identifying the callables of this schema.
+
+        The token changes whenever a function, an operator or a cast
+        is created, altered or dropped, or when the ancestors of an
+        existing type are altered, i.e. whenever the result of
+        resolving a call with given argument types might change.
+        """
+        raise NotImplementedError
+
 
 class FlatSchema(Schema):
 
@@ -454,6 +474,7 @@ class FlatSchema(Schema):
     ]
     _refs_to: Refs_T
     _generation: int
+    _callables_generation: object
 
     def __init__(self) -> None:
         self._id_to_data = immu.Map()
@@ -463,6 +484,7 @@ class FlatSchema(Schema):
         self._globalname_to_id = immu.Map()
         self._refs_to = immu.Map()
         self._generation = 0
+        self._callables_generation = object()
 
     def _replace(
         self,
@@ -480,6 +502,7 @@ class FlatSchema(Schema):
             immu.Map[Tuple[Type[so.Object], sn.Name], uuid.UUID]
         ],
         refs_to: Optional[Refs_T] = None,
+        callables_changed: bool = False,
     ) -> FlatSchema:
         new = FlatSchema.__new__(FlatSchema)
 
@@ -515,6 +538,11 @@ class FlatSchema(Schema):
 
         new._generation = self._generation + 1
 
+        if callables_changed:
+            new._callables_generation = object()
+        else:
+            new._callables_generation = self._callables_generation
+
         return new  # type: ignore
 
     def _update_obj_name(
@@ -609,10 +637,13 @@ class FlatSchema(Schema):
         globalname_to_id = None
         orig_refs = {}
         new_refs = {}
+        callables_changed = issubclass(sclass, _CALLABLE_CLASSES)
 
         for fieldname, value in updates.items():
             field = all_fields[fieldname]
             findex = field.index
+            if fieldname == 'ancestors' and data[findex] is not None:
+                callables_changed = True
             if fieldname == 'name':
                 name_to_id, shortname_to_id, globalname_to_id = (
                     self._update_obj_name(
@@ -646,7 +677,8 @@ class FlatSchema(Schema):
                              shortname_to_id=shortname_to_id,
                              globalname_to_id=globalname_to_id,
                              id_to_data=id_to_data,
-                             refs_to=refs_to)
+                             refs_to=refs_to,
+                             callables_changed=callables_changed)
 
     def maybe_get_obj_data_raw(
         self,
@@ -698,6 +730,9 @@ class FlatSchema(Schema):
                 self._update_obj_name(obj_id, sclass, old_name, value)
             )
 
+        callables_changed = issubclass(sclass, _CALLABLE_CLASSES) or (
+            fieldname == 'ancestors' and data[findex] is not None)
+
         data_list = list(data)
         data_list[findex] = value
         new_data = tuple(data_list)
@@ -724,6 +759,7 @@ class FlatSchema(Schema):
             globalname_to_id=globalname_to_id,
             id_to_data=id_to_data,
             refs_to=refs_to,
+            callables_changed=callables_changed,
         )
 
     def unset_obj_field(
@@ -760,6 +796,9 @@ class FlatSchema(Schema):
                 )
             )
 
+        callables_changed = issubclass(sclass, _CALLABLE_CLASSES) or (
+            fieldname == 'ancestors')
+
         data_list = list(data)
         data_list[findex] = None
         new_data = tuple(data_list)
@@ -781,6 +820,7 @@ class FlatSchema(Schema):
             globalname_to_id=globalname_to_id,
             id_to_data=id_to_data,
             refs_to=refs_to,
+            callables_changed=callables_changed,
         )
 
     def _update_refs_to(
@@ -888,6 +928,7 @@ class FlatSchema(Schema):
             shortname_to_id=shortname_to_id,
             globalname_to_id=globalname_to_id,
             refs_to=refs_to,
+            callables_changed=issubclass(sclass, _CALLABLE_CLASSES),
         )
 
         if (
@@ -953,6 +994,7 @@ class FlatSchema(Schema):
             id_to_data=self._id_to_data.delete(obj.id),
             id_to_type=self._id_to_type.delete(obj.id),
             refs_to=refs_to,
+            callables_changed=issubclass(sclass, _CALLABLE_CLASSES),
         ))
 
         return self._replace(**updates)  # type: ignore
@@ -1391,6 +1433,9 @@ class FlatSchema(Schema):
     def get_last_migration(self) -> Optional[s_migrations.Migration]:
         return _get_last_migration(self)
 
+    def get_callables_generation(self) -> Hashable:
+        return self._callables_generation
+
     def __repr__(self) -> str:
         return (
             f'<{type(self).__name__} gen:{self._generation} at {id(self):#x}>')
@@ -1935,6 +1980,13 @@ class ChainedSchema(Schema):
             migration = self._base_schema.get_last_migration()
         return migration
 
+    def get_callables_generation(self) -> Hashable:
+        return (
+            self._base_schema.get_callables_generation(),
+            self._top_schema.get_callables_generation(),
+            self._global_schema.get_callables_generation(),
+        )
+
 
 @functools.lru_cache()
 def _get_functions(
@@ -83,6 +83,13 @@ class Port:
             raise RuntimeError('already serving')
         self._serving = True
 
+        await self.start_compilers()
+
+    async def stop(self):
+        await self.stop_compilers()
+        self._serving = False
+
+    async def start_compilers(self):
         self._compiler_manager = await procpool.create_manager(
             runstate_dir=self._internal_runstate_dir,
             worker_args=self.get_compiler_worker_args(),
@@ -91,12 +98,11 @@ class Port:
             pool_size=self._compiler_pool_size,
         )
 
-    async def stop(self):
+    async def stop_compilers(self):
         if self._compiler_manager is not None:
             await self._compiler_manager.stop()
             self._compiler_manager = None
         self._compiler_manager = None
-        self._serving = False
 
     async def _fix_localhost(self, host, port):
         # On many systems 'localhost' resolves to _both_ IPv4 and IPv6
@@ -60,6 +60,13 @@ cdef class StatementsCache:
         self._dict_move_to_end(key)  # last=True
         return o
 
+    def peek(self, key, default=None):
+        # Unlike get(), does not count as a use of the entry.
+        return self._dict_get(key, default)
+
+    def get_maxsize(self):
+        return self._maxsize
+
     cdef needs_cleanup(self):
         return len(self._dict) > self._maxsize
 
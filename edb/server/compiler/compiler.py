@@ -39,15 +39,18 @@ from edb.pgsql import compiler as pg_compiler
 
 from edb import edgeql
 from edb.common import debug
+from edb.common import phasetimer
 from edb.common import verutils
 from edb.common import uuidgen
 
 from edb.edgeql import ast as qlast
 from edb.edgeql import codegen as qlcodegen
 from edb.edgeql import compiler as qlcompiler
+from edb.edgeql import parser as qlparser
 from edb.edgeql import qltypes
 from edb.edgeql import quote as qlquote
 
+from edb.ir import ast as irast
 from edb.ir import staeval as ireval
 
 from edb.schema import database as s_db
@@ -64,6 +67,7 @@ from edb.schema import schema as s_schema
 from edb.schema import types as s_types
 from edb.schema import utils as s_utils
 
+from edb.pgsql import codegen as pg_codegen
 from edb.pgsql import delta as pg_delta
 from edb.pgsql import dbops as pg_dbops
 from edb.pgsql import common as pg_common
@@ -107,6 +111,10 @@ class CompileContext:
     bootstrap_mode: bool = False
     internal_schema_mode: bool = False
     standalone_mode: bool = False
+    # Collects the time spent in each compiler phase; drained into
+    # the compiled QueryUnits.
+    phase_timer: phasetimer.PhaseTimer = dataclasses.field(
+        default_factory=phasetimer.PhaseTimer, compare=False)
 
 
 EMPTY_MAP = immutables.Map()
@@ -198,6 +206,34 @@ def new_compiler_context(
     return ctx
 
 
+def _batch_reflection_writes(
+    blocks: List[Tuple[str, Dict[str, Any]]],
+) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Group consecutive reflection writes using the same query.
+
+    Reflection queries are generated per schema class and command kind,
+    so a large delta (e.g. a migration creating many objects of the same
+    kind) produces long runs of writes that differ only in arguments.
+    Only consecutive writes are grouped, since a write may depend on
+    the objects created by the preceding ones.  Repeated identical
+    writes are no-ops and are skipped.
+    """
+    batch: List[Dict[str, Any]] = []
+    batch_eql: Optional[str] = None
+
+    for eql, args in blocks:
+        if eql != batch_eql:
+            if batch_eql is not None:
+                yield batch_eql, batch
+            batch_eql = eql
+            batch = [args]
+        elif args != batch[-1]:
+            batch.append(args)
+
+    if batch_eql is not None:
+        yield batch_eql, batch
+
+
 async def load_cached_schema(backend_conn, key) -> s_schema.Schema:
     data = await backend_conn.fetchval(f'''\
         SELECT bin FROM edgedbinstdata.instdata
@@ -415,6 +451,11 @@ class Compiler(BaseCompiler):
         context.schema_object_ids = ctx.schema_object_ids
         context.compat_ver = ctx.compat_ver
         context.backend_runtime_params = self._backend_runtime_params
+        context.online_index_build = bool(config.lookup(
+            'online_index_build',
+            ctx.state.current_tx().get_session_config(),
+            allow_unrecognized=True,
+        ))
         return context
 
     def _process_delta(self, ctx: CompileContext, delta):
@@ -456,7 +497,7 @@ class Compiler(BaseCompiler):
         self._compile_schema_storage_in_delta(
             ctx, pgdelta, subblock, context=context)
 
-        return block, new_types
+        return block, new_types, pgdelta.online_index_builds
 
     def _compile_schema_storage_in_delta(
         self,
@@ -494,7 +535,7 @@ class Compiler(BaseCompiler):
         cache = current_tx.get_cached_reflection()
 
         with cache.mutate() as cache_mm:
-            for eql, args in meta_blocks:
+            for eql, batch in _batch_reflection_writes(meta_blocks):
                 eql_hash = hashlib.sha1(eql.encode()).hexdigest()
                 fname = ('edgedb', f'__rh_{eql_hash}')
 
@@ -516,13 +557,38 @@ class Compiler(BaseCompiler):
 
                     cache_mm[eql_hash] = argnames
 
-                argvals = []
-                for argname in argnames:
-                    argvals.append(pg_common.quote_literal(args[argname]))
+                if len(batch) == 1 or not argnames:
+                    for args in batch:
+                        argvals = ', '.join(
+                            pg_common.quote_literal(args[argname])
+                            for argname in argnames
+                        )
 
-                block.add_command(f'''
-                    PERFORM {pg_common.qname(*fname)}({", ".join(argvals)});
-                ''')
+                        block.add_command(f'''
+                            PERFORM {pg_common.qname(*fname)}({argvals});
+                        ''')
+                else:
+                    # Write the whole batch with a single statement.
+                    # The reflection functions are volatile, so every
+                    # call sees the writes of the preceding ones, just
+                    # like with separate statements.
+                    rows = []
+                    for args in batch:
+                        argvals = []
+                        for argname in argnames:
+                            argvals.append(
+                                f'{pg_common.quote_literal(args[argname])}'
+                                f'::json')
+                        rows.append(f'({", ".join(argvals)})')
+
+                    cols = [f'a{i}' for i in range(len(argnames))]
+                    argrefs = ', '.join(f'v.{col}' for col in cols)
+
+                    block.add_command(f'''
+                        PERFORM {pg_common.qname(*fname)}({argrefs})
+                        FROM (VALUES {", ".join(rows)})
+                            AS v({", ".join(cols)});
+                    ''')
 
         ctx.state.current_tx().update_cached_reflection(cache_mm.finish())
 
@@ -619,27 +685,18 @@ class Compiler(BaseCompiler):
 
         return sql.decode(), argmap
 
-    def _compile_ql_query(
+    def _compile_ql_to_ir(
         self,
         ctx: CompileContext,
         ql: qlast.Base,
-        *,
-        cacheable: bool = True,
-        migration_block_query: bool = False,
-    ) -> dbstate.BaseQuery:
+    ) -> irast.Command:
 
         current_tx = ctx.state.current_tx()
         session_config = current_tx.get_session_config()
 
-        native_out_format = (
-            ctx.output_format is enums.IoFormat.BINARY
-        )
-
-        single_stmt_mode = ctx.stmt_mode is enums.CompileStatementMode.SINGLE
-
         can_have_implicit_fields = (
-            native_out_format and
-            single_stmt_mode
+            ctx.output_format is enums.IoFormat.BINARY and
+            ctx.stmt_mode is enums.CompileStatementMode.SINGLE
         )
 
         disable_constant_folding = config.lookup(
@@ -648,29 +705,114 @@ class Compiler(BaseCompiler):
             allow_unrecognized=True,
         )
 
-        ir = qlcompiler.compile_ast_to_ir(
-            ql,
-            schema=current_tx.get_schema(),
-            options=qlcompiler.CompilerOptions(
-                modaliases=current_tx.get_modaliases(),
-                implicit_tid_in_shapes=(
-                    can_have_implicit_fields and ctx.inline_typeids
-                ),
-                implicit_tname_in_shapes=(
-                    can_have_implicit_fields and ctx.inline_typenames
+        timer = ctx.phase_timer
+        with timer.phase('ql_to_ir'):
+            return qlcompiler.compile_ast_to_ir(
+                ql,
+                schema=current_tx.get_schema(),
+                options=qlcompiler.CompilerOptions(
+                    modaliases=current_tx.get_modaliases(),
+                    implicit_tid_in_shapes=(
+                        can_have_implicit_fields and ctx.inline_typeids
+                    ),
+                    implicit_tname_in_shapes=(
+                        can_have_implicit_fields and ctx.inline_typenames
+                    ),
+                    implicit_id_in_shapes=can_have_implicit_fields,
+                    constant_folding=not disable_constant_folding,
+                    json_parameters=ctx.json_parameters,
+                    implicit_limit=ctx.implicit_limit,
+                    allow_writing_protected_pointers=(
+                        ctx.schema_reflection_mode),
+                    apply_query_rewrites=(
+                        not ctx.bootstrap_mode
+                        and not ctx.schema_reflection_mode
+                    ),
+                    phase_timer=timer,
                 ),
-                implicit_id_in_shapes=can_have_implicit_fields,
-                constant_folding=not disable_constant_folding,
-                json_parameters=ctx.json_parameters,
-                implicit_limit=ctx.implicit_limit,
-                allow_writing_protected_pointers=ctx.schema_reflection_mode,
-                apply_query_rewrites=(
-                    not ctx.bootstrap_mode
-                    and not ctx.schema_reflection_mode
+            )
+
+    def _compile_ql_explain(
+        self,
+        ctx: CompileContext,
+        ql: qlast.ExplainStmt,
+    ) -> dbstate.BaseQuery:
+
+        ir = self._compile_ql_to_ir(ctx, ql.query)
+        assert isinstance(ir, irast.Statement)
+        if ir.params:
+            raise errors.QueryError(
+                'EXPLAIN does not support query parameters',
+                context=ql.context,
+            )
+
+        with ctx.phase_timer.phase('ir_to_sql'):
+            qtree = pg_compiler.compile_ir_to_sql_tree(
+                ir,
+                output_format=_convert_format(ctx.output_format),
+            )
+            sql_text = pg_codegen.SQLSourceGenerator.to_source(qtree)
+
+        # The backend plan refers to relations by the aliases they have
+        # in the generated SQL, map those back to the EdgeQL paths.
+        aliases = {
+            alias: path_id.pformat()
+            for alias, path_id in pg_compiler.get_path_aliases(qtree).items()
+        }
+
+        options = 'FORMAT JSON'
+        if ql.analyze:
+            options += ', ANALYZE, BUFFERS'
+
+        # The result of EXPLAIN is a single JSON value, compile a query
+        # of that type to get the result descriptors.
+        query = self._compile_ql_query(
+            ctx,
+            qlast.SelectQuery(
+                result=qlast.TypeCast(
+                    expr=qlast.StringConstant.from_python('[]'),
+                    type=qlast.TypeName(
+                        maintype=qlast.ObjectRef(module='std', name='json'),
+                    ),
                 ),
             ),
+            migration_block_query=True,
+        )
+        assert isinstance(query, dbstate.Query)
+
+        return dataclasses.replace(
+            query,
+            sql=(f'EXPLAIN ({options}) {sql_text}'.encode(),),
+            # The plan is fetched with a simple query, never prepared.
+            sql_hash=b'',
+            # EXPLAIN ANALYZE actually runs the query.
+            has_dml=bool(ql.analyze and ir.dml_exprs),
+            explain=dbstate.ExplainInfo(
+                aliases=aliases,
+                output_format=ctx.output_format,
+            ),
         )
 
+    def _compile_ql_query(
+        self,
+        ctx: CompileContext,
+        ql: qlast.Base,
+        *,
+        cacheable: bool = True,
+        migration_block_query: bool = False,
+    ) -> dbstate.BaseQuery:
+
+        current_tx = ctx.state.current_tx()
+
+        native_out_format = (
+            ctx.output_format is enums.IoFormat.BINARY
+        )
+
+        single_stmt_mode = ctx.stmt_mode is enums.CompileStatementMode.SINGLE
+
+        timer = ctx.phase_timer
+        ir = self._compile_ql_to_ir(ctx, ql)
+
         if ir.cardinality.is_single():
             result_cardinality = enums.ResultCardinality.ONE
         else:
@@ -685,6 +827,7 @@ class Compiler(BaseCompiler):
             pretty=debug.flags.edgeql_compile or debug.flags.delta_execute,
             expected_cardinality_one=ctx.expected_cardinality_one,
             output_format=_convert_format(ctx.output_format),
+            phase_timer=timer,
         )
 
         if (
@@ -701,14 +844,17 @@ class Compiler(BaseCompiler):
         sql_bytes = sql_text.encode(defines.EDGEDB_ENCODING)
 
         if single_stmt_mode:
-            if native_out_format:
-                out_type_data, out_type_id = sertypes.TypeSerializer.describe(
-                    ir.schema, ir.stype,
-                    ir.view_shapes, ir.view_shapes_metadata,
-                    inline_typenames=ctx.inline_typenames)
-            else:
-                out_type_data, out_type_id = \
-                    sertypes.TypeSerializer.describe_json()
+            with timer.phase('descriptors'):
+                if native_out_format:
+                    out_type_data, out_type_id = (
+                        sertypes.TypeSerializer.describe(
+                            ir.schema, ir.stype,
+                            ir.view_shapes, ir.view_shapes_metadata,
+                            inline_typenames=ctx.inline_typenames)
+                    )
+                else:
+                    out_type_data, out_type_id = \
+                        sertypes.TypeSerializer.describe_json()
 
             in_type_args = None
 
@@ -760,8 +906,9 @@ class Compiler(BaseCompiler):
                 ir.schema, params_type = s_types.Tuple.create(
                     ir.schema, element_types={}, named=False)
 
-            in_type_data, in_type_id = sertypes.TypeSerializer.describe(
-                ir.schema, params_type, {}, {})
+            with timer.phase('descriptors'):
+                in_type_data, in_type_id = sertypes.TypeSerializer.describe(
+                    ir.schema, params_type, {}, {})
 
             sql_hash = self._hash_sql(
                 sql_bytes,
@@ -851,8 +998,11 @@ class Compiler(BaseCompiler):
             current_tx.update_migration_state(mstate)
             current_tx.update_schema(schema)
 
+            # The backend DDL for the whole migration block is generated
+            # and executed at COMMIT MIGRATION, so there is nothing to
+            # send to the backend for the individual statements.
             return dbstate.DDLQuery(
-                sql=(b'SELECT LIMIT 0',),
+                sql=(),
                 is_transactional=True,
                 single_unit=False,
             )
@@ -866,7 +1016,7 @@ class Compiler(BaseCompiler):
 
         # Apply and adapt delta, build native delta plan, which
         # will also update the schema.
-        block, new_types = self._process_delta(ctx, delta)
+        block, new_types, online_indexes = self._process_delta(ctx, delta)
 
         is_transactional = block.is_transactional()
         if not is_transactional:
@@ -875,6 +1025,35 @@ class Compiler(BaseCompiler):
         else:
             sql = (block.to_string().encode('utf-8'),)
 
+        online_index_sql: Tuple[bytes, ...] = ()
+        cleanup_sql: Tuple[bytes, ...] = ()
+        if online_indexes:
+            if not current_tx.is_implicit():
+                raise errors.QueryError(
+                    'online index build cannot be performed in a '
+                    'transaction block; disable the online_index_build '
+                    'configuration setting or run the command outside '
+                    'of the transaction')
+
+            # Build the indexes first, each in its own simple query,
+            # as CREATE INDEX CONCURRENTLY cannot run in a transaction
+            # block, and only then record the schema changes.  If a
+            # build fails, PostgreSQL leaves an invalid index behind,
+            # which has to be dropped separately.
+            build_sql = []
+            cleanup = []
+            build_block = pg_dbops.SQLBlock()
+            for pg_index in online_indexes:
+                create = pg_dbops.CreateIndex(pg_index, concurrently=True)
+                build_sql.append(create.code(build_block).encode('utf-8'))
+                drop = pg_dbops.DropIndex(
+                    pg_index, concurrently=True, if_exists=True)
+                cleanup.append(drop.code(build_block).encode('utf-8'))
+
+            online_index_sql = tuple(build_sql)
+            cleanup_sql = tuple(cleanup)
+            is_transactional = False
+
         drop_db = None
         if isinstance(stmt, qlast.DropDatabase):
             drop_db = stmt.name.name
@@ -890,6 +1069,8 @@ class Compiler(BaseCompiler):
             new_types=new_types,
             drop_db=drop_db,
             has_role_ddl=isinstance(stmt, qlast.RoleCommand),
+            online_index_sql=online_index_sql,
+            cleanup_sql=cleanup_sql,
         )
 
     def _compile_ql_migration(
@@ -975,7 +1156,7 @@ class Compiler(BaseCompiler):
             current_tx.update_schema(schema)
 
             query = dbstate.MigrationControlQuery(
-                sql=(b'SELECT LIMIT 0',),
+                sql=(),
                 tx_action=None,
                 action=dbstate.MigrationAction.POPULATE,
                 cacheable=False,
@@ -1148,7 +1329,7 @@ class Compiler(BaseCompiler):
             current_tx.update_migration_state(mstate)
 
             query = dbstate.MigrationControlQuery(
-                sql=(b'SELECT LIMIT 0',),
+                sql=(),
                 tx_action=None,
                 action=dbstate.MigrationAction.REJECT_PROPOSED,
                 cacheable=False,
@@ -1464,6 +1645,15 @@ class Compiler(BaseCompiler):
         else:
             raise AssertionError(f'unexpected configuration scope: {ql.scope}')
 
+        if (
+            config_op is not None
+            and config_op.opcode is config.OpCode.CONFIG_SET
+        ):
+            # Reject invalid values when they are configured rather
+            # than when the setting is used.
+            setting = config_op.get_setting(config.get_settings())
+            config_op.coerce_value(setting)
+
         return dbstate.SessionStateQuery(
             sql=sql,
             is_backend_setting=is_backend_setting,
@@ -1517,6 +1707,16 @@ class Compiler(BaseCompiler):
                 capability,
             )
 
+        elif isinstance(ql, qlast.ExplainStmt):
+            query = self._compile_ql_explain(ctx, ql)
+            caps = enums.Capability(0)
+            if (
+                isinstance(query, (dbstate.Query, dbstate.SimpleQuery))
+                and query.has_dml
+            ):
+                caps |= enums.Capability.MODIFICATIONS
+            return (query, caps)
+
         else:
             query = self._compile_ql_query(ctx, ql)
             caps = enums.Capability(0)
@@ -1576,29 +1776,53 @@ class Compiler(BaseCompiler):
         single_stmt_mode = ctx.stmt_mode is enums.CompileStatementMode.SINGLE
         default_cardinality = enums.ResultCardinality.NO_RESULT
 
-        statements = edgeql.parse_block(source)
-        statements_len = len(statements)
+        timer = ctx.phase_timer
+
+        def next_statement() -> Optional[qlast.Base]:
+            with timer.phase('parse'):
+                return next(statements, None)
+
+        statements: Iterator[qlast.Base]
+        with timer.phase('parse'):
+            if len(source.text()) > qlparser.PARSE_CACHE_MAX_SOURCE_LEN:
+                # Large scripts are parsed lazily, statement by statement,
+                # so that their trees are never held in memory all at once.
+                statements = edgeql.parse_block_iter(source)
+            else:
+                statements = iter(edgeql.parse_block_cached(source))
+
+        stmt = next_statement()
+        next_stmt = next_statement()
+        # Whether the source contains more than one statement.
+        is_script = next_stmt is not None
 
         if ctx.stmt_mode is enums.CompileStatementMode.SKIP_FIRST:
-            statements = statements[1:]
-            if not statements:  # pragma: no cover
+            stmt, next_stmt = next_stmt, next_statement()
+            if stmt is None:  # pragma: no cover
                 # Shouldn't ever happen as the server tracks the number
                 # of statements (via the "try_compile_rollback()" method)
                 # before using SKIP_FIRST.
                 raise errors.ProtocolError(
                     f'no statements to compile in SKIP_FIRST mode')
-        elif single_stmt_mode and statements_len != 1:
+        elif single_stmt_mode and (stmt is None or is_script):
+            statements_len = (
+                int(stmt is not None) + int(is_script)
+                + sum(1 for _ in statements)
+            )
             raise errors.ProtocolError(
                 f'expected one statement, got {statements_len}')
 
-        if not len(statements):  # pragma: no cover
+        if stmt is None:  # pragma: no cover
             raise errors.ProtocolError('nothing to compile')
 
         units = []
         unit = None
 
-        for stmt in statements:
-            comp, capabilities = self._compile_dispatch_ql(ctx, stmt)
+        while stmt is not None:
+            # Whatever is not attributed to a more specific phase
+            # (e.g. DDL or transaction control) is recorded as "other".
+            with timer.phase('other'):
+                comp, capabilities = self._compile_dispatch_ql(ctx, stmt)
 
             if unit is not None:
                 if comp.single_unit:
@@ -1616,6 +1840,7 @@ class Compiler(BaseCompiler):
                 unit.status = status.get_status(stmt)
 
             unit.capabilities |= capabilities
+            timer.drain_into(unit.compile_phases)
 
             if not comp.is_transactional:
                 if not comp.single_unit:
@@ -1640,6 +1865,7 @@ class Compiler(BaseCompiler):
                     unit.cacheable = comp.cacheable
 
                     unit.cardinality = comp.cardinality
+                    unit.explain = comp.explain
                 else:
                     unit.sql += comp.sql
 
@@ -1652,6 +1878,16 @@ class Compiler(BaseCompiler):
                 unit.new_types = comp.new_types
                 unit.drop_db = comp.drop_db
                 unit.has_role_ddl = comp.has_role_ddl
+                unit.online_index_sql = comp.online_index_sql
+                unit.cleanup_sql = comp.cleanup_sql
+                if comp.online_index_sql and is_script:
+                    # The index builds are committed separately, which
+                    # would break the atomicity of the script.
+                    raise errors.QueryError(
+                        'online index build cannot be performed in a '
+                        'transaction block; disable the online_index_build '
+                        'configuration setting or run the command outside '
+                        'of the transaction')
                 if comp.drop_db:
                     units.append(unit)
                     unit = None
@@ -1708,7 +1944,7 @@ class Compiler(BaseCompiler):
 
                 if comp.config_scope is qltypes.ConfigScope.SYSTEM:
                     if (not ctx.state.current_tx().is_implicit() or
-                            statements_len > 1):
+                            is_script):
                         raise errors.QueryError(
                             'CONFIGURE SYSTEM cannot be executed in a '
                             'transaction block')
@@ -1736,6 +1972,8 @@ class Compiler(BaseCompiler):
             else:  # pragma: no cover
                 raise errors.InternalServerError('unknown compile state')
 
+            stmt, next_stmt = next_stmt, next_statement()
+
         if unit is not None:
             units.append(unit)
 
@@ -2019,6 +2257,18 @@ class Compiler(BaseCompiler):
 
         return self._compile(ctx=ctx, source=source)
 
+    async def checkpoint_in_tx(self, txid: int) -> None:
+        state = self._load_state(txid)
+        state.checkpoint_tx()
+
+    async def rollback_to_checkpoint_in_tx(self, txid: int) -> None:
+        state = self._load_state(txid)
+        state.rollback_to_checkpoint()
+
+    async def discard_checkpoint_in_tx(self, txid: int) -> None:
+        state = self._load_state(txid)
+        state.discard_checkpoint()
+
     async def interpret_backend_error(self, dbver, fields):
         db = await self._get_database(dbver)
         return errormech.interpret_backend_error(db.schema, fields)
@@ -62,6 +62,17 @@ class MigrationAction(enum.IntEnum):
     REJECT_PROPOSED = 6
 
 
+@dataclasses.dataclass(frozen=True)
+class ExplainInfo:
+
+    # Maps the relation aliases in the plan to the EdgeQL paths
+    # the relations were produced for.
+    aliases: Dict[str, str]
+
+    # The format in which the plan is returned to the client.
+    output_format: enums.IoFormat
+
+
 @dataclasses.dataclass(frozen=True)
 class BaseQuery:
 
@@ -93,6 +104,7 @@ class Query(BaseQuery):
     has_dml: bool = False
     single_unit: bool = False
     cacheable: bool = True
+    explain: Optional[ExplainInfo] = None
 
 
 @dataclasses.dataclass(frozen=True)
@@ -123,6 +135,8 @@ class DDLQuery(BaseQuery):
     single_unit: bool = False
     drop_db: Optional[str] = None
     has_role_ddl: bool = False
+    online_index_sql: Tuple[bytes, ...] = ()
+    cleanup_sql: Tuple[bytes, ...] = ()
 
 
 @dataclasses.dataclass(frozen=True)
@@ -192,6 +206,21 @@ class QueryUnit:
     # True if this unit contains ALTER/DROP/CREATE ROLE commands.
     has_role_ddl: bool = False
 
+    # CREATE INDEX CONCURRENTLY statements of an online index build.
+    # PostgreSQL refuses to run them in a transaction block, so each
+    # is sent as a separate simple query before the unit's SQL.
+    online_index_sql: Tuple[bytes, ...] = ()
+
+    # SQL to run if executing the unit fails, e.g. to drop invalid
+    # indexes left behind by a failed online index build.  Only set
+    # for non-transactional units.
+    cleanup_sql: Tuple[bytes, ...] = ()
+
+    # Set only for EXPLAIN units.  Their SQL is a single EXPLAIN
+    # statement, the plan it returns is annotated with EdgeQL paths
+    # and encoded by the server.
+    explain: Optional[ExplainInfo] = None
+
     # If tx_id is set, it means that the unit
     # starts a new transaction.
     tx_id: Optional[int] = None
@@ -240,10 +269,30 @@ class QueryUnit:
         dataclasses.field(default_factory=list))
     modaliases: Optional[immutables.Map] = None
 
+    # Time (in seconds) spent in each compiler phase while compiling
+    # this unit, e.g. {'parse': ..., 'ql_to_ir': ..., 'codegen': ...}.
+    compile_phases: Dict[str, float] = (
+        dataclasses.field(default_factory=dict))
+
     @property
     def has_ddl(self) -> bool:
         return bool(self.capabilities & enums.Capability.DDL)
 
+    @property
+    def backend_round_trips(self) -> int:
+        """The number of backend round-trips needed to execute the unit.
+
+        Transactional units are sent to the backend as a single
+        query, non-transactional ones statement by statement.
+        """
+        builds = len(self.online_index_sql)
+        if not self.sql:
+            return builds
+        elif self.is_transactional:
+            return builds + 1
+        else:
+            return builds + len(self.sql)
+
 
 #############################
 
@@ -470,8 +519,9 @@ class Transaction:
 class CompilerConnectionState:
 
     _savepoints_log: Mapping[int, Transaction]
+    _tx_checkpoint: Optional[Transaction]
 
-    __slots__ = ('_savepoints_log', '_dbver', '_current_tx')
+    __slots__ = ('_savepoints_log', '_dbver', '_current_tx', '_tx_checkpoint')
 
     def __init__(
         self,
@@ -483,6 +533,7 @@ class CompilerConnectionState:
     ):
         self._dbver = dbver
         self._savepoints_log = {}
+        self._tx_checkpoint = None
         self._init_current_tx(schema, modaliases, config, cached_reflection)
 
     def _init_current_tx(self, schema, modaliases, config, cached_reflection):
@@ -513,6 +564,22 @@ class CompilerConnectionState:
         self._savepoints_log.clear()
         self._current_tx = new_tx
 
+    def checkpoint_tx(self):
+        # Remember the current state of the transaction, so that the
+        # effects of statements compiled after this point can be
+        # discarded with rollback_to_checkpoint().
+        self._tx_checkpoint = self._current_tx.copy()
+
+    def rollback_to_checkpoint(self):
+        if self._tx_checkpoint is None:
+            raise RuntimeError('no transaction checkpoint to rollback to')
+
+        self._current_tx = self._tx_checkpoint
+        self._tx_checkpoint = None
+
+    def discard_checkpoint(self):
+        self._tx_checkpoint = None
+
     @property
     def dbver(self):
         return self._dbver
@@ -0,0 +1,58 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Post-processing of the plans returned by EXPLAIN units."""
+
+
+from __future__ import annotations
+from typing import *
+
+import json
+
+from . import dbstate
+from . import enums
+
+
+def annotate_plan(plan: Dict[str, Any], aliases: Mapping[str, str]) -> None:
+    """Annotate the nodes of a JSON query plan with EdgeQL paths."""
+    path = aliases.get(plan.get('Alias'))
+    if path is not None:
+        plan['EdgeQL Path'] = path
+    for subplan in plan.get('Plans', ()):
+        annotate_plan(subplan, aliases)
+
+
+def encode_plan(explain: dbstate.ExplainInfo, data: bytes) -> bytes:
+    """Annotate the output of an EXPLAIN (FORMAT JSON) statement.
+
+    Return the result element of the EXPLAIN query encoded in
+    the output format it was compiled for.
+    """
+    stmts = json.loads(data)
+    for stmt in stmts:
+        annotate_plan(stmt['Plan'], explain.aliases)
+    plan = json.dumps(stmts).encode('utf-8')
+
+    if explain.output_format is enums.IoFormat.BINARY:
+        # std::json is encoded as jsonb.
+        return b'\x01' + plan
+    elif explain.output_format is enums.IoFormat.JSON:
+        return b'[' + plan + b']'
+    else:
+        return plan
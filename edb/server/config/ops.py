@@ -95,6 +95,15 @@ class Operation(NamedTuple):
                 return frozenset(self.value)  # type: ignore
         else:
             if isinstance(self.value, setting.type):
+                if (
+                    setting.enum_values is not None
+                    and self.value not in setting.enum_values
+                ):
+                    allowed = ', '.join(map(repr, setting.enum_values))
+                    raise errors.ConfigurationError(
+                        f'invalid value {self.value!r} for the '
+                        f'{setting.name!r} setting, expected one of '
+                        f'{allowed}')
                 return self.value
             elif self.value is None and allow_missing:
                 return None
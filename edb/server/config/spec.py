@@ -41,6 +41,7 @@ class Setting:
     internal: bool = False
     requires_restart: bool = False
     backend_setting: Optional[str] = None
+    enum_values: Optional[Tuple[Any, ...]] = None
 
     def __post_init__(self):
         if (self.type not in {str, int, bool} and
@@ -152,6 +153,16 @@ def load_spec_from_schema(schema):
             else:
                 raise RuntimeError(f'cfg::Config.{pn} has no default')
 
+        enum_values = None
+        one_of = schema.get('std::one_of')
+        for constr in p.get_constraints(schema).objects(schema):
+            if constr.issubclass(schema, one_of):
+                enum_values = tuple(
+                    qlcompiler.evaluate_to_python_val(
+                        arg.text, schema=schema)
+                    for arg in constr.get_args(schema)
+                )
+
         setting = Setting(
             pn,
             type=pytype,
@@ -160,6 +171,7 @@ def load_spec_from_schema(schema):
             system=attributes.get('cfg::system', False),
             requires_restart=attributes.get('cfg::requires_restart', False),
             backend_setting=attributes.get('cfg::backend_setting', None),
+            enum_values=enum_values,
             default=deflt,
         )
 
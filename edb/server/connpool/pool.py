@@ -48,6 +48,12 @@ class Disconnector(typing.Protocol[CP2]):
         pass
 
 
+class Preference(typing.Protocol[CP2]):
+
+    def __call__(self, conn: CP2) -> bool:
+        pass
+
+
 class StatsCollector(typing.Protocol):
 
     def __call__(self, stats: Snapshot) -> None:
@@ -170,7 +176,10 @@ class Block(typing.Generic[C]):
             return conn
         return None
 
-    async def acquire(self) -> C:
+    async def acquire(
+        self,
+        prefer: typing.Optional[Preference[C]]=None,
+    ) -> C:
         # There can be a race between a waiter scheduled for to wake up
         # and a connection being stolen (due to quota being enforced,
         # for example).  In which case the waiter might get finally
@@ -209,6 +218,14 @@ class Block(typing.Generic[C]):
                         self._wakeup_next_waiter()
                     raise
 
+            if prefer is not None:
+                # Hand out the first idle connection the caller
+                # prefers, if there is one.
+                for i, conn in enumerate(self.conn_queue):
+                    if prefer(conn):
+                        del self.conn_queue[i]
+                        return conn
+
             return self.conn_queue.popleft()
         finally:
             self.conn_waiters_num -= 1
@@ -799,7 +816,11 @@ class Pool(BasePool[C]):
 
         return None, None
 
-    async def _acquire(self, dbname: str) -> C:
+    async def _acquire(
+        self,
+        dbname: str,
+        prefer: typing.Optional[Preference[C]],
+    ) -> C:
         block = self._get_block(dbname)
 
         room_for_new_conns = self._cur_capacity < self._max_capacity
@@ -811,7 +832,7 @@ class Pool(BasePool[C]):
                 # connections.  Or this is before the first tick -- a free
                 # for all.
                 self._schedule_new_conn(block)
-                return await block.acquire()
+                return await block.acquire(prefer)
 
             if (
                 not block_nconns or
@@ -820,7 +841,7 @@ class Pool(BasePool[C]):
             ):
                 # Block has no connections at all.
                 self._schedule_new_conn(block)
-                return await block.acquire()
+                return await block.acquire(prefer)
 
         if not block_nconns:
             # This is a block without any connections.
@@ -828,21 +849,26 @@ class Pool(BasePool[C]):
             # reallocated for this block.
             if not self._try_steal_conn(block):
                 self._new_blocks_waitlist[block] = True
-            return await block.acquire()
+            return await block.acquire(prefer)
 
         if block_nconns < block.quota:
             # Let's see if we can steal a connection from some block
             # that's over quota and open a new one.
             self._try_steal_conn(block)
-            return await block.acquire()
+            return await block.acquire(prefer)
 
-        return await block.acquire()
+        return await block.acquire(prefer)
 
-    async def acquire(self, dbname: str) -> C:
+    async def acquire(
+        self,
+        dbname: str,
+        *,
+        prefer: typing.Optional[Preference[C]]=None,
+    ) -> C:
         self._nacquires += 1
         self._maybe_schedule_tick()
         try:
-            conn = await self._acquire(dbname)
+            conn = await self._acquire(dbname, prefer)
         finally:
             self._nacquires -= 1
 
@@ -955,7 +981,12 @@ class _NaivePool(BasePool[C]):
         self._report_snapshot()
         self._capture_snapshot(now=now)
 
-    async def acquire(self, dbname: str) -> C:
+    async def acquire(
+        self,
+        dbname: str,
+        *,
+        prefer: typing.Optional[Preference[C]]=None,
+    ) -> C:
         self._maybe_tick()
 
         block = self._get_block(dbname)
@@ -963,7 +994,7 @@ class _NaivePool(BasePool[C]):
         if self._cur_capacity < self._max_capacity:
             self._schedule_new_conn(block)
 
-        return await block.acquire()
+        return await block.acquire(prefer)
 
     def release(self, dbname: str, conn: C) -> None:
         self._maybe_tick()
@@ -31,7 +31,7 @@ EDGEDB_VISIBLE_METADATA_PREFIX = r'EdgeDB metadata follows, do not modify.\n'
 EDGEDB_SPECIAL_DBS = {EDGEDB_TEMPLATE_DB, EDGEDB_SYSTEM_DB}
 
 # Increment this whenever the database layout or stdlib changes.
-EDGEDB_CATALOG_VERSION = 2021_01_26_10_00
+EDGEDB_CATALOG_VERSION = 2021_02_04_00_00
 
 # Resource limit on open FDs for the server process.
 # By default, at least on macOS, the max number of open FDs
@@ -49,4 +49,33 @@ DEFAULT_MODULE_ALIAS = 'default'
 
 
 HTTP_PORT_QUERY_CACHE_SIZE = 500
+HTTP_PORT_PERSISTED_QUERY_CACHE_SIZE = 1000
 HTTP_PORT_MAX_CONCURRENCY = 250
+HTTP_PORT_MAX_BATCH_SIZE = 100
+# Results of EdgeQL over HTTP queries that do not fit into a single
+# fragment of this size are streamed using chunked transfer encoding.
+HTTP_PORT_STREAM_FRAGMENT_SIZE = 64 * 1024
+# Number of pre-spawned (not yet connected) compiler processes kept
+# by the compiler pool shared by HTTP ports, per compiler class.
+HTTP_PORT_COMPILER_POOL_BUFFER = 1
+# Seconds after which an idle compiler of the shared pool is terminated.
+HTTP_PORT_COMPILER_IDLE_TIMEOUT = 60.0
+# Defaults of the per-port cfg::Port connection limits, keep in sync
+# with the property defaults in edb/lib/cfg.edgeql.
+HTTP_PORT_IDLE_TIMEOUT = 60
+HTTP_PORT_MAX_CONNECTIONS = 1000
+HTTP_PORT_MAX_REQUEST_SIZE = 16 * 1024 * 1024
+# Scripts of at least this size executed in a transaction block are
+# compiled and executed in batches of whole statements, compiling the
+# next batch while the current one is being executed.
+SCRIPT_PIPELINE_MIN_SIZE = 256 * 1024
+SCRIPT_PIPELINE_BATCH_SIZE = 64 * 1024
+# Bounds of the number of statements prepared on each backend
+# connection.  Within them, the number is derived from the memory
+# of the host of a managed Postgres cluster: a fraction of it is split
+# between the backend connections, assuming the given amount of
+# backend memory per prepared statement.
+PREP_STMTS_CACHE_MIN = 100
+PREP_STMTS_CACHE_MAX = 5000
+PREP_STMTS_MEMORY_FRACTION = 0.25
+PREP_STMT_MEMORY_ESTIMATE = 256 * 1024
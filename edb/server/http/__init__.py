@@ -19,7 +19,8 @@
 
 from __future__ import annotations
 
+from .compilers import CompilerPool
 from .port import BaseHttpPort
 
 
-__all__ = ('BaseHttpPort',)
+__all__ = ('BaseHttpPort', 'CompilerPool')
@@ -0,0 +1,205 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from __future__ import annotations
+
+from typing import *
+
+import asyncio
+import collections
+import logging
+import time
+
+from edb.common import taskgroup
+from edb.server import defines
+from edb.server import procpool
+
+
+log_metrics = logging.getLogger('edb.server.metrics')
+
+
+class CompilerPool:
+    """A pool of compiler workers shared by all HTTP ports of a server.
+
+    Instead of every port keeping `concurrency` dedicated compiler
+    processes around, workers are spawned on demand and handed back
+    to the pool after every compilation.  Idle workers are keyed by
+    the worker class and the database they are connected to, and are
+    terminated once they have not been used for `idle_timeout` seconds.
+    The pool always keeps at least one idle worker for every
+    (worker class, database) pair that has a registered port.
+    """
+
+    _managers: Dict[type, procpool.Manager]
+    _idle: Dict[Tuple[type, str], Deque[Tuple[float, Any]]]
+    _registered: Dict[Tuple[type, str], int]
+
+    def __init__(
+        self,
+        *,
+        runstate_dir: str,
+        worker_args: dict,
+        idle_timeout: float = defines.HTTP_PORT_COMPILER_IDLE_TIMEOUT,
+    ):
+        self._runstate_dir = runstate_dir
+        self._worker_args = worker_args
+        self._idle_timeout = idle_timeout
+
+        self._managers = {}
+        self._managers_lock = asyncio.Lock()
+        self._idle = {}
+        self._registered = {}
+
+        self._running = False
+        self._gc_task = None
+
+    async def start(self):
+        if self._running:
+            raise RuntimeError('already running')
+        self._running = True
+        self._gc_task = asyncio.create_task(self._gc_idle_workers())
+
+    async def stop(self):
+        if not self._running:
+            return
+        self._running = False
+
+        if self._gc_task is not None:
+            self._gc_task.cancel()
+            try:
+                await self._gc_task
+            except asyncio.CancelledError:
+                pass
+            self._gc_task = None
+
+        self._idle.clear()
+        self._registered.clear()
+
+        # Stopping the managers terminates all of their workers,
+        # including the ones that are currently checked out.
+        async with taskgroup.TaskGroup(name='http-compilers-stop') as g:
+            for manager in self._managers.values():
+                g.create_task(manager.stop())
+            self._managers.clear()
+
+    async def register(self, worker_cls: type, dbname: str, dbver: bytes):
+        """Declare that a port will be compiling with *worker_cls*.
+
+        Spawns the first worker eagerly, so that configuration errors,
+        such as a non-existent database, are reported on port start.
+        """
+        worker = await self.acquire(worker_cls, dbname, dbver)
+        key = (worker_cls, dbname)
+        self._registered[key] = self._registered.get(key, 0) + 1
+        self.release(worker_cls, dbname, worker)
+
+    async def unregister(self, worker_cls: type, dbname: str):
+        key = (worker_cls, dbname)
+        refs = self._registered.get(key, 0) - 1
+        if refs > 0:
+            self._registered[key] = refs
+            return
+
+        self._registered.pop(key, None)
+        idle = self._idle.pop(key, None)
+        if idle:
+            async with taskgroup.TaskGroup() as g:
+                for _, worker in idle:
+                    g.create_task(worker.close())
+
+    async def acquire(self, worker_cls: type, dbname: str, dbver: bytes):
+        if not self._running:
+            raise RuntimeError('cannot acquire a compiler: not running')
+
+        idle = self._idle.get((worker_cls, dbname))
+        if idle:
+            _, worker = idle.pop()
+            return worker
+
+        manager = await self._get_manager(worker_cls)
+        worker = await manager.spawn_worker()
+        try:
+            await worker.call('connect', dbname, dbver)
+        except Exception:
+            await worker.close()
+            raise
+        return worker
+
+    def release(self, worker_cls: type, dbname: str, worker):
+        if not self._running:
+            return
+
+        key = (worker_cls, dbname)
+        try:
+            idle = self._idle[key]
+        except KeyError:
+            idle = self._idle[key] = collections.deque()
+        idle.append((time.monotonic(), worker))
+
+    def count_idle(self) -> int:
+        return sum(len(idle) for idle in self._idle.values())
+
+    async def _get_manager(self, worker_cls: type) -> procpool.Manager:
+        async with self._managers_lock:
+            try:
+                return self._managers[worker_cls]
+            except KeyError:
+                pass
+
+            manager = await procpool.create_manager(
+                runstate_dir=self._runstate_dir,
+                worker_args=self._worker_args,
+                worker_cls=worker_cls,
+                name=f'compiler-http-{len(self._managers)}',
+                pool_size=defines.HTTP_PORT_COMPILER_POOL_BUFFER,
+            )
+            self._managers[worker_cls] = manager
+            return manager
+
+    async def _gc_idle_workers(self):
+        while True:
+            try:
+                await asyncio.sleep(self._idle_timeout / 2)
+            except asyncio.CancelledError:
+                return
+
+            expired = []
+            deadline = time.monotonic() - self._idle_timeout
+            for key, idle in self._idle.items():
+                # The most recently used workers are at the right end.
+                keep = 1 if key in self._registered else 0
+                while len(idle) > keep and idle[0][0] < deadline:
+                    _, worker = idle.popleft()
+                    expired.append(worker)
+
+            if not expired:
+                continue
+
+            for worker in expired:
+                try:
+                    await worker.close()
+                except Exception:
+                    log_metrics.exception(
+                        'could not terminate an idle HTTP compiler worker')
+
+            log_metrics.info(
+                "Terminated %d idle HTTP compiler workers; idle=%d",
+                len(expired),
+                self.count_idle(),
+            )
@@ -26,6 +26,9 @@ cdef class HttpRequest:
         bytes content_type
         bytes method
         bytes body
+        bytes accept_encoding
+        list body_chunks
+        Py_ssize_t body_size
 
 
 cdef class HttpResponse:
@@ -33,6 +36,7 @@ cdef class HttpResponse:
     cdef:
         object status
         bint close_connection
+        bint streamed
         bytes content_type
         bytes body
 
@@ -46,14 +50,34 @@ cdef class HttpProtocol:
         object transport
         object unprocessed
         bint in_response
+        object write_waiter
+        object stream_compressor
+
+        object idle_timer
+        double idle_timeout
+        Py_ssize_t max_request_size
+        bint registered
 
         HttpRequest current_request
 
+    cdef _reset_idle_timer(self)
+    cdef _cancel_idle_timer(self)
+    cdef _reject(self, bytes resp_status, bytes message)
+
+    cdef list _build_headers(self, bytes req_version, bytes resp_status,
+                             bytes content_type, bytes content_encoding,
+                             bint close_connection)
     cdef _write(self, bytes req_version, bytes resp_status,
-                bytes content_type, bytes body, bint close_connection)
+                bytes content_type, bytes content_encoding,
+                bytes body, bint close_connection)
 
     cdef write(self, HttpRequest request, HttpResponse response)
 
+    cdef start_streaming(self, HttpRequest request, HttpResponse response)
+    cdef _write_chunk(self, bytes data)
+    cdef finish_streaming(self)
+    cdef bint can_stream(self, HttpRequest request)
+
     cdef unhandled_exception(self, ex)
     cdef resume(self)
     cdef close(self)
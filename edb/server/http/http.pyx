@@ -19,6 +19,8 @@
 
 import collections
 import http
+import time
+import zlib
 
 import httptools
 
@@ -27,6 +29,9 @@ from edb.common import markup
 
 HTTPStatus = http.HTTPStatus
 
+# Responses smaller than this are not worth compressing.
+DEF COMPRESSION_MIN_SIZE = 1024
+
 
 cdef class HttpRequest:
     pass
@@ -39,6 +44,40 @@ cdef class HttpResponse:
         self.content_type = b'text/plain'
         self.body = b''
         self.close_connection = False
+        self.streamed = False
+
+
+cdef bytes choose_content_encoding(bytes accept_encoding):
+    cdef bytes chosen = None
+
+    if not accept_encoding:
+        return None
+
+    for item in accept_encoding.lower().split(b','):
+        coding, _, params = item.partition(b';')
+        coding = coding.strip()
+        if coding not in (b'gzip', b'deflate'):
+            continue
+        params = params.replace(b' ', b'')
+        if params.startswith(b'q='):
+            try:
+                if not float(params[2:]):
+                    continue
+            except ValueError:
+                continue
+        if coding == b'gzip':
+            return coding
+        chosen = coding
+
+    return chosen
+
+
+cdef object make_compressor(bytes content_encoding):
+    if content_encoding == b'gzip':
+        wbits = 16 + zlib.MAX_WBITS
+    else:
+        wbits = zlib.MAX_WBITS
+    return zlib.compressobj(wbits=wbits)
 
 
 cdef class HttpProtocol:
@@ -53,14 +92,54 @@ cdef class HttpProtocol:
         self.in_response = False
         self.unprocessed = None
 
+        self.write_waiter = None
+        self.stream_compressor = None
+
+        self.idle_timer = None
+        self.idle_timeout = server.idle_timeout
+        self.max_request_size = server.max_request_size
+        self.registered = False
+
     def connection_made(self, transport):
         self.transport = transport
 
+        if not self.server.register_connection(self):
+            self._reject(
+                b'503 Service Unavailable',
+                b'too many connections to the HTTP port')
+            return
+
+        self.registered = True
+        self._reset_idle_timer()
+
     def connection_lost(self, exc):
         self.transport = None
         self.unprocessed = None
 
+        self._cancel_idle_timer()
+        if self.registered:
+            self.registered = False
+            self.server.unregister_connection(self)
+
+        waiter = self.write_waiter
+        if waiter is not None and not waiter.done():
+            self.write_waiter = None
+            waiter.set_exception(
+                ConnectionAbortedError('the connection has been lost'))
+
+    def pause_writing(self):
+        if self.write_waiter is None:
+            self.write_waiter = self.loop.create_future()
+
+    def resume_writing(self):
+        waiter = self.write_waiter
+        self.write_waiter = None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
     def data_received(self, data):
+        if not self.in_response:
+            self._reset_idle_timer()
         try:
             self.parser.feed_data(data)
         except Exception as ex:
@@ -73,16 +152,50 @@ cdef class HttpProtocol:
         name = name.lower()
         if name == b'content-type':
             self.current_request.content_type = value
+        elif name == b'accept-encoding':
+            self.current_request.accept_encoding = value
+        elif name == b'content-length':
+            try:
+                too_large = int(value) > self.max_request_size
+            except ValueError:
+                too_large = False
+            if too_large:
+                self._reject(
+                    b'413 Payload Too Large',
+                    b'request body exceeds the maximum request size')
 
     def on_body(self, body: bytes):
-        self.current_request.body = body
+        cdef HttpRequest req = self.current_request
+
+        if self.transport is None:
+            return
+
+        req.body_size += len(body)
+        if req.body_size > self.max_request_size:
+            self._reject(
+                b'413 Payload Too Large',
+                b'request body exceeds the maximum request size')
+            return
+
+        if req.body_chunks is None:
+            req.body_chunks = [body]
+        else:
+            req.body_chunks.append(body)
 
     def on_message_complete(self):
+        if self.transport is None:
+            return
+
         self.transport.pause_reading()
+        self._cancel_idle_timer()
 
         req = self.current_request
         self.current_request = HttpRequest()
 
+        if req.body_chunks is not None:
+            req.body = b''.join(req.body_chunks)
+            req.body_chunks = None
+
         req.version = self.parser.get_http_version().encode()
         req.should_keep_alive = self.parser.should_keep_alive()
         req.method = self.parser.get_method().upper()
@@ -97,9 +210,32 @@ cdef class HttpProtocol:
             self.loop.create_task(self._handle_request(req))
         self.server.last_minute_requests += 1
 
+    cdef _reset_idle_timer(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        self.idle_timer = self.loop.call_later(
+            self.idle_timeout, self._on_idle_timeout)
+
+    cdef _cancel_idle_timer(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+
+    def _on_idle_timeout(self):
+        self.idle_timer = None
+        if self.transport is not None and not self.in_response:
+            self.server.idle_connections_closed += 1
+            self.close()
+
+    cdef _reject(self, bytes resp_status, bytes message):
+        self._write(b'1.1', resp_status, b'text/plain', None, message, True)
+        self.close()
+
     cdef close(self):
-        self.transport.close()
-        self.transport = None
+        self._cancel_idle_timer()
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
         self.unprocessed = None
 
     cdef unhandled_exception(self, ex):
@@ -110,6 +246,7 @@ cdef class HttpProtocol:
             b'1.0',
             b'400 Bad Request',
             b'text/plain',
+            None,
             f'{type(ex).__name__}: {ex}'.encode(),
             True)
 
@@ -123,36 +260,128 @@ cdef class HttpProtocol:
             req = self.unprocessed.popleft()
             self.loop.create_task(self._handle_request(req))
         else:
+            self._reset_idle_timer()
             self.transport.resume_reading()
 
-    cdef _write(self, bytes req_version, bytes resp_status,
-                bytes content_type, bytes body, bint close_connection):
-        if self.transport is None:
-            return
+    cdef list _build_headers(self, bytes req_version, bytes resp_status,
+                             bytes content_type, bytes content_encoding,
+                             bint close_connection):
         data = [
             b'HTTP/', req_version, b' ', resp_status, b'\r\n',
             b'Content-Type: ', content_type, b'\r\n',
-            b'Content-Length: ', f'{len(body)}'.encode(), b'\r\n',
         ]
 
+        if content_encoding is not None:
+            data.append(b'Content-Encoding: ')
+            data.append(content_encoding)
+            data.append(b'\r\nVary: Accept-Encoding\r\n')
+
         if debug.flags.http_inject_cors:
             data.append(b'Access-Control-Allow-Origin: *\r\n')
 
         if close_connection:
             data.append(b'Connection: close\r\n')
-        data.append(b'\r\n')
+
+        return data
+
+    cdef _write(self, bytes req_version, bytes resp_status,
+                bytes content_type, bytes content_encoding,
+                bytes body, bint close_connection):
+        if self.transport is None:
+            return
+        data = self._build_headers(
+            req_version, resp_status, content_type, content_encoding,
+            close_connection)
+        data.append(b'Content-Length: ')
+        data.append(f'{len(body)}'.encode())
+        data.append(b'\r\n\r\n')
         if body:
             data.append(body)
         self.transport.write(b''.join(data))
 
     cdef write(self, HttpRequest request, HttpResponse response):
+        cdef:
+            bytes body = response.body
+            bytes content_encoding = None
+
         assert type(response.status) is HTTPStatus
+
+        if len(body) >= COMPRESSION_MIN_SIZE:
+            content_encoding = choose_content_encoding(
+                request.accept_encoding)
+            if content_encoding is not None:
+                compressor = make_compressor(content_encoding)
+                body = compressor.compress(body) + compressor.flush()
+
         self._write(
             request.version,
             f'{response.status.value} {response.status.phrase}'.encode(),
             response.content_type,
-            response.body,
+            content_encoding,
+            body,
+            response.close_connection)
+
+    cdef start_streaming(self, HttpRequest request, HttpResponse response):
+        """Send the response headers for a chunked response body.
+
+        The body is then sent with `write_chunk()` and terminated with
+        `finish_streaming()`.  Only HTTP/1.1 clients support chunked
+        transfer encoding, see `can_stream()`.
+        """
+        cdef bytes content_encoding
+
+        assert type(response.status) is HTTPStatus
+        if self.transport is None:
+            raise ConnectionAbortedError('the connection has been lost')
+
+        content_encoding = choose_content_encoding(request.accept_encoding)
+        if content_encoding is not None:
+            self.stream_compressor = make_compressor(content_encoding)
+        else:
+            self.stream_compressor = None
+
+        response.streamed = True
+        data = self._build_headers(
+            request.version,
+            f'{response.status.value} {response.status.phrase}'.encode(),
+            response.content_type,
+            content_encoding,
             response.close_connection)
+        data.append(b'Transfer-Encoding: chunked\r\n\r\n')
+        self.transport.write(b''.join(data))
+
+    cdef _write_chunk(self, bytes data):
+        if data:
+            self.transport.write(b''.join((
+                f'{len(data):x}\r\n'.encode(), data, b'\r\n')))
+
+    async def write_chunk(self, bytes data):
+        if self.transport is None:
+            raise ConnectionAbortedError('the connection has been lost')
+
+        if self.stream_compressor is not None:
+            # Flush the compressor on every chunk so that the client
+            # can decode the response incrementally.
+            data = (self.stream_compressor.compress(data) +
+                    self.stream_compressor.flush(zlib.Z_SYNC_FLUSH))
+
+        self._write_chunk(data)
+
+        if self.write_waiter is not None:
+            await self.write_waiter
+
+    cdef finish_streaming(self):
+        if self.transport is None:
+            return
+
+        if self.stream_compressor is not None:
+            self._write_chunk(self.stream_compressor.flush())
+            self.stream_compressor = None
+
+        self.transport.write(b'0\r\n\r\n')
+
+    cdef bint can_stream(self, HttpRequest request):
+        return request.version == b'1.1'
 
     async def _handle_request(self, HttpRequest request):
         cdef:
@@ -161,14 +390,24 @@ cdef class HttpProtocol:
         if self.transport is None:
             return
 
+        started_at = time.monotonic()
         try:
             await self.handle_request(request, response)
         except Exception as ex:
-            self.unhandled_exception(ex)
+            if response.streamed:
+                # The response headers have already been sent,
+                # there is no way to report the error to the client.
+                if debug.flags.server:
+                    markup.dump(ex)
+                self.close()
+            else:
+                self.unhandled_exception(ex)
             return
 
-        self.write(request, response)
+        if not response.streamed:
+            self.write(request, response)
         self.in_response = False
+        self.server.record_latency('total', time.monotonic() - started_at)
 
         if response.close_connection or not request.should_keep_alive:
             self.close()
@@ -24,7 +24,7 @@ from typing import *
 import asyncio
 import logging
 
-from edb.common import taskgroup
+from edb.common import histogram
 from edb.common import windowedsum
 
 from edb.server import baseport
@@ -41,10 +41,12 @@ class BaseHttpPort(baseport.Port):
                  user: str,
                  concurrency: int,
                  protocol: str,
+                 idle_timeout: int = defines.HTTP_PORT_IDLE_TIMEOUT,
+                 max_connections: int = defines.HTTP_PORT_MAX_CONNECTIONS,
+                 max_request_size: int = defines.HTTP_PORT_MAX_REQUEST_SIZE,
                  **kwargs):
 
         super().__init__(**kwargs)
-        self._compiler_pool_size = 0
 
         if protocol != self.get_proto_name():
             raise RuntimeError(f'unknown protocol {protocol!r}')
@@ -52,9 +54,16 @@ class BaseHttpPort(baseport.Port):
             raise RuntimeError(
                 f'concurrency must be greater than 0 and '
                 f'less than {defines.HTTP_PORT_MAX_CONCURRENCY}')
+        if idle_timeout <= 0:
+            raise RuntimeError('idle_timeout must be greater than 0')
+        if max_connections <= 0:
+            raise RuntimeError('max_connections must be greater than 0')
+        if max_request_size <= 0:
+            raise RuntimeError('max_request_size must be greater than 0')
 
-        self._compilers: asyncio.LifoQueue[Any] = asyncio.LifoQueue()
-        self._compilers_list: List[Any] = []
+        # Compilers are drawn from the server-wide pool, the semaphore
+        # limits the number of concurrent compilations of this port.
+        self._compilers_sem = asyncio.Semaphore(concurrency)
 
         self._nethost = nethost
         self._netport = netport
@@ -62,16 +71,74 @@ class BaseHttpPort(baseport.Port):
         self.database = database
         self.user = user
         self.concurrency = concurrency
-        self.last_minute_requests = windowedsum.WindowedSum()
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.max_request_size = max_request_size
 
+        self.last_minute_requests = windowedsum.WindowedSum()
+        self.request_latency = {
+            phase: histogram.Histogram()
+            for phase in ('parse', 'compile', 'execute', 'total')
+        }
+        self.rejected_connections = 0
+        self.idle_connections_closed = 0
+        self._connections = set()
+
+        self._compilers_registered = False
         self._http_proto_server = None
         self._http_request_logger = None
         self._query_cache = cache.StatementsCache(
             maxsize=defines.HTTP_PORT_QUERY_CACHE_SIZE)
 
-    @property
-    def compilers(self):
-        return self._compilers
+    async def acquire_compiler(self):
+        await self._compilers_sem.acquire()
+        try:
+            return await self.get_server().get_http_compiler_pool().acquire(
+                self.get_compiler_worker_cls(),
+                self.database,
+                self.get_dbver(),
+            )
+        except BaseException:
+            self._compilers_sem.release()
+            raise
+
+    def release_compiler(self, compiler):
+        self.get_server().get_http_compiler_pool().release(
+            self.get_compiler_worker_cls(),
+            self.database,
+            compiler,
+        )
+        self._compilers_sem.release()
+
+    def register_connection(self, proto) -> bool:
+        """Track a new connection; return False if it must be rejected."""
+        if len(self._connections) >= self.max_connections:
+            self.rejected_connections += 1
+            return False
+        self._connections.add(proto)
+        return True
+
+    def unregister_connection(self, proto):
+        self._connections.discard(proto)
+
+    def record_latency(self, phase: str, seconds: float):
+        self.request_latency[phase].observe(seconds)
+
+    def get_metrics(self) -> dict:
+        latency = {}
+        for phase, hist in self.request_latency.items():
+            latency[phase] = {
+                'count': hist.count,
+                'sum': hist.sum,
+                'buckets': hist.get_buckets(),
+            }
+        return {
+            'requests_last_minute': int(self.last_minute_requests),
+            'connections': len(self._connections),
+            'rejected_connections': self.rejected_connections,
+            'idle_connections_closed': self.idle_connections_closed,
+            'latency': latency,
+        }
 
     @classmethod
     def get_proto_name(cls):
@@ -83,25 +150,27 @@ class BaseHttpPort(baseport.Port):
     def get_compiler_worker_cls(self):
         raise NotImplementedError
 
-    def get_compiler_worker_name(self):
-        return f'compiler-{self._netport}'
-
     def build_protocol(self):
         raise NotImplementedError
 
-    async def start(self):
-        compilers = []
-        await super().start()
+    async def start_compilers(self):
+        await self.get_server().get_http_compiler_pool().register(
+            self.get_compiler_worker_cls(),
+            self.database,
+            self.get_dbver(),
+        )
+        self._compilers_registered = True
 
-        async with taskgroup.TaskGroup() as g:
-            for _ in range(self.concurrency):
-                compilers.append(
-                    g.create_task(self.new_compiler(
-                        self.database, self.get_dbver())))
+    async def stop_compilers(self):
+        if self._compilers_registered:
+            self._compilers_registered = False
+            await self.get_server().get_http_compiler_pool().unregister(
+                self.get_compiler_worker_cls(),
+                self.database,
+            )
 
-        for com_task in compilers:
-            self._compilers.put_nowait(com_task.result())
-            self._compilers_list.append(com_task.result())
+    async def start(self):
+        await super().start()
 
         nethost = await self._fix_localhost(self._nethost, self._netport)
         self._http_proto_server = await self._loop.create_server(
@@ -120,11 +189,6 @@ class BaseHttpPort(baseport.Port):
                 await srv.wait_closed()
         finally:
             try:
-                async with taskgroup.TaskGroup() as g:
-                    for cmp in self._compilers_list:
-                        g.create_task(cmp.close())
-                    self._compilers_list.clear()
-
                 if self._http_request_logger is not None:
                     self._http_request_logger.cancel()
                     await self._http_request_logger
@@ -137,11 +201,29 @@ class BaseHttpPort(baseport.Port):
             current = int(self.last_minute_requests)
             if current != last_seen:
                 log_metrics.info(
-                    "HTTP requests for %s-%s in last minute: %d",
+                    "HTTP requests for %s-%s in last minute: %d; "
+                    "connections=%d rejected=%d idle_closed=%d",
                     self.get_proto_name(),
                     self._netport,
                     current,
+                    len(self._connections),
+                    self.rejected_connections,
+                    self.idle_connections_closed,
                 )
+                for phase, hist in self.request_latency.items():
+                    if not hist.count:
+                        continue
+                    log_metrics.info(
+                        "HTTP %s latency for %s-%s: count=%d "
+                        "mean=%.4fs p50<=%ss p99<=%ss",
+                        phase,
+                        self.get_proto_name(),
+                        self._netport,
+                        hist.count,
+                        hist.sum / hist.count,
+                        hist.quantile(0.5),
+                        hist.quantile(0.99),
+                    )
                 last_seen = current
             try:
                 await asyncio.sleep(30)
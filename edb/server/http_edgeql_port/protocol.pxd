@@ -24,3 +24,7 @@ from edb.server.cache cimport stmt_cache
 cdef class Protocol(http.HttpProtocol):
     cdef:
         stmt_cache.StatementsCache query_cache
+
+    cdef _validate_query(self, query, variables)
+    cdef list _parse_batch(self, list body)
+    cdef dict _format_error(self, ex)
@@ -17,7 +17,9 @@
 #
 
 
+import asyncio
 import json
+import time
 import urllib.parse
 
 import immutables
@@ -30,8 +32,10 @@ from edb.common import debug
 from edb.common import markup
 
 from edb.server import compiler
+from edb.server import defines
 from edb.server.compiler import IoFormat
 from edb.server.compiler import enums
+from edb.server.compiler import explain
 from edb.server.http import http
 from edb.server.http cimport http
 
@@ -59,16 +63,24 @@ cdef class Protocol(http.HttpProtocol):
 
         variables = None
         query = None
+        batch = None
+        read_only = False
 
+        started_at = time.monotonic()
         try:
             if request.method == b'POST':
                 if request.content_type and b'json' in request.content_type:
                     body = json.loads(request.body)
-                    if not isinstance(body, dict):
+                    if isinstance(body, list):
+                        batch = self._parse_batch(body)
+                        read_only = _is_read_only_batch(request)
+                    elif not isinstance(body, dict):
                         raise TypeError(
-                            'the body of the request must be a JSON object')
-                    query = body.get('query')
-                    variables = body.get('variables')
+                            'the body of the request must be a JSON object '
+                            'or an array of JSON objects')
+                    else:
+                        query = body.get('query')
+                        variables = body.get('variables')
                 else:
                     raise TypeError(
                         'unable to interpret EdgeQL POST request')
@@ -93,11 +105,8 @@ cdef class Protocol(http.HttpProtocol):
             else:
                 raise TypeError('expected a GET or a POST request')
 
-            if not query:
-                raise TypeError('invalid EdgeQL request: query is missing')
-
-            if variables is not None and not isinstance(variables, dict):
-                raise TypeError('"variables" must be a JSON object')
+            if batch is None:
+                self._validate_query(query, variables)
 
         except Exception as ex:
             if debug.flags.server:
@@ -108,31 +117,75 @@ cdef class Protocol(http.HttpProtocol):
             response.close_connection = True
             return
 
+        self.server.record_latency('parse', time.monotonic() - started_at)
+
         response.status = http.HTTPStatus.OK
         response.content_type = b'application/json'
+
+        if batch is not None:
+            response.body = await self.execute_batch(batch, read_only)
+            return
+
         try:
+            if self.can_stream(request):
+                await self.execute_streaming(
+                    request, response, query.encode(), variables)
+                return
             result = await self.execute(query.encode(), variables)
         except Exception as ex:
-            if debug.flags.server:
-                markup.dump(ex)
-
-            ex_type = type(ex)
-            if not issubclass(ex_type, errors.EdgeDBError):
-                # XXX Fix this when LSP "location" objects are implemented
-                ex_type = errors.InternalServerError
-
-            err_dct = {
-                'message': str(ex),
-                'type': str(ex_type.__name__),
-                'code': ex_type.get_code(),
-            }
-
-            response.body = json.dumps({'error': err_dct}).encode()
+            if response.streamed:
+                raise
+            response.body = json.dumps(
+                {'error': self._format_error(ex)}).encode()
         else:
             response.body = b'{"data":' + result + b'}'
 
+    cdef _validate_query(self, query, variables):
+        if not query:
+            raise TypeError('invalid EdgeQL request: query is missing')
+
+        if variables is not None and not isinstance(variables, dict):
+            raise TypeError('"variables" must be a JSON object')
+
+    cdef list _parse_batch(self, list body):
+        if not body:
+            raise TypeError('invalid EdgeQL request: the batch is empty')
+
+        if len(body) > defines.HTTP_PORT_MAX_BATCH_SIZE:
+            raise TypeError(
+                f'invalid EdgeQL request: the batch contains more than '
+                f'{defines.HTTP_PORT_MAX_BATCH_SIZE} queries')
+
+        batch = []
+        for item in body:
+            if not isinstance(item, dict):
+                raise TypeError(
+                    'every element of a batch must be a JSON object')
+            query = item.get('query')
+            variables = item.get('variables')
+            self._validate_query(query, variables)
+            batch.append((query.encode(), variables))
+
+        return batch
+
+    cdef dict _format_error(self, ex):
+        if debug.flags.server:
+            markup.dump(ex)
+
+        ex_type = type(ex)
+        if not issubclass(ex_type, errors.EdgeDBError):
+            # XXX Fix this when LSP "location" objects are implemented
+            ex_type = errors.InternalServerError
+
+        return {
+            'message': str(ex),
+            'type': str(ex_type.__name__),
+            'code': ex_type.get_code(),
+        }
+
     async def compile(self, dbver, bytes query):
-        comp = await self.server.compilers.get()
+        started_at = time.monotonic()
+        comp = await self.server.acquire_compiler()
         try:
             units = await comp.call(
                 'compile',
@@ -140,7 +193,7 @@ cdef class Protocol(http.HttpProtocol):
                 edgeql.Source.from_string(query.decode('utf-8')),
                 None,           # modaliases
                 None,           # session config
-                IoFormat.JSON,  # json mode
+                IoFormat.JSON_ELEMENTS,  # one JSON row per element
                 False,          # expected cardinality is MANY
                 0,              # no implicit limit
                 False,          # no inlining of type IDs
@@ -150,9 +203,11 @@ cdef class Protocol(http.HttpProtocol):
             )
             return units[0]
         finally:
-            self.server.compilers.put_nowait(comp)
+            self.server.release_compiler(comp)
+            self.server.record_latency(
+                'compile', time.monotonic() - started_at)
 
-    async def execute(self, bytes query, variables):
+    async def prepare(self, bytes query, variables):
         dbver = self.server.get_dbver()
         cache_key = (query, dbver)
         use_prep_stmt = False
@@ -185,17 +240,217 @@ cdef class Protocol(http.HttpProtocol):
                             f'parameter ${param.name} is required')
                     args.append(value)
 
+        return query_unit, use_prep_stmt, args
+
+    async def _execute_explain(self, pgcon, query_unit):
+        rows = await pgcon.simple_query(query_unit.sql[0], False)
+        return explain.encode_plan(query_unit.explain, rows[0][0])
+
+    async def execute_prepared(self, pgcon, query_unit,
+                               bint use_prep_stmt, list args):
+        started_at = time.monotonic()
+        try:
+            if query_unit.explain is not None:
+                data = await self._execute_explain(pgcon, query_unit)
+            else:
+                data = await pgcon.parse_execute_json_elements(
+                    query_unit.sql[0], query_unit.sql_hash,
+                    query_unit.dbver, use_prep_stmt, args)
+        finally:
+            self.server.record_latency(
+                'execute', time.monotonic() - started_at)
+
+        return b'[' + data + b']'
+
+    async def _fetch_elements(self, pgcon, query_unit,
+                              bint use_prep_stmt, list args, output_queue):
+        started_at = time.monotonic()
+        try:
+            if query_unit.explain is not None:
+                await output_queue.put(
+                    await self._execute_explain(pgcon, query_unit))
+            else:
+                await pgcon.parse_execute_json_elements(
+                    query_unit.sql[0], query_unit.sql_hash,
+                    query_unit.dbver, use_prep_stmt, args, output_queue,
+                    defines.HTTP_PORT_STREAM_FRAGMENT_SIZE)
+        except Exception as ex:
+            await output_queue.put(ex)
+        else:
+            await output_queue.put(None)
+        finally:
+            # This includes the time the backend waited for the client
+            # to consume the streamed result.
+            self.server.record_latency(
+                'execute', time.monotonic() - started_at)
+
+    async def execute_streaming(self, http.HttpRequest request,
+                                http.HttpResponse response,
+                                bytes query, variables):
+        cdef bytes pending = b''
+
+        query_unit, use_prep_stmt, args = await self.prepare(
+            query, variables)
+
+        output_queue = asyncio.Queue(maxsize=2)
         pgcon = await self.server.get_server().acquire_pgcon(
-            self.server.database)
+            self.server.database,
+            prepared_stmt=self._prepared_stmt(query_unit, use_prep_stmt),
+        )
+        fetcher = asyncio.create_task(self._fetch_elements(
+            pgcon, query_unit, use_prep_stmt, args, output_queue))
+        discard = False
+        try:
+            error = None
+            while True:
+                fragment = await output_queue.get()
+                if fragment is None or isinstance(fragment, Exception):
+                    error = fragment
+                    await fetcher
+                    break
+                elif response.streamed:
+                    await self.write_chunk(fragment)
+                elif not pending:
+                    pending = fragment
+                else:
+                    # The result does not fit into a single fragment,
+                    # stream it to the client instead of buffering it.
+                    self.start_streaming(request, response)
+                    await self.write_chunk(b'{"data":[' + pending)
+                    await self.write_chunk(fragment)
+
+            if not response.streamed:
+                if error is not None:
+                    raise error
+                response.body = b'{"data":[' + pending + b']}'
+                return
+
+            if error is None:
+                await self.write_chunk(b']}')
+            else:
+                # It is too late to change the response status, so
+                # report the error after the partially sent data and
+                # drop the connection.
+                response.close_connection = True
+                await self.write_chunk(
+                    b'],"error":' +
+                    json.dumps(self._format_error(error)).encode() +
+                    b'}')
+            self.finish_streaming()
+        finally:
+            if not fetcher.done():
+                # The client has gone away in the middle of the
+                # response, the backend connection is now out of sync.
+                discard = True
+                fetcher.cancel()
+                try:
+                    await fetcher
+                except asyncio.CancelledError:
+                    pass
+            self.server.get_server().release_pgcon(
+                self.server.database, pgcon, discard=discard)
+
+    def _prepared_stmt(self, query_unit, bint use_prep_stmt):
+        if use_prep_stmt:
+            return (query_unit.sql_hash, query_unit.dbver)
+        else:
+            return None
+
+    async def execute(self, bytes query, variables):
+        query_unit, use_prep_stmt, args = await self.prepare(
+            query, variables)
+
+        pgcon = await self.server.get_server().acquire_pgcon(
+            self.server.database,
+            prepared_stmt=self._prepared_stmt(query_unit, use_prep_stmt),
+        )
         try:
-            data = await pgcon.parse_execute_json(
-                query_unit.sql[0], query_unit.sql_hash, query_unit.dbver,
-                use_prep_stmt, args)
+            return await self.execute_prepared(
+                pgcon, query_unit, use_prep_stmt, args)
         finally:
             self.server.get_server().release_pgcon(self.server.database, pgcon)
 
-        if data is None:
-            raise errors.InternalServerError(
-                f'no data received for a JSON query {query_unit.sql[0]!r}')
+    async def execute_batch(self, list batch, bint read_only):
+        # Compile (or fetch from the cache) all queries of the batch
+        # upfront, so that they can share a single backend connection.
+        prepared = await asyncio.gather(
+            *[self.prepare(query, variables) for query, variables in batch],
+            return_exceptions=True,
+        )
+
+        results = []
+        # The backend connection is acquired once there is something
+        # to execute, so that a batch of items that all failed to
+        # compile does not need one.
+        pgcon = None
+        try:
+            for item in prepared:
+                executed = False
+                try:
+                    if isinstance(item, BaseException):
+                        # Errors are reported per item, while
+                        # cancellation propagates.
+                        raise item
+
+                    query_unit, use_prep_stmt, args = item
+                    if read_only and query_unit.capabilities:
+                        raise query_unit.capabilities.make_error(
+                            0,
+                            errors.UnsupportedCapabilityError,
+                        )
+
+                    if pgcon is None:
+                        pgcon = await self._acquire_batch_pgcon(read_only)
+                    executed = True
+                    data = await self.execute_prepared(
+                        pgcon, query_unit, use_prep_stmt, args)
+                except Exception as ex:
+                    if read_only and executed:
+                        try:
+                            await pgcon.simple_query(
+                                b'ROLLBACK TO SAVEPOINT batch_item;', True)
+                        except Exception:
+                            # The connection is in an unknown state,
+                            # the rest of the batch uses a new one.
+                            self.server.get_server().release_pgcon(
+                                self.server.database, pgcon, discard=True)
+                            pgcon = None
+                    results.append(json.dumps(
+                        {'error': self._format_error(ex)}).encode())
+                else:
+                    results.append(b'{"data":' + data + b'}')
+        finally:
+            if pgcon is not None:
+                try:
+                    if read_only:
+                        await pgcon.simple_query(b'ROLLBACK;', True)
+                finally:
+                    self.server.get_server().release_pgcon(
+                        self.server.database, pgcon)
+
+        return b'[' + b','.join(results) + b']'
 
-        return data
+    async def _acquire_batch_pgcon(self, bint read_only):
+        pgcon = await self.server.get_server().acquire_pgcon(
+            self.server.database)
+        if read_only:
+            # A failed item aborts the transaction, it is rolled back
+            # to this savepoint so that the rest of the batch can
+            # still be executed.
+            try:
+                await pgcon.simple_query(
+                    b'START TRANSACTION READ ONLY; SAVEPOINT batch_item;',
+                    True)
+            except Exception:
+                self.server.get_server().release_pgcon(
+                    self.server.database, pgcon, discard=True)
+                raise
+        return pgcon
+
+
+cdef bint _is_read_only_batch(http.HttpRequest request):
+    if not request.url.query:
+        return False
+    qs = urllib.parse.parse_qs(request.url.query.decode('ascii'))
+    read_only = qs.get('read_only')
+    return read_only is not None and read_only[0].lower() in {'true', '1'}
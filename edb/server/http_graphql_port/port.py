@@ -19,6 +19,8 @@
 
 from __future__ import annotations
 
+from edb.server import cache
+from edb.server import defines
 from edb.server import http
 
 from . import compiler
@@ -27,8 +29,15 @@ from . import protocol  # type: ignore
 
 class HttpGraphQLPort(http.BaseHttpPort):
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # (sha256 hash, operation name) -> protocol.PersistedQuery
+        self._persisted_queries = cache.StatementsCache(
+            maxsize=defines.HTTP_PORT_PERSISTED_QUERY_CACHE_SIZE)
+
     def build_protocol(self):
-        return protocol.Protocol(self._loop, self, self._query_cache)
+        return protocol.Protocol(
+            self._loop, self, self._query_cache, self._persisted_queries)
 
     def get_compiler_worker_cls(self):
         return compiler.Compiler
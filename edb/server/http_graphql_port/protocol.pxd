@@ -24,3 +24,11 @@ from edb.server.cache cimport stmt_cache
 cdef class Protocol(http.HttpProtocol):
     cdef:
         stmt_cache.StatementsCache query_cache
+        stmt_cache.StatementsCache persisted_queries
+
+    cdef _validate_query(self, query, operation_name, variables, extensions)
+    cdef list _parse_batch(self, list body)
+    cdef dict _format_error(self, ex)
+    cdef _get_persisted_hash(self, dict extensions)
+    cdef _rewrite(self, query, operation_name)
+    cdef _get_persisted(self, query, operation_name, str persisted_hash)
@@ -17,9 +17,12 @@
 #
 
 
+import asyncio
 import cython
+import hashlib
 import json
 import logging
+import time
 import urllib.parse
 from typing import Any, Dict, Tuple, List, Optional, Union
 
@@ -33,6 +36,7 @@ from edb.server.pgcon import errors as pgerrors
 from edb.common import debug
 from edb.common import markup
 
+from edb.server import defines
 from edb.server.http import http
 from edb.server.http cimport http
 
@@ -58,11 +62,28 @@ cdef class CacheRedirect:
 CacheEntry = Union[CacheRedirect, compiler.CompiledOperation]
 
 
+class PersistedQueryNotFound(Exception):
+    pass
+
+
+@cython.final
+cdef class PersistedQuery:
+    cdef public str query
+    # The result of `_graphql_rewrite.rewrite()` or None if the query
+    # could not be rewritten and should be compiled as is.
+    cdef public object rewritten
+
+    def __init__(self, query: str, rewritten):
+        self.query = query
+        self.rewritten = rewritten
+
+
 cdef class Protocol(http.HttpProtocol):
 
-    def __init__(self, loop, server, query_cache):
+    def __init__(self, loop, server, query_cache, persisted_queries):
         http.HttpProtocol.__init__(self, loop, server)
         self.query_cache = query_cache
+        self.persisted_queries = persisted_queries
 
     async def handle_request(self, http.HttpRequest request,
                              http.HttpResponse response):
@@ -81,18 +102,29 @@ cdef class Protocol(http.HttpProtocol):
 
         operation_name = None
         variables = None
+        extensions = None
         query = None
+        persisted_hash = None
+        batch = None
+        read_only = False
 
+        started_at = time.monotonic()
         try:
             if request.method == b'POST':
                 if request.content_type and b'json' in request.content_type:
                     body = json.loads(request.body)
-                    if not isinstance(body, dict):
+                    if isinstance(body, list):
+                        batch = self._parse_batch(body)
+                        read_only = _is_read_only_batch(request)
+                    elif not isinstance(body, dict):
                         raise TypeError(
-                            'the body of the request must be a JSON object')
-                    query = body.get('query')
-                    operation_name = body.get('operationName')
-                    variables = body.get('variables')
+                            'the body of the request must be a JSON object '
+                            'or an array of JSON objects')
+                    else:
+                        query = body.get('query')
+                        operation_name = body.get('operationName')
+                        variables = body.get('variables')
+                        extensions = body.get('extensions')
                 elif request.content_type == 'application/graphql':
                     query = request.body.decode('utf-8')
                 else:
@@ -120,18 +152,20 @@ cdef class Protocol(http.HttpProtocol):
                             raise TypeError(
                                 '"variables" must be a JSON object')
 
+                    extensions = qs.get('extensions')
+                    if extensions is not None:
+                        try:
+                            extensions = json.loads(extensions[0])
+                        except Exception:
+                            raise TypeError(
+                                '"extensions" must be a JSON object')
+
             else:
                 raise TypeError('expected a GET or a POST request')
 
-            if not query:
-                raise TypeError('invalid GraphQL request: query is missing')
-
-            if (operation_name is not None and
-                    not isinstance(operation_name, str)):
-                raise TypeError('operationName must be a string')
-
-            if variables is not None and not isinstance(variables, dict):
-                raise TypeError('"variables" must be a JSON object')
+            if batch is None:
+                persisted_hash = self._validate_query(
+                    query, operation_name, variables, extensions)
 
         except Exception as ex:
             if debug.flags.server:
@@ -142,32 +176,145 @@ cdef class Protocol(http.HttpProtocol):
             response.close_connection = True
             return
 
+        self.server.record_latency('parse', time.monotonic() - started_at)
+
         response.status = http.HTTPStatus.OK
         response.content_type = b'application/json'
+
+        if batch is not None:
+            response.body = await self.execute_batch(batch, read_only)
+            return
+
         try:
-            result = await self.execute(query, operation_name, variables)
+            result = await self.execute(
+                query, operation_name, variables, persisted_hash)
         except Exception as ex:
-            if debug.flags.server:
-                markup.dump(ex)
-
-            ex_type = type(ex)
-            if issubclass(ex_type, (gql_errors.GraphQLError,
-                                    pgerrors.BackendError)):
-                # XXX Fix this when LSP "location" objects are implemented
-                ex_type = errors.QueryError
+            response.body = json.dumps(
+                {'errors': [self._format_error(ex)]}).encode()
+        else:
+            response.body = b'{"data":' + result + b'}'
 
-            err_dct = {
-                'message': f'{ex_type.__name__}: {ex}',
+    cdef _validate_query(self, query, operation_name, variables, extensions):
+        persisted_hash = None
+
+        if extensions is not None:
+            if not isinstance(extensions, dict):
+                raise TypeError('"extensions" must be a JSON object')
+            persisted_hash = self._get_persisted_hash(extensions)
+
+        if not query and persisted_hash is None:
+            raise TypeError('invalid GraphQL request: query is missing')
+
+        if (operation_name is not None and
+                not isinstance(operation_name, str)):
+            raise TypeError('operationName must be a string')
+
+        if variables is not None and not isinstance(variables, dict):
+            raise TypeError('"variables" must be a JSON object')
+
+        return persisted_hash
+
+    cdef list _parse_batch(self, list body):
+        if not body:
+            raise TypeError('invalid GraphQL request: the batch is empty')
+
+        if len(body) > defines.HTTP_PORT_MAX_BATCH_SIZE:
+            raise TypeError(
+                f'invalid GraphQL request: the batch contains more than '
+                f'{defines.HTTP_PORT_MAX_BATCH_SIZE} queries')
+
+        batch = []
+        for item in body:
+            if not isinstance(item, dict):
+                raise TypeError(
+                    'every element of a batch must be a JSON object')
+            query = item.get('query')
+            operation_name = item.get('operationName')
+            variables = item.get('variables')
+            persisted_hash = self._validate_query(
+                query, operation_name, variables, item.get('extensions'))
+            batch.append((query, operation_name, variables, persisted_hash))
+
+        return batch
+
+    cdef dict _format_error(self, ex):
+        if isinstance(ex, PersistedQueryNotFound):
+            # This is the expected outcome for the first request of
+            # a client using automatic persisted queries, the client
+            # is supposed to retry with the full query text.
+            return {
+                'message': 'PersistedQueryNotFound',
+                'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'},
             }
 
-            if (isinstance(ex, errors.EdgeDBError) and
-                    hasattr(ex, 'line') and
-                    hasattr(ex, 'col')):
-                err_dct['locations'] = [{'line': ex.line, 'column': ex.col}]
+        if debug.flags.server:
+            markup.dump(ex)
 
-            response.body = json.dumps({'errors': [err_dct]}).encode()
-        else:
-            response.body = b'{"data":' + result + b'}'
+        ex_type = type(ex)
+        if issubclass(ex_type, (gql_errors.GraphQLError,
+                                pgerrors.BackendError)):
+            # XXX Fix this when LSP "location" objects are implemented
+            ex_type = errors.QueryError
+
+        err_dct = {
+            'message': f'{ex_type.__name__}: {ex}',
+        }
+
+        if (isinstance(ex, errors.EdgeDBError) and
+                hasattr(ex, 'line') and
+                hasattr(ex, 'col')):
+            err_dct['locations'] = [{'line': ex.line, 'column': ex.col}]
+
+        return err_dct
+
+    cdef _get_persisted_hash(self, dict extensions):
+        pq = extensions.get('persistedQuery')
+        if pq is None:
+            return None
+
+        if not isinstance(pq, dict) or pq.get('version') != 1:
+            raise TypeError('unsupported "persistedQuery" version')
+
+        persisted_hash = pq.get('sha256Hash')
+        if (not isinstance(persisted_hash, str) or
+                len(persisted_hash) != 64):
+            raise TypeError(
+                '"persistedQuery" must contain a hex-encoded SHA-256 '
+                'hash of the query in "sha256Hash"')
+
+        return persisted_hash.lower()
+
+    cdef _rewrite(self, query, operation_name):
+        try:
+            return _graphql_rewrite.rewrite(operation_name, query)
+        except _graphql_rewrite.QueryError as e:
+            raise errors.QueryError(e.args[0])
+        except Exception as e:
+            if isinstance(e, _USER_ERRORS):
+                logger.info("Error rewriting graphql query: %r", e)
+            else:
+                logger.warning("Error rewriting graphql query: %r", e)
+            return None
+
+    cdef _get_persisted(self, query, operation_name, str persisted_hash):
+        cdef PersistedQuery entry
+
+        pq_key = (persisted_hash, operation_name)
+        entry = self.persisted_queries.get(pq_key, None)
+        if entry is not None:
+            return entry
+
+        if not query:
+            raise PersistedQueryNotFound()
+
+        query_hash = hashlib.sha256(query.encode('utf-8')).hexdigest()
+        if query_hash != persisted_hash:
+            raise errors.QueryError(
+                'provided "sha256Hash" does not match the query')
+
+        entry = PersistedQuery(query, self._rewrite(query, operation_name))
+        self.persisted_queries[pq_key] = entry
+        return entry
 
     async def compile(self,
             dbver: int,
@@ -177,7 +324,8 @@ cdef class Protocol(http.HttpProtocol):
             operation_name: Optional[str],
             variables: Dict[str, Any],
         ):
-        compiler = await self.server.compilers.get()
+        started_at = time.monotonic()
+        compiler = await self.server.acquire_compiler()
         try:
             return await compiler.call(
                 'compile_graphql',
@@ -188,9 +336,14 @@ cdef class Protocol(http.HttpProtocol):
                 operation_name,
                 variables)
         finally:
-            self.server.compilers.put_nowait(compiler)
+            self.server.release_compiler(compiler)
+            self.server.record_latency(
+                'compile', time.monotonic() - started_at)
+
+    async def prepare(self, query, operation_name, variables,
+                      persisted_hash=None):
+        cdef PersistedQuery persisted
 
-    async def execute(self, query, operation_name, variables):
         dbver = self.server.get_dbver()
 
         if variables:
@@ -199,29 +352,34 @@ cdef class Protocol(http.HttpProtocol):
                     raise errors.QueryError(
                         f"Variables starting with '_edb_arg__' are prohibited")
 
+        if persisted_hash is not None:
+            # Persisted queries keep the result of the rewrite around,
+            # so that a hit skips re-tokenizing the query text entirely.
+            persisted = self._get_persisted(
+                query, operation_name, persisted_hash)
+            query = persisted.query
+            rewritten = persisted.rewritten
+        else:
+            rewritten = self._rewrite(query, operation_name)
+
         if debug.flags.graphql_compile:
             debug.header('Input graphql')
             print(query)
             print(f'variables: {variables}')
 
-        try:
-            rewritten = _graphql_rewrite.rewrite(operation_name, query)
-
+        if rewritten is not None:
             vars = rewritten.variables().copy()
             if variables:
                 vars.update(variables)
             key_var_names = rewritten.key_vars()
-            # on bad queries the following line can trigger KeyError
-            key_vars = tuple(vars[k] for k in key_var_names)
-        except _graphql_rewrite.QueryError as e:
-            raise errors.QueryError(e.args[0])
-        except Exception as e:
-            if isinstance(e, _USER_ERRORS):
-                logger.info("Error rewriting graphql query: %r", e)
-            else:
+            try:
+                key_vars = tuple(vars[k] for k in key_var_names)
+            except KeyError as e:
+                # on bad queries the rewritten key vars may be missing
                 logger.warning("Error rewriting graphql query: %r", e)
-            rewritten = None
-            rewrite_error = e
+                rewritten = None
+
+        if rewritten is None:
             prepared_query = query
             vars = variables.copy() if variables else {}
             key_var_names = []
@@ -285,17 +443,116 @@ cdef class Protocol(http.HttpProtocol):
                 else:
                     args.append(vars[name])
 
-        pgcon = await self.server.get_server().acquire_pgcon(
-            self.server.database)
+        return op, use_prep_stmt, args
+
+    async def execute_prepared(self, pgcon, op, bint use_prep_stmt,
+                               list args):
+        started_at = time.monotonic()
         try:
             data = await pgcon.parse_execute_json(
                 op.sql, op.sql_hash, op.dbver,
                 use_prep_stmt, args)
         finally:
-            self.server.get_server().release_pgcon(self.server.database, pgcon)
+            self.server.record_latency(
+                'execute', time.monotonic() - started_at)
 
         if data is None:
             raise errors.InternalServerError(
                 f'no data received for a JSON query {op.sql!r}')
 
         return data
+
+    async def execute(self, query, operation_name, variables,
+                      persisted_hash=None):
+        op, use_prep_stmt, args = await self.prepare(
+            query, operation_name, variables, persisted_hash)
+
+        pgcon = await self.server.get_server().acquire_pgcon(
+            self.server.database,
+            prepared_stmt=(
+                (op.sql_hash, op.dbver) if use_prep_stmt else None),
+        )
+        try:
+            return await self.execute_prepared(
+                pgcon, op, use_prep_stmt, args)
+        finally:
+            self.server.get_server().release_pgcon(self.server.database, pgcon)
+
+    async def execute_batch(self, list batch, bint read_only):
+        # Compile (or fetch from the cache) all operations of the batch
+        # upfront, so that they can share a single backend connection.
+        prepared = await asyncio.gather(
+            *[self.prepare(*item) for item in batch],
+            return_exceptions=True,
+        )
+
+        results = []
+        # The backend connection is acquired once there is something
+        # to execute, so that a batch of items that all failed to
+        # compile does not need one.
+        pgcon = None
+        try:
+            for item in prepared:
+                executed = False
+                try:
+                    if isinstance(item, BaseException):
+                        # Errors are reported per item, while
+                        # cancellation propagates.
+                        raise item
+
+                    op, use_prep_stmt, args = item
+                    if pgcon is None:
+                        pgcon = await self._acquire_batch_pgcon(read_only)
+                    executed = True
+                    data = await self.execute_prepared(
+                        pgcon, op, use_prep_stmt, args)
+                except Exception as ex:
+                    if read_only and executed:
+                        try:
+                            await pgcon.simple_query(
+                                b'ROLLBACK TO SAVEPOINT batch_item;', True)
+                        except Exception:
+                            # The connection is in an unknown state,
+                            # the rest of the batch uses a new one.
+                            self.server.get_server().release_pgcon(
+                                self.server.database, pgcon, discard=True)
+                            pgcon = None
+                    results.append(json.dumps(
+                        {'errors': [self._format_error(ex)]}).encode())
+                else:
+                    results.append(b'{"data":' + data + b'}')
+        finally:
+            if pgcon is not None:
+                try:
+                    if read_only:
+                        await pgcon.simple_query(b'ROLLBACK;', True)
+                finally:
+                    self.server.get_server().release_pgcon(
+                        self.server.database, pgcon)
+
+        return b'[' + b','.join(results) + b']'
+
+    async def _acquire_batch_pgcon(self, bint read_only):
+        pgcon = await self.server.get_server().acquire_pgcon(
+            self.server.database)
+        if read_only:
+            # A failed item aborts the transaction, it is rolled back
+            # to this savepoint so that the rest of the batch can
+            # still be executed.
+            try:
+                await pgcon.simple_query(
+                    b'START TRANSACTION READ ONLY; SAVEPOINT batch_item;',
+                    True)
+            except Exception:
+                self.server.get_server().release_pgcon(
+                    self.server.database, pgcon, discard=True)
+                raise
+        return pgcon
+
+
+cdef bint _is_read_only_batch(http.HttpRequest request):
+    if not request.url.query:
+        return False
+    qs = urllib.parse.parse_qs(request.url.query.decode('ascii'))
+    read_only = qs.get('read_only')
+    return read_only is not None and read_only[0].lower() in {'true', '1'}
@@ -59,6 +59,7 @@ cdef class QueryRequestInfo:
     cdef public bint inline_typeids
     cdef public bint inline_typenames
     cdef public uint64_t allow_capabilities
+    cdef public object plan_cache_mode  # Optional[str]
 
     cdef int cached_hash
 
@@ -138,6 +139,8 @@ cdef class EdgeConnection:
 
     cdef get_backend(self)
 
+    cdef _check_capabilities(self, list units, uint64_t allow_capabilities)
+
     cdef uint64_t _parse_implicit_limit(self, bytes v) except <uint64_t>-1
 
 
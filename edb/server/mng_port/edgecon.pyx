@@ -60,6 +60,7 @@ from edb.server import buildmeta
 from edb.server import compiler
 from edb.server import defines as edbdef
 from edb.server.compiler import errormech
+from edb.server.compiler import explain
 from edb.server.compiler import enums
 from edb.server.pgcon cimport pgcon
 from edb.server.pgcon import errors as pgerror
@@ -100,11 +101,18 @@ DEF QUERY_HEADER_IMPLICIT_LIMIT = 0xFF01
 DEF QUERY_HEADER_IMPLICIT_TYPENAMES = 0xFF02
 DEF QUERY_HEADER_IMPLICIT_TYPEIDS = 0xFF03
 DEF QUERY_HEADER_ALLOW_CAPABILITIES = 0xFF04
+DEF QUERY_HEADER_PLAN_CACHE_MODE = 0xFF05
 
 DEF SERVER_HEADER_CAPABILITIES = 0x1001
 
 DEF ALL_CAPABILITIES = 0xFFFFFFFFFFFFFFFF
 
+cdef tuple PLAN_CACHE_MODES = (
+    'auto',
+    'force_custom_plan',
+    'force_generic_plan',
+)
+
 
 def parse_capabilities_header(value: bytes) -> uint64_t:
     if len(value) != 8:
@@ -127,6 +135,16 @@ cdef inline bint parse_boolean(value: bytes, header: str):
         )
 
 
+cdef inline str parse_plan_cache_mode(value: bytes):
+    cdef str mode = value.decode('utf-8', 'replace')
+    if mode not in PLAN_CACHE_MODES:
+        raise errors.BinaryProtocolError(
+            f'PLAN_CACHE_MODE header must be one of '
+            f'{", ".join(map(repr, PLAN_CACHE_MODES))}'
+        )
+    return mode
+
+
 @cython.final
 cdef class QueryRequestInfo:
 
@@ -139,6 +157,7 @@ cdef class QueryRequestInfo:
         inline_typeids: bint,
         inline_typenames: bint,
         allow_capabilities: uint64_t,
+        plan_cache_mode: object = None,
     ):
         self.source = source
         self.io_format = io_format
@@ -147,6 +166,7 @@ cdef class QueryRequestInfo:
         self.inline_typeids = inline_typeids
         self.inline_typenames = inline_typenames
         self.allow_capabilities = allow_capabilities
+        self.plan_cache_mode = plan_cache_mode
 
         self.cached_hash = hash((
             self.source.cache_key(),
@@ -185,6 +205,42 @@ cdef class CompiledQuery:
         self.extra_blob = extra_blob
 
 
+cdef bint _leaves_tx(query_unit):
+    return bool(
+        query_unit.tx_commit or
+        query_unit.tx_rollback or
+        query_unit.tx_savepoint_rollback
+    )
+
+
+cdef list _split_script(bytes eql, Py_ssize_t batch_size):
+    # Split a script into batches of whole top-level statements
+    # of at least *batch_size* bytes each.
+    try:
+        tokens = edgeql.tokenizer.tokenize(eql.decode('utf-8'))
+    except errors.EdgeQLSyntaxError:
+        # Let the compiler report the error.
+        return [eql]
+
+    batches = []
+    batch_start = 0
+    stmt_end = 0
+    for _, end in edgeql.tokenizer.iter_statement_spans(tokens):
+        # Token offsets are byte offsets in the UTF-8 encoded script.
+        stmt_end = tokens[end - 1].end()[2]
+        if stmt_end - batch_start >= batch_size:
+            batches.append(eql[batch_start:stmt_end])
+            batch_start = stmt_end
+
+    if stmt_end > batch_start or not batches:
+        batches.append(eql[batch_start:])
+    elif batch_start < len(eql):
+        # Trailing whitespace and comments.
+        batches[-1] += eql[batch_start:]
+
+    return batches
+
+
 @cython.final
 cdef class EdgeConnection:
 
@@ -225,7 +281,10 @@ cdef class EdgeConnection:
         self._pinned_pgcon_in_tx = False
         self._get_pgcon_cc = 0
 
-    async def get_pgcon(self) -> pgcon.PGConnection:
+    async def get_pgcon(
+        self,
+        prepared_stmt=None,
+    ) -> pgcon.PGConnection:
         self._get_pgcon_cc += 1
         if self._get_pgcon_cc > 1:
             raise RuntimeError('nested get_pgcon() calls are prohibited')
@@ -238,7 +297,7 @@ cdef class EdgeConnection:
         if self._pinned_pgcon is not None:
             raise RuntimeError('there is already a pinned pgcon')
         conn = await self.port.get_server().acquire_pgcon(
-            self.dbview.dbname)
+            self.dbview.dbname, prepared_stmt=prepared_stmt)
         self._pinned_pgcon = conn
         return conn
 
@@ -748,7 +807,7 @@ cdef class EdgeConnection:
             self.dbview.raise_in_tx_error()
 
         if self.dbview.in_tx():
-            return await self.get_backend().compiler.call(
+            units = await self.get_backend().compiler.call(
                 'compile_in_tx',
                 self.dbview.txid,
                 query_req.source,
@@ -760,7 +819,7 @@ cdef class EdgeConnection:
                 stmt_mode,
             )
         else:
-            return await self.get_backend().compiler.call(
+            units = await self.get_backend().compiler.call(
                 'compile',
                 self.dbview.dbver,
                 query_req.source,
@@ -774,6 +833,9 @@ cdef class EdgeConnection:
                 stmt_mode,
             )
 
+        self._record_compile_phases(units, "Query normalization")
+        return units
+
     async def _compile_script(
         self,
         query: bytes,
@@ -787,7 +849,7 @@ cdef class EdgeConnection:
             self.dbview.raise_in_tx_error()
 
         if self.dbview.in_tx():
-            return await self.get_backend().compiler.call(
+            units = await self.get_backend().compiler.call(
                 'compile_in_tx',
                 self.dbview.txid,
                 source,
@@ -799,7 +861,7 @@ cdef class EdgeConnection:
                 stmt_mode,
             )
         else:
-            return await self.get_backend().compiler.call(
+            units = await self.get_backend().compiler.call(
                 'compile',
                 self.dbview.dbver,
                 source,
@@ -813,6 +875,30 @@ cdef class EdgeConnection:
                 stmt_mode,
             )
 
+        self._record_compile_phases(units, "Query tokenization")
+        return units
+
+    def _record_compile_phases(self, units, tokenize_op: str):
+        # Compiler phase timings are aggregated per phase; tokenization
+        # happens in this process and is already timed as *tokenize_op*.
+        phases = {'tokenize': self.timer.last(tokenize_op)}
+        round_trips = 0
+        for unit in units:
+            for phase, duration in unit.compile_phases.items():
+                phases[phase] = phases.get(phase, 0.0) + duration
+                self.timer.record(f"Query compilation: {phase}", duration)
+            round_trips += unit.backend_round_trips
+
+        if log_metrics.isEnabledFor(logging.DEBUG):
+            log_metrics.debug(
+                "Query compilation phases: %s; backend round-trips: %d",
+                ", ".join(
+                    f"{phase}={duration:.4f}"
+                    for phase, duration in phases.items()
+                ),
+                round_trips,
+            )
+
     async def _compile_rollback(self, bytes eql):
         assert self.dbview.in_tx_error()
         try:
@@ -913,72 +999,26 @@ cdef class EdgeConnection:
     async def _simple_query(self, eql: bytes, allow_capabilities: uint64_t):
         cdef:
             bytes state = None
-            int i
+
+        if (self.dbview.in_tx() and
+                len(eql) >= edbdef.SCRIPT_PIPELINE_MIN_SIZE):
+            batches = _split_script(eql, edbdef.SCRIPT_PIPELINE_BATCH_SIZE)
+            if len(batches) > 1:
+                return await self._simple_query_pipelined(
+                    batches, allow_capabilities)
 
         stmt_mode = 'all'
         with self.timer.timed("Query compilation"):
             units = await self._compile_script(eql, stmt_mode=stmt_mode)
 
-        for query_unit in units:
-            if query_unit.capabilities & ~allow_capabilities:
-                raise query_unit.capabilities.make_error(
-                    allow_capabilities,
-                    errors.DisabledCapabilityError,
-                )
+        self._check_capabilities(units, allow_capabilities)
 
         conn = await self.get_pgcon()
         if not self.dbview.in_tx():
             state = self.dbview.serialize_state()
         try:
-            new_type_ids = frozenset()
-            for query_unit in units:
-                self.dbview.start(query_unit)
-                try:
-                    if query_unit.drop_db:
-                        await self.port.get_server()._on_drop_db(
-                            query_unit.drop_db, self.dbview.dbname)
-
-                    if query_unit.system_config:
-                        await self._execute_system_config(query_unit, conn)
-                    else:
-                        if query_unit.sql:
-                            if query_unit.is_transactional:
-                                await conn.simple_query(
-                                    b';'.join(query_unit.sql),
-                                    ignore_data=True,
-                                    state=state)
-                            else:
-                                i = 0
-                                for sql in query_unit.sql:
-                                    await conn.simple_query(
-                                        sql,
-                                        ignore_data=True,
-                                        state=state if i == 0 else None)
-                                    # only apply state to the first query.
-                                    i += 1
-
-                        if query_unit.config_ops:
-                            await self.dbview.apply_config_ops(
-                                conn,
-                                query_unit.config_ops)
-                except ConnectionAbortedError:
-                    raise
-                except Exception:
-                    self.dbview.on_error(query_unit)
-                    if not conn.in_tx() and self.dbview.in_tx():
-                        # COMMIT command can fail, in which case the
-                        # transaction is aborted.  This check workarounds
-                        # that (until a better solution is found.)
-                        self.dbview.abort_tx()
-                        await self.recover_current_tx_info(conn)
-                    raise
-                else:
-                    side_effects = self.dbview.on_success(query_unit)
-                    if side_effects:
-                        await self.signal_side_effects(side_effects)
-
-                    if query_unit.new_types:
-                        new_type_ids |= query_unit.new_types
+            new_type_ids = await self._execute_script_units(
+                conn, units, state)
 
             if new_type_ids and self.dbview.in_tx():
                 # This is a single script, potentially containing multiple
@@ -990,7 +1030,179 @@ cdef class EdgeConnection:
         finally:
             self.maybe_release_pgcon(conn)
 
-        return query_unit
+        return units[-1]
+
+    async def _simple_query_pipelined(
+        self,
+        list batches,
+        allow_capabilities: uint64_t,
+    ):
+        # Executes a large script inside of a transaction block batch by
+        # batch, compiling the next batch while the current one is being
+        # executed.  The transaction keeps the script atomic.  The
+        # compiler state of the transaction is checkpointed before the
+        # next batch is compiled, so that if the current batch fails,
+        # the effects of the never executed batch are discarded.
+        cdef:
+            Py_ssize_t i = 1
+
+        new_type_ids = frozenset()
+        # The compilation of the next batch, if one is in progress.
+        compiling = None
+
+        conn = await self.get_pgcon()
+        try:
+            with self.timer.timed("Query compilation"):
+                units = await self._compile_script(
+                    batches[0], stmt_mode='all')
+
+            while True:
+                if (i < len(batches) and
+                        not any(_leaves_tx(unit) for unit in units)):
+                    compiling = asyncio.create_task(
+                        self._compile_script_ahead(batches[i]))
+
+                new_type_ids |= await self._execute_script_batch(
+                    conn, units, allow_capabilities)
+
+                if compiling is None:
+                    break
+
+                with self.timer.timed("Query compilation"):
+                    units = await compiling
+                compiling = None
+                i += 1
+
+                # The batch compiled ahead is now going to be executed,
+                # its checkpoint must not be restored later.
+                await self.get_backend().compiler.call(
+                    'discard_checkpoint_in_tx', self.dbview.txid)
+
+            if new_type_ids and self.dbview.in_tx():
+                await self._update_type_ids(new_type_ids, conn)
+        finally:
+            if compiling is not None:
+                # Wait for the compilation of the next batch to finish
+                # instead of cancelling it, so that the compiler is not
+                # interrupted in the middle of a call.
+                await self._discard_compiled_ahead(compiling)
+            self.maybe_release_pgcon(conn)
+
+        if i < len(batches):
+            # The script has left the transaction block, the rest of it
+            # must be executed as a whole.
+            return await self._simple_query(
+                b''.join(batches[i:]), allow_capabilities)
+
+        return units[-1]
+
+    async def _compile_script_ahead(self, bytes eql):
+        await self.get_backend().compiler.call(
+            'checkpoint_in_tx', self.dbview.txid)
+        return await self._compile_script(eql, stmt_mode='all')
+
+    async def _discard_compiled_ahead(self, compiling):
+        try:
+            await compiling
+        except Exception:
+            pass
+        # The batch will never be executed, restore the compiler state
+        # of the transaction to what it was before the batch was
+        # compiled, as error handling and recovery rely on it.
+        await self.get_backend().compiler.call(
+            'rollback_to_checkpoint_in_tx', self.dbview.txid)
+
+    async def _execute_script_batch(
+        self,
+        pgcon.PGConnection conn,
+        list units,
+        allow_capabilities: uint64_t,
+    ):
+        try:
+            self._check_capabilities(units, allow_capabilities)
+        except Exception:
+            # Previous batches of the script have already been executed,
+            # the transaction must not be committed.  None of the units
+            # of this batch have been started, so only mark the
+            # transaction as failed.
+            self.dbview.tx_error()
+            raise
+        return await self._execute_script_units(conn, units, None)
+
+    cdef _check_capabilities(self, list units, uint64_t allow_capabilities):
+        for query_unit in units:
+            if query_unit.capabilities & ~allow_capabilities:
+                raise query_unit.capabilities.make_error(
+                    allow_capabilities,
+                    errors.DisabledCapabilityError,
+                )
+
+    async def _execute_script_units(
+        self,
+        pgcon.PGConnection conn,
+        list units,
+        bytes state,
+    ):
+        cdef:
+            int i
+
+        new_type_ids = frozenset()
+        for query_unit in units:
+            self.dbview.start(query_unit)
+            try:
+                if query_unit.drop_db:
+                    await self.port.get_server()._on_drop_db(
+                        query_unit.drop_db, self.dbview.dbname)
+
+                if query_unit.system_config:
+                    await self._execute_system_config(query_unit, conn)
+                else:
+                    unit_state = state
+                    if query_unit.online_index_sql:
+                        unit_state = await self._execute_online_index_builds(
+                            query_unit, conn, unit_state)
+                    if query_unit.sql:
+                        if query_unit.is_transactional:
+                            await conn.simple_query(
+                                b';'.join(query_unit.sql),
+                                ignore_data=True,
+                                state=unit_state)
+                        else:
+                            i = 0
+                            for sql in query_unit.sql:
+                                await conn.simple_query(
+                                    sql,
+                                    ignore_data=True,
+                                    state=unit_state if i == 0 else None)
+                                # only apply state to the first query.
+                                i += 1
+
+                    if query_unit.config_ops:
+                        await self.dbview.apply_config_ops(
+                            conn,
+                            query_unit.config_ops)
+            except ConnectionAbortedError:
+                raise
+            except Exception:
+                self.dbview.on_error(query_unit)
+                if query_unit.cleanup_sql:
+                    await self._execute_cleanup(query_unit, conn)
+                if not conn.in_tx() and self.dbview.in_tx():
+                    # COMMIT command can fail, in which case the
+                    # transaction is aborted.  This check workarounds
+                    # that (until a better solution is found.)
+                    self.dbview.abort_tx()
+                    await self.recover_current_tx_info(conn)
+                raise
+            else:
+                side_effects = self.dbview.on_success(query_unit)
+                if side_effects:
+                    await self.signal_side_effects(side_effects)
+
+                if query_unit.new_types:
+                    new_type_ids |= query_unit.new_types
+
+        return new_type_ids
 
     async def signal_side_effects(self, side_effects):
         if side_effects & dbview.SideEffects.SchemaChanges:
@@ -1123,6 +1335,7 @@ cdef class EdgeConnection:
             bint inline_typeids = self.protocol_version <= (0, 8)
             uint64_t allow_capabilities = ALL_CAPABILITIES
             bint inline_typenames = False
+            str plan_cache_mode = None
             bytes stmt_name = b''
 
         headers = self.parse_headers()
@@ -1139,6 +1352,9 @@ cdef class EdgeConnection:
                 elif k == QUERY_HEADER_ALLOW_CAPABILITIES:
                     self.version_check("ALLOW_CAPABILITIES header", (0, 9))
                     allow_capabilities = parse_capabilities_header(v)
+                elif k == QUERY_HEADER_PLAN_CACHE_MODE:
+                    self.version_check("PLAN_CACHE_MODE header", (0, 9))
+                    plan_cache_mode = parse_plan_cache_mode(v)
                 else:
                     raise errors.BinaryProtocolError(
                         f'unexpected message header: {k}'
@@ -1170,6 +1386,7 @@ cdef class EdgeConnection:
             inline_typeids,
             inline_typenames,
             allow_capabilities,
+            plan_cache_mode,
         )
 
         return eql, query_req, stmt_name
@@ -1347,8 +1564,51 @@ cdef class EdgeConnection:
                 'server restart is required for the configuration '
                 'change to take effect')
 
+    async def _execute_online_index_builds(self, query_unit, conn, state):
+        # CREATE INDEX CONCURRENTLY cannot run in a transaction block,
+        # and an extended query protocol pipeline ending with a single
+        # Sync is an implicit one, so every build is sent as a separate
+        # simple query.
+        #
+        # The session state is applied along with the first build,
+        # the state that is still to be applied (None) is returned.
+        for sql in query_unit.online_index_sql:
+            await conn.simple_query(sql, ignore_data=True, state=state)
+            state = None
+        return state
+
+    async def _execute_explain(self, query_unit, conn, state):
+        cdef:
+            WriteBuffer buf
+
+        # The output of EXPLAIN cannot be processed in SQL, so the plan
+        # is annotated here and sent to the client as the only result
+        # element.
+        rows = await conn.simple_query(
+            query_unit.sql[0], ignore_data=False, state=state)
+        data = explain.encode_plan(query_unit.explain, rows[0][0])
+
+        buf = WriteBuffer.new_message(b'D')
+        buf.write_int16(1)
+        buf.write_int32(len(data))
+        buf.write_bytes(data)
+        self.write(buf.end_message())
+
+    async def _execute_cleanup(self, query_unit, conn):
+        # Failures here must not mask the original error, so
+        # they are only logged.
+        for sql in query_unit.cleanup_sql:
+            try:
+                await conn.simple_query(sql, ignore_data=True)
+            except ConnectionAbortedError:
+                raise
+            except Exception:
+                logger.exception(
+                    'could not clean up after a failed query: %s',
+                    sql.decode('utf-8', errors='replace'))
+
     async def _execute(self, compiled: CompiledQuery, bind_args,
-                       bint use_prep_stmt):
+                       bint use_prep_stmt, str plan_cache_mode=None):
         cdef:
             bytes state = None
 
@@ -1376,7 +1636,14 @@ cdef class EdgeConnection:
 
         bound_args_buf = self.recode_bind_args(bind_args, compiled)
 
-        conn = await self.get_pgcon()
+        if use_prep_stmt:
+            if plan_cache_mode is None:
+                plan_cache_mode = self._get_plan_cache_mode()
+            conn = await self.get_pgcon(
+                (query_unit.sql_hash, query_unit.dbver))
+        else:
+            plan_cache_mode = None
+            conn = await self.get_pgcon()
         if not self.dbview.in_tx():
             state = self.dbview.serialize_state()
         try:
@@ -1387,14 +1654,32 @@ cdef class EdgeConnection:
             if query_unit.system_config:
                 await self._execute_system_config(query_unit, conn)
             else:
-                if query_unit.sql:
+                if query_unit.online_index_sql:
+                    state = await self._execute_online_index_builds(
+                        query_unit, conn, state)
+                if query_unit.explain is not None:
+                    await self._execute_explain(query_unit, conn, state)
+                elif query_unit.sql:
+                    ts_start = time.monotonic()
                     await conn.parse_execute(
                         query_unit,         # =query
                         self,               # =edgecon
                         bound_args_buf,     # =bind_data
                         use_prep_stmt,      # =use_prep_stmt
                         state,              # =state
+                        plan_cache_mode=plan_cache_mode,
                     )
+                    if plan_cache_mode is not None:
+                        # Prepared statement latencies are recorded per
+                        # requested plan_cache_mode, so that the effect of
+                        # forcing a plan on hot queries can be seen in the
+                        # metrics.  PostgreSQL does not report the plan it
+                        # chose, so under 'auto' it can be either one.
+                        self.timer.record(
+                            f"Query execution: "
+                            f"plan_cache_mode={plan_cache_mode}",
+                            time.monotonic() - ts_start,
+                        )
                 if query_unit.config_ops:
                     await self.dbview.apply_config_ops(
                         conn,
@@ -1404,6 +1689,9 @@ cdef class EdgeConnection:
         except Exception:
             self.dbview.on_error(query_unit)
 
+            if query_unit.cleanup_sql:
+                await self._execute_cleanup(query_unit, conn)
+
             if not conn.in_tx() and self.dbview.in_tx():
                 # COMMIT command can fail, in which case the
                 # transaction is finished.  This check workarounds
@@ -1423,6 +1711,21 @@ cdef class EdgeConnection:
         finally:
             self.maybe_release_pgcon(conn)
 
+    def _get_plan_cache_mode(self):
+        mode = config.lookup(
+            'plan_cache_mode',
+            self.dbview.get_session_config(),
+            allow_unrecognized=True,
+        )
+        if mode is None:
+            return None
+        if mode not in PLAN_CACHE_MODES:
+            raise errors.ConfigurationError(
+                f'invalid value for plan_cache_mode: {mode!r}, expected '
+                f'one of {", ".join(map(repr, PLAN_CACHE_MODES))}'
+            )
+        return mode
+
     async def _get_backend_tids(self, tids, conn):
         server = self.port.get_server()
         query = server.get_sys_query('backend_tids')
@@ -1566,7 +1869,8 @@ cdef class EdgeConnection:
         self._last_anon_compiled = compiled
 
         await self._execute(
-            compiled, bind_args, bool(query_unit.sql_hash))
+            compiled, bind_args, bool(query_unit.sql_hash),
+            query_req.plan_cache_mode)
 
     async def sync(self):
         self.buffer.consume_message()
@@ -2335,10 +2639,16 @@ cdef class Timer:
             yield
         finally:
             ts_end = time.monotonic()
-            duration = ts_end - ts_start
-            series = self._durations.setdefault(operation, [])
-            series.append(duration)
-            self.maybe_log_stats(operation, series=series)
+            self.record(operation, ts_end - ts_start)
+
+    def record(self, operation: str, duration: float) -> None:
+        series = self._durations.setdefault(operation, [])
+        series.append(duration)
+        self.maybe_log_stats(operation, series=series)
+
+    def last(self, operation: str) -> float:
+        series = self._durations.get(operation)
+        return series[-1] if series else 0.0
 
     def maybe_log_stats(
         self, operation: str, *, series: Sequence[float] = ()
@@ -19,6 +19,7 @@
 
 import base64
 import json
+import time
 import urllib.parse
 
 import immutables
@@ -32,8 +33,10 @@ from edb.common import markup
 from edb.server import compiler
 from edb.server.compiler import IoFormat
 from edb.server.compiler import enums
+from edb.server.compiler import explain
 from edb.server.http import http
 from edb.server.http cimport http
+from edb.server.pgproto.pgproto cimport WriteBuffer
 
 
 ALLOWED_CAPABILITIES = (
@@ -123,7 +126,8 @@ cdef class Protocol(http.HttpProtocol):
             self.server.get_server().release_pgcon(self.server.database, pgcon)
 
     async def compile(self, dbver, list queries):
-        comp = await self.server.compilers.get()
+        started_at = time.monotonic()
+        comp = await self.server.acquire_compiler()
         try:
             # TODO(tailhook) check capabilities
             return await comp.call(
@@ -133,7 +137,22 @@ cdef class Protocol(http.HttpProtocol):
                 0,  # implicit limit
             )
         finally:
-            self.server.compilers.put_nowait(comp)
+            self.server.release_compiler(comp)
+            self.server.record_latency(
+                'compile', time.monotonic() - started_at)
+
+    async def _execute_explain(self, pgcon, query_unit):
+        cdef:
+            WriteBuffer buf
+
+        rows = await pgcon.simple_query(query_unit.sql[0], False)
+        data = explain.encode_plan(query_unit.explain, rows[0][0])
+
+        buf = WriteBuffer.new_message(b'D')
+        buf.write_int16(1)
+        buf.write_int32(len(data))
+        buf.write_bytes(data)
+        return bytes(buf.end_message())
 
     async def execute(self, queries: list):
         dbver = self.server.get_dbver()
@@ -160,8 +179,12 @@ cdef class Protocol(http.HttpProtocol):
                             errors.UnsupportedCapabilityError,
                         )
                     try:
-                        data = await pgcon.parse_execute_notebook(
-                            query_unit.sql[0], query_unit.dbver)
+                        if query_unit.explain is not None:
+                            data = await self._execute_explain(
+                                pgcon, query_unit)
+                        else:
+                            data = await pgcon.parse_execute_notebook(
+                                query_unit.sql[0], query_unit.dbver)
                     except Exception as ex:
                         if debug.flags.server:
                             markup.dump(ex)
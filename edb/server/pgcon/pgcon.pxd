@@ -78,6 +78,9 @@ cdef class PGConnection:
 
         stmt_cache.StatementsCache prep_stmts
         list last_parse_prep_stmts
+        uint64_t prep_stmts_hits
+        uint64_t prep_stmts_misses
+        str plan_cache_mode
 
         bint debug
 
@@ -99,6 +102,14 @@ cdef class PGConnection:
     cdef fallthrough_idle(self)
 
     cdef before_prepare(self, stmt_name, dbver, WriteBuffer outbuf)
+    cdef _write_parse_execute(
+        self,
+        sql,
+        sql_hash,
+        dbver,
+        use_prep_stmt,
+        args,
+    )
 
     cdef make_clean_stmt_message(self, bytes stmt_name)
     cdef make_auth_password_md5_message(self, bytes salt)
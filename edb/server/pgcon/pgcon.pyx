@@ -63,7 +63,6 @@ from . import errors as pgerror
 
 
 DEF DATA_BUFFER_SIZE = 100_000
-DEF PREP_STMTS_CACHE = 100
 
 DEF COPY_SIGNATURE = b"PGCOPY\n\377\r\n\0"
 
@@ -103,6 +102,9 @@ def _build_init_con_script() -> bytes:
             FROM
                 jsonb_array_elements($1::jsonb) AS e;
 
+        PREPARE _set_plan_cache_mode(text) AS
+            SELECT pg_catalog.set_config('plan_cache_mode', $1, false);
+
         INSERT INTO _edgecon_state
             (name, value, type)
         VALUES
@@ -110,7 +112,12 @@ def _build_init_con_script() -> bytes:
     ''').encode('utf-8')
 
 
-async def connect(connargs, dbname):
+async def connect(
+    connargs,
+    dbname,
+    *,
+    prep_stmts_cache_size=defines.PREP_STMTS_CACHE_MIN,
+):
     global INIT_CON_SCRIPT
 
     loop = asyncio.get_running_loop()
@@ -118,14 +125,18 @@ async def connect(connargs, dbname):
     host = connargs.get("host")
     port = connargs.get("port")
 
+    def protocol_factory():
+        return PGConnection(
+            dbname, loop, connargs,
+            prep_stmts_cache_size=prep_stmts_cache_size)
+
     if host.startswith('/'):
         addr = os.path.join(host, f'.s.PGSQL.{port}')
-        _, pgcon = await loop.create_unix_connection(
-            lambda: PGConnection(dbname, loop, connargs), addr)
+        _, pgcon = await loop.create_unix_connection(protocol_factory, addr)
 
     else:
         _, pgcon = await loop.create_connection(
-            lambda: PGConnection(dbname, loop, connargs), host=host, port=port)
+            protocol_factory, host=host, port=port)
 
     await pgcon.connect()
 
@@ -162,7 +173,14 @@ cdef class EdegDBCodecContext(pgproto.CodecContext):
 @cython.final
 cdef class PGConnection:
 
-    def __init__(self, dbname, loop, addr):
+    def __init__(
+        self,
+        dbname,
+        loop,
+        addr,
+        *,
+        prep_stmts_cache_size=defines.PREP_STMTS_CACHE_MIN,
+    ):
         self.buffer = ReadBuffer()
 
         self.loop = loop
@@ -171,7 +189,13 @@ cdef class PGConnection:
         self.transport = None
         self.msg_waiter = None
 
-        self.prep_stmts = stmt_cache.StatementsCache(maxsize=PREP_STMTS_CACHE)
+        self.prep_stmts = stmt_cache.StatementsCache(
+            maxsize=prep_stmts_cache_size)
+        self.prep_stmts_hits = 0
+        self.prep_stmts_misses = 0
+        # The plan_cache_mode last set on the backend session, or
+        # None if it is not known (e.g. after a failed query).
+        self.plan_cache_mode = 'auto'
 
         self.connected_fut = loop.create_future()
         self.connected = False
@@ -199,6 +223,22 @@ cdef class PGConnection:
     def get_pgaddr(self):
         return self.pgaddr
 
+    def has_prepared_stmt(self, stmt_name, dbver):
+        """Check if *stmt_name* is prepared on this connection for *dbver*.
+
+        Unlike an actual use of the statement, this does not affect
+        the eviction order of the prepared statements cache.
+        """
+        return self.prep_stmts.peek(stmt_name) == dbver
+
+    def get_prep_stmts_stats(self):
+        return {
+            'size': len(self.prep_stmts),
+            'maxsize': self.prep_stmts.get_maxsize(),
+            'hits': self.prep_stmts_hits,
+            'misses': self.prep_stmts_misses,
+        }
+
     def in_tx(self):
         return (
             self.xact_status == PQTRANS_INTRANS or
@@ -305,23 +345,26 @@ cdef class PGConnection:
         else:
             store_stmt = 1
 
+        if parse:
+            self.prep_stmts_misses += 1
+        else:
+            self.prep_stmts_hits += 1
+
         return parse, store_stmt
 
-    async def _parse_execute_to_buf(
+    cdef _write_parse_execute(
         self,
         sql,
         sql_hash,
         dbver,
         use_prep_stmt,
         args,
-        WriteBuffer out,
     ):
         cdef:
             WriteBuffer parse_buf
             WriteBuffer bind_buf
             WriteBuffer execute_buf
             WriteBuffer buf
-            ssize_t size
             bint parse = 1
             bint store_stmt = 0
 
@@ -370,8 +413,23 @@ cdef class PGConnection:
         buf.write_bytes(SYNC_MESSAGE)
 
         self.write(buf)
-        error = None
         self.waiting_for_sync = True
+
+        return stmt_name, store_stmt
+
+    async def _parse_execute_to_buf(
+        self,
+        sql,
+        sql_hash,
+        dbver,
+        use_prep_stmt,
+        args,
+        WriteBuffer out,
+    ):
+        stmt_name, store_stmt = self._write_parse_execute(
+            sql, sql_hash, dbver, use_prep_stmt, args)
+
+        error = None
         data = None
         while True:
             if not self.buffer.take_message():
@@ -480,6 +538,7 @@ cdef class PGConnection:
     ):
         self.before_command()
         try:
+            await self._reset_plan_cache_mode()
             return await self._parse_execute_json(
                 sql,
                 sql_hash,
@@ -490,6 +549,130 @@ cdef class PGConnection:
         finally:
             self.after_command()
 
+    async def _parse_execute_json_elements(
+        self,
+        sql,
+        sql_hash,
+        dbver,
+        use_prep_stmt,
+        args,
+        output_queue,
+        ssize_t fragment_suggested_size,
+    ):
+        cdef:
+            int16_t ncol
+            int32_t coll
+            ssize_t size = 0
+            list chunks = []
+
+        stmt_name, store_stmt = self._write_parse_execute(
+            sql, sql_hash, dbver, use_prep_stmt, args)
+
+        error = None
+        while True:
+            if not self.buffer.take_message():
+                await self.wait_for_message()
+            mtype = self.buffer.get_message_type()
+
+            try:
+                if mtype == b'D':
+                    # DataRow
+                    ncol = self.buffer.read_int16()
+                    coll = self.buffer.read_int32()
+                    if ncol != 1 or coll == -1:
+                        self.buffer.discard_message()
+                        if error is None:
+                            error = RuntimeError(
+                                f'received an invalid DataRow '
+                                f'for a JSON query {sql!r}')
+                        continue
+
+                    if chunks:
+                        chunks.append(b',')
+                        size += 1
+                    chunks.append(self.buffer.read_bytes(coll))
+                    size += coll
+
+                    if (output_queue is not None and
+                            size >= fragment_suggested_size):
+                        await output_queue.put(b''.join(chunks))
+                        # Subsequent fragments are prefixed with a comma
+                        # to make the concatenation of all fragments
+                        # a valid list of JSON array elements.
+                        chunks = [b'']
+                        size = 0
+
+                elif mtype == b'E':
+                    # ErrorResponse
+                    fields = self.parse_error_message()
+                    error = pgerror.BackendError(fields=fields)
+
+                elif mtype == b'1':
+                    # ParseComplete
+                    self.buffer.discard_message()
+                    if store_stmt:
+                        self.prep_stmts[stmt_name] = dbver
+
+                elif mtype in {b'C', b'n', b'2', b'I', b'3'}:
+                    # CommandComplete
+                    # NoData
+                    # BindComplete
+                    # EmptyQueryResponse
+                    # CloseComplete
+                    self.buffer.discard_message()
+
+                elif mtype == b'Z':
+                    # ReadyForQuery
+                    self.parse_sync_message()
+                    break
+
+                else:
+                    self.fallthrough()
+
+            finally:
+                self.buffer.finish_message()
+
+        if error is not None:
+            raise error
+
+        data = b''.join(chunks)
+        if output_queue is None:
+            return data
+        elif data:
+            await output_queue.put(data)
+
+    async def parse_execute_json_elements(
+        self,
+        sql,
+        sql_hash,
+        dbver,
+        use_prep_stmt,
+        args,
+        output_queue=None,
+        fragment_suggested_size=DATA_BUFFER_SIZE,
+    ):
+        """Execute a query compiled in the JSON_ELEMENTS output mode.
+
+        If *output_queue* is None, return all result elements joined
+        with commas.  Otherwise, put the result into the queue as
+        fragments of at least *fragment_suggested_size* bytes, every
+        fragment but the first one starting with a comma.
+        """
+        self.before_command()
+        try:
+            await self._reset_plan_cache_mode()
+            return await self._parse_execute_json_elements(
+                sql,
+                sql_hash,
+                dbver,
+                use_prep_stmt,
+                args,
+                output_queue,
+                fragment_suggested_size,
+            )
+        finally:
+            self.after_command()
+
     async def parse_execute_notebook(
         self,
         sql,
@@ -575,13 +758,62 @@ cdef class PGConnection:
             else:
                 self.fallthrough()
 
+    def _build_set_plan_cache_mode_req(self, str mode, WriteBuffer out):
+        cdef:
+            WriteBuffer buf
+
+        buf = WriteBuffer.new_message(b'B')
+        buf.write_bytestring(b'')  # portal name
+        buf.write_bytestring(b'_set_plan_cache_mode')  # statement name
+        buf.write_int16(0)  # number of format codes: all text
+        buf.write_int16(1)  # number of parameters
+        buf.write_len_prefixed_utf8(mode)
+        buf.write_int16(0)  # number of result columns
+        out.write_buffer(buf.end_message())
+
+        buf = WriteBuffer.new_message(b'E')
+        buf.write_bytestring(b'')  # portal name
+        buf.write_int32(0)  # limit: 0 - return all rows
+        out.write_buffer(buf.end_message())
+
+    async def _reset_plan_cache_mode(self):
+        # The JSON queries always run with the default plan_cache_mode,
+        # whatever a binary protocol session that used this pooled
+        # connection before has set.
+        if self.plan_cache_mode == 'auto':
+            return
+        await self._simple_query(
+            b"EXECUTE _set_plan_cache_mode('auto')", True, None)
+        self.plan_cache_mode = None if self.in_tx() else 'auto'
+
+    async def _parse_set_plan_cache_mode_resp(self):
+        while True:
+            if not self.buffer.take_message():
+                await self.wait_for_message()
+            mtype = self.buffer.get_message_type()
+
+            if mtype == b'2' or mtype == b'D':
+                # BindComplete or the set_config() result
+                self.buffer.discard_message()
+
+            elif mtype == b'E':
+                er = self.parse_error_message()
+                raise pgerror.BackendError(fields=er)
+
+            elif mtype == b'C':
+                self.buffer.discard_message()
+                return
+            else:
+                self.fallthrough()
+
     async def _parse_execute(
         self,
         object query,
         edgecon.EdgeConnection edgecon,
         WriteBuffer bind_data,
         bint use_prep_stmt,
-        bytes state
+        bytes state,
+        str plan_cache_mode,
     ):
         cdef:
             WriteBuffer out
@@ -589,6 +821,7 @@ cdef class PGConnection:
             bytes stmt_name
             bint store_stmt = 0
             bint parse = 1
+            bint set_plan_cache_mode = 0
 
             bint has_result = query.cardinality is not CARD_NO_RESULT
 
@@ -601,6 +834,22 @@ cdef class PGConnection:
         if state is not None:
             self._build_apply_state_req(state, out)
 
+        if plan_cache_mode is None:
+            # The connection is pooled, so a mode set for another
+            # session must not be inherited.
+            plan_cache_mode = 'auto'
+
+        if plan_cache_mode != self.plan_cache_mode:
+            # plan_cache_mode is consulted on every execution of
+            # a prepared statement, so it is enough to switch it
+            # in the same pipeline, right before the Bind.
+            set_plan_cache_mode = 1
+            self._build_set_plan_cache_mode_req(plan_cache_mode, out)
+            # The setting is rolled back along with the transaction,
+            # so only remember it when not in an explicit one (a failure
+            # in the implicit transaction is handled below).
+            self.plan_cache_mode = None if self.in_tx() else plan_cache_mode
+
         if use_prep_stmt:
             stmt_name = query.sql_hash
             parse, store_stmt = self.before_prepare(
@@ -671,6 +920,9 @@ cdef class PGConnection:
             if state is not None:
                 await self._parse_apply_state_resp(state)
 
+            if set_plan_cache_mode:
+                await self._parse_set_plan_cache_mode_resp()
+
             buf = None
             while True:
                 if not self.buffer.take_message():
@@ -742,6 +994,10 @@ cdef class PGConnection:
 
                 finally:
                     self.buffer.finish_message()
+        except Exception:
+            if set_plan_cache_mode:
+                self.plan_cache_mode = None
+            raise
         finally:
             await self.wait_for_sync()
 
@@ -751,7 +1007,9 @@ cdef class PGConnection:
         edgecon.EdgeConnection edgecon,
         WriteBuffer bind_data,
         bint use_prep_stmt,
-        bytes state
+        bytes state,
+        *,
+        str plan_cache_mode=None,
     ):
         self.before_command()
         try:
@@ -761,6 +1019,7 @@ cdef class PGConnection:
                 bind_data,
                 use_prep_stmt,
                 state,
+                plan_cache_mode,
             )
         finally:
             self.after_command()
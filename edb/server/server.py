@@ -23,6 +23,7 @@ from typing import *
 import asyncio
 import json
 import logging
+import os
 
 import immutables
 
@@ -47,6 +48,7 @@ from . import dbview
 
 
 logger = logging.getLogger('edb.server')
+log_metrics = logging.getLogger('edb.server.metrics')
 
 
 class StartupScript(NamedTuple):
@@ -109,6 +111,18 @@ class Server:
         self._runstate_dir = runstate_dir
         self._internal_runstate_dir = internal_runstate_dir
         self._max_backend_connections = max_backend_connections
+        self._prep_stmts_cache_size = _compute_prep_stmts_cache_size(
+            max_backend_connections,
+            cluster.is_managed(),
+        )
+
+        self._http_compiler_pool = http.CompilerPool(
+            runstate_dir=internal_runstate_dir,
+            worker_args={
+                'connect_args': self._pg_addr,
+                'backend_runtime_params': self.get_backend_runtime_params(),
+            },
+        )
 
         self._mgmt_port = None
         self._mgmt_host_addr = nethost
@@ -137,9 +151,23 @@ class Server:
         self._sys_queries = immutables.Map()
 
     async def _pg_connect(self, dbname):
-        return await pgcon.connect(self._get_pgaddr(), dbname)
+        return await pgcon.connect(
+            self._get_pgaddr(),
+            dbname,
+            prep_stmts_cache_size=self._prep_stmts_cache_size,
+        )
 
     async def _pg_disconnect(self, conn):
+        if log_metrics.isEnabledFor(logging.DEBUG):
+            stats = conn.get_prep_stmts_stats()
+            log_metrics.debug(
+                "Prepared statements of a backend connection: "
+                "size=%d, maxsize=%d, hits=%d, misses=%d",
+                stats['size'],
+                stats['maxsize'],
+                stats['hits'],
+                stats['misses'],
+            )
         conn.terminate()
 
     async def init(self):
@@ -182,8 +210,21 @@ class Server:
     def _get_pgaddr(self):
         return self._cluster.get_connection_spec()
 
-    async def acquire_pgcon(self, dbname):
-        return await self._pg_pool.acquire(dbname)
+    async def acquire_pgcon(self, dbname, *, prepared_stmt=None):
+        # If *prepared_stmt* (a (name, dbver) pair) is given, prefer
+        # an idle connection that has the statement prepared already,
+        # so that it is not prepared again on every backend.
+        prefer = None
+        if prepared_stmt is not None and config.lookup(
+            'prefer_prepared_connections',
+            self._dbindex.get_sys_config(),
+        ):
+            stmt_name, dbver = prepared_stmt
+
+            def prefer(conn):
+                return conn.has_prepared_stmt(stmt_name, dbver)
+
+        return await self._pg_pool.acquire(dbname, prefer=prefer)
 
     def release_pgcon(self, dbname, conn, *, discard=False):
         if not conn.is_connected() or conn.in_tx():
@@ -231,6 +272,9 @@ class Server:
     def get_roles(self):
         return self._roles
 
+    def get_http_compiler_pool(self):
+        return self._http_compiler_pool
+
     async def new_compiler(self, dbname, dbver):
         compiler_worker = await self._compiler_manager.spawn_worker()
         try:
@@ -306,7 +350,10 @@ class Server:
             database=portconf.database,
             user=portconf.user,
             protocol=portconf.protocol,
-            concurrency=portconf.concurrency)
+            concurrency=portconf.concurrency,
+            idle_timeout=portconf.idle_timeout,
+            max_connections=portconf.max_connections,
+            max_request_size=portconf.max_request_size)
 
         try:
             await port.start()
@@ -458,6 +505,8 @@ class Server:
         # it to restore config values.
         ql_parser.preload()
 
+        await self._http_compiler_pool.start()
+
         async with taskgroup.TaskGroup() as g:
             g.create_task(self._mgmt_port.start())
             for port in self._ports:
@@ -492,10 +541,13 @@ class Server:
                 g.create_task(self._mgmt_port.stop())
                 self._mgmt_port = None
         finally:
-            pgcon = await self._acquire_sys_pgcon()
-            self._sys_pgcon_waiters = None
-            self.__sys_pgcon = None
-            pgcon.terminate()
+            try:
+                await self._http_compiler_pool.stop()
+            finally:
+                pgcon = await self._acquire_sys_pgcon()
+                self._sys_pgcon_waiters = None
+                self.__sys_pgcon = None
+                pgcon.terminate()
 
     async def get_auth_method(self, user):
         authlist = self._sys_auth
@@ -520,3 +572,27 @@ class Server:
 
     def get_backend_runtime_params(self) -> Any:
         return self._cluster.get_runtime_params()
+
+
+def _compute_prep_stmts_cache_size(
+    max_backend_connections: int,
+    managed_cluster: bool,
+) -> int:
+    if not managed_cluster:
+        # The memory of a remote backend is unknown.
+        return defines.PREP_STMTS_CACHE_MIN
+
+    try:
+        memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError):
+        return defines.PREP_STMTS_CACHE_MIN
+
+    per_conn = (
+        memory * defines.PREP_STMTS_MEMORY_FRACTION
+        / max(max_backend_connections, 1)
+    )
+    size = int(per_conn // defines.PREP_STMT_MEMORY_ESTIMATE)
+    return max(
+        defines.PREP_STMTS_CACHE_MIN,
+        min(size, defines.PREP_STMTS_CACHE_MAX),
+    )
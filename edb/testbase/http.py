@@ -18,6 +18,7 @@
 
 
 from __future__ import annotations
+from typing import *
 
 import contextlib
 import http.client
@@ -53,6 +54,9 @@ class BaseHttpTest:
     # for no particular speedup.
     PARALLELISM_GRANULARITY = 'system'
 
+    # Additional cfg::Port properties of the test port.
+    HTTP_PORT_OPTIONS: Dict[str, Any] = {}
+
     @classmethod
     def get_port_proto(cls):
         raise NotImplementedError
@@ -64,6 +68,10 @@ class BaseHttpTest:
         cls.http_host = '127.0.0.1'
         cls.http_port = cluster.find_available_port()
         dbname = cls.get_database_name()
+        options = ''.join(
+            f'{name} := {value!r},' for name, value in
+            cls.HTTP_PORT_OPTIONS.items()
+        )
 
         cls.loop.run_until_complete(
             cls.con.execute(
@@ -75,6 +83,7 @@ class BaseHttpTest:
                         port := {cls.http_port},
                         user := "http",
                         concurrency := 4,
+                        {options}
                     }};
                 '''))
 
@@ -115,6 +124,15 @@ class BaseHttpTest:
         self.http_con_send_request(con, params, path=path)
         return self.http_con_read_response(con)
 
+    def http_batch_request(self, batch: list, *, read_only=False):
+        url = self.http_addr  # type: ignore
+        if read_only:
+            url += '/?read_only=true'
+        req = urllib.request.Request(url, method='POST')
+        req.add_header('Content-Type', 'application/json')
+        response = urllib.request.urlopen(req, json.dumps(batch).encode())
+        return json.loads(response.read())
+
 
 class EdgeQLTestCase(BaseHttpTest, server.QueryTestCase):
 
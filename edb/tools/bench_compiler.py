@@ -0,0 +1,632 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Benchmark of the EdgeQL -> SQL compiler pipeline.
+
+Compiles a fixed corpus of queries against a small schema and
+a synthetic large one without a database and reports the median
+time spent in every compiler phase along with the peak memory
+allocated while compiling each query.  Results can be saved as
+a baseline and compared against in later runs:
+
+    $ edb bench-compiler --save-baseline base.json
+    ... hack on the compiler ...
+    $ edb bench-compiler --baseline base.json
+
+SQL code generation alone is benchmarked by ``edb bench-sql-codegen``
+on large synthetic SQL trees.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import json
+import pathlib
+import statistics
+import sys
+import time
+import tracemalloc
+
+import click
+
+from edb import edgeql
+from edb.edgeql import parser as qlparser
+from edb.edgeql.compiler import polyres
+from edb.pgsql import ast as pgast
+from edb.pgsql import codegen as pgcodegen
+from edb.server import compiler as edbcompiler
+from edb.testbase import lang as tb
+from edb.tools.edb import edbcommands
+
+
+PHASES = (
+    'tokenize', 'parse', 'ql_to_ir', 'inference',
+    'ir_to_sql', 'codegen', 'descriptors', 'other',
+)
+
+BASELINE_VERSION = 1
+
+SCHEMAS_DIR = (
+    pathlib.Path(__file__).parent.parent.parent.resolve() / 'tests' / 'schemas'
+)
+
+# GROUP is not implemented yet, the "grouping" queries aggregate
+# with FOR over a DISTINCT set instead.
+
+ISSUES_QUERIES = {
+    'deep_shape': '''
+        SELECT Issue {
+            name,
+            number,
+            body,
+            owner: {
+                name,
+                todo: { name, number, @rank } ORDER BY @rank,
+            },
+            status: { name },
+            watchers: { name, todo: { name } },
+            related_to: { name, owner: { name }, status: { name } },
+            references: {
+                [IS Named].name,
+                [IS URL].address,
+                [IS Publication].title,
+                [IS Publication].authors: { name } ORDER BY @list_order,
+            },
+            time_spent_log: { body, spent_time, owner: { name } },
+        }
+        FILTER .status.name = 'Open'
+        ORDER BY .number
+        LIMIT 10
+    ''',
+
+    'polymorphic': '''
+        SELECT Text {
+            body,
+            [IS Issue].name,
+            [IS Issue].owner: { name },
+            [IS Comment].issue: { number, status: { name } },
+            [IS Comment].parent: { body },
+            [IS LogEntry].spent_time,
+        }
+        FILTER Text IS Issue OR Text IS Comment
+    ''',
+
+    'nested_insert': '''
+        INSERT Issue {
+            name := 'bench',
+            body := 'bench',
+            number := '1000',
+            owner := (INSERT User { name := 'bench' }),
+            status := (SELECT Status FILTER .name = 'Open'),
+            watchers := (SELECT User FILTER .name IN {'Elvis', 'Yury'}),
+            time_spent_log := (
+                INSERT LogEntry {
+                    owner := (SELECT User FILTER .name = 'Elvis'),
+                    spent_time := 60,
+                    body := 'bench',
+                }
+            ),
+        }
+    ''',
+
+    'for_update': '''
+        FOR x IN {'Elvis', 'Yury', 'Victor'}
+        UNION (
+            UPDATE Issue
+            FILTER .owner.name = x
+            SET {
+                watchers += (SELECT User FILTER .name = x),
+                time_spent_log += (
+                    INSERT LogEntry {
+                        owner := (SELECT User FILTER .name = x),
+                        spent_time := 10,
+                        body := x,
+                    }
+                ),
+            }
+        )
+    ''',
+
+    'grouping': '''
+        FOR s IN {DISTINCT Issue.status.name}
+        UNION (
+            SELECT (
+                status := s,
+                count := count((SELECT Issue FILTER .status.name = s)),
+                estimate := sum(
+                    (SELECT Issue FILTER .status.name = s).time_estimate),
+            )
+        )
+    ''',
+}
+
+
+def synthetic_schema(ntypes: int) -> str:
+    """Generate a schema with *ntypes* object types.
+
+    Every type extends one of ``ntypes // 20`` abstract base types,
+    links to the next type in a ring and has a polymorphic multi link
+    to another base type.
+    """
+    nbases = _synthetic_bases(ntypes)
+    decls = []
+    for b in range(nbases):
+        decls.append(
+            f'abstract type Base{b} {{\n'
+            f'    required property name -> str;\n'
+            f'    property weight -> int64;\n'
+            f'}}'
+        )
+    for i in range(ntypes):
+        related = _synthetic_related(i, ntypes)
+        decls.append(
+            f'type T{i} extending Base{i % nbases} {{\n'
+            f'    property code -> str;\n'
+            f'    property created -> datetime;\n'
+            f'    link next -> T{(i + 1) % ntypes};\n'
+            f'    multi link related -> Base{related} {{\n'
+            f'        property rank -> int64;\n'
+            f'    }};\n'
+            f'}}'
+        )
+    return '\n'.join(decls)
+
+
+def _synthetic_bases(ntypes: int) -> int:
+    return max(ntypes // 20, 2)
+
+
+def _synthetic_related(i: int, ntypes: int) -> int:
+    return (i * 7 + 3) % _synthetic_bases(ntypes)
+
+
+def synthetic_queries(ntypes: int) -> Dict[str, str]:
+    nbases = _synthetic_bases(ntypes)
+    # T0 and T{nbases} both extend Base0; T{rel} extends the
+    # target of T0.related.
+    rel = _synthetic_related(0, ntypes)
+    sibling = f'T{nbases}'
+
+    return {
+        'deep_shape': f'''
+            SELECT T0 {{
+                name,
+                code,
+                next: {{
+                    name,
+                    next: {{
+                        name,
+                        next: {{
+                            name,
+                            next: {{ name, code }},
+                            related: {{ name, @rank }} ORDER BY @rank,
+                        }},
+                        related: {{ name }},
+                    }},
+                }},
+                related: {{
+                    name,
+                    weight,
+                    [IS T{rel}].next: {{ name }},
+                }},
+            }}
+            FILTER .code = 'x'
+            ORDER BY .name
+            LIMIT 10
+        ''',
+
+        'polymorphic': f'''
+            SELECT Base0 {{
+                name,
+                [IS T0].code,
+                [IS T0].next: {{ name }},
+                [IS {sibling}].related: {{ name, @rank }},
+                [IS {sibling}].next: {{ name, weight }},
+            }}
+            FILTER Base0 IS T0 OR Base0 IS {sibling}
+        ''',
+
+        'nested_insert': f'''
+            INSERT T0 {{
+                name := 'bench',
+                code := 'bench',
+                next := (
+                    INSERT T1 {{
+                        name := 'bench',
+                        next := (SELECT T2 FILTER .code = 'x' LIMIT 1),
+                    }}
+                ),
+                related := (
+                    FOR x IN {{'a', 'b'}}
+                    UNION (INSERT T{rel} {{ name := x }})
+                ),
+            }}
+        ''',
+
+        'for_update': f'''
+            FOR x IN {{'a', 'b', 'c'}}
+            UNION (
+                UPDATE T0
+                FILTER .code = x
+                SET {{
+                    next := (SELECT T1 FILTER .code = x LIMIT 1),
+                    related += (INSERT T{rel} {{ name := x }}),
+                }}
+            )
+        ''',
+
+        'grouping': '''
+            FOR c IN {DISTINCT Base0.name}
+            UNION (
+                SELECT (
+                    name := c,
+                    count := count((SELECT Base0 FILTER .name = c)),
+                    weight := sum((SELECT Base0 FILTER .name = c).weight),
+                )
+            )
+        ''',
+    }
+
+
+class Result(NamedTuple):
+
+    #: Median time in seconds spent in every compiler phase.
+    phases: Dict[str, float]
+    #: Peak memory in bytes allocated while compiling the query.
+    peak_alloc: int
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+
+def compile_once(
+    compiler: edbcompiler.Compiler,
+    schema: Any,
+    query: str,
+    *,
+    cold: bool,
+) -> Dict[str, float]:
+    if cold:
+        qlparser.clear_parse_cache()
+        polyres.clear_resolution_cache()
+
+    ctx = edbcompiler.new_compiler_context(
+        schema,
+        single_statement=True,
+        modaliases={None: 'test'},
+    )
+
+    start = time.perf_counter()
+    source = edgeql.NormalizedSource.from_string(query)
+    tokenize = time.perf_counter() - start
+
+    units = compiler._compile(ctx=ctx, source=source)
+    phases = dict.fromkeys(PHASES, 0.0)
+    phases['tokenize'] = tokenize
+    for unit in units:
+        for phase, duration in unit.compile_phases.items():
+            phases[phase] = phases.get(phase, 0.0) + duration
+    return phases
+
+
+def bench_query(
+    compiler: edbcompiler.Compiler,
+    schema: Any,
+    query: str,
+    *,
+    iterations: int,
+    warmup: int,
+    cold: bool,
+) -> Result:
+    for _ in range(warmup):
+        compile_once(compiler, schema, query, cold=cold)
+
+    runs = [
+        compile_once(compiler, schema, query, cold=cold)
+        for _ in range(iterations)
+    ]
+    phases = {
+        phase: statistics.median(run.get(phase, 0.0) for run in runs)
+        for phase in runs[0]
+    }
+
+    # Allocations are measured in a separate run, tracemalloc slows
+    # down the compiler considerably.
+    tracemalloc.start()
+    try:
+        tracemalloc.clear_traces()
+        compile_once(compiler, schema, query, cold=cold)
+        _, peak_alloc = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(phases=phases, peak_alloc=peak_alloc)
+
+
+def load_schemas(
+    synthetic_types: int,
+) -> Iterator[Tuple[str, Any, Dict[str, str]]]:
+    with open(SCHEMAS_DIR / 'issues.esdl') as f:
+        issues = f.read()
+
+    yield 'issues', tb.BaseSchemaTest.load_schema(issues), ISSUES_QUERIES
+
+    if synthetic_types:
+        schema = tb.BaseSchemaTest.load_schema(
+            synthetic_schema(synthetic_types))
+        yield (
+            f'synthetic{synthetic_types}',
+            schema,
+            synthetic_queries(synthetic_types),
+        )
+
+
+def _fmt_ms(seconds: float) -> str:
+    return f'{seconds * 1000:.2f}'
+
+
+def _fmt_delta(new: float, old: Optional[float]) -> str:
+    if not old:
+        return ''
+    return f'{(new - old) / old * 100:+.1f}%'
+
+
+def print_results(
+    results: Dict[str, Result],
+    baseline: Optional[Dict[str, Any]],
+    *,
+    threshold: float,
+    file: TextIO = sys.stdout,
+) -> List[str]:
+    """Print a table of *results* and return the names of regressions."""
+
+    header = ['query', *PHASES, 'total ms', 'peak KiB']
+    if baseline is not None:
+        header += ['time Δ', 'alloc Δ']
+
+    rows = []
+    regressions = []
+    for name, res in results.items():
+        row = [name]
+        row.extend(_fmt_ms(res.phases.get(p, 0.0)) for p in PHASES)
+        row.append(_fmt_ms(res.total))
+        row.append(f'{res.peak_alloc / 1024:.0f}')
+
+        if baseline is not None:
+            base = baseline.get(name)
+            if base is None:
+                row += ['new', 'new']
+            else:
+                base_total = sum(base['phases'].values())
+                row.append(_fmt_delta(res.total, base_total))
+                row.append(_fmt_delta(res.peak_alloc, base['peak_alloc']))
+                if (
+                    res.total > base_total * (1 + threshold)
+                    or res.peak_alloc > base['peak_alloc'] * (1 + threshold)
+                ):
+                    regressions.append(name)
+                    row[0] = f'! {name}'
+
+        rows.append(row)
+
+    widths = [
+        max(len(row[i]) for row in [header, *rows])
+        for i in range(len(header))
+    ]
+    for row in [header, *rows]:
+        print(
+            '  '.join(
+                cell.ljust(w) if i == 0 else cell.rjust(w)
+                for i, (cell, w) in enumerate(zip(row, widths))
+            ),
+            file=file,
+        )
+
+    return regressions
+
+
+@edbcommands.command('bench-compiler')
+@click.option(
+    '-n', '--iterations', type=int, default=20, show_default=True,
+    help='number of timed compilations of every query')
+@click.option(
+    '--warmup', type=int, default=3, show_default=True,
+    help='number of untimed compilations before the timed ones')
+@click.option(
+    '--synthetic-types', type=int, default=2000, show_default=True,
+    help='number of object types in the synthetic schema (0 to skip it)')
+@click.option(
+    '--warm/--cold', default=False,
+    help='keep the parser and overload resolution caches between '
+         'compilations (by default every compilation starts cold)')
+@click.option(
+    '-k', '--filter', 'name_filter', type=str,
+    help='only run queries whose "schema/query" name contains this string')
+@click.option(
+    '--baseline', type=click.Path(exists=True, dir_okay=False),
+    help='compare the results with a previously saved baseline')
+@click.option(
+    '--save-baseline', type=click.Path(dir_okay=False),
+    help='save the results as a baseline to this file')
+@click.option(
+    '--threshold', type=float, default=0.1, show_default=True,
+    help='relative slowdown (or allocation growth) over the baseline '
+         'that is considered a regression')
+def bench_compiler(
+    *,
+    iterations: int,
+    warmup: int,
+    synthetic_types: int,
+    warm: bool,
+    name_filter: Optional[str],
+    baseline: Optional[str],
+    save_baseline: Optional[str],
+    threshold: float,
+):
+    """Benchmark the EdgeQL compiler without a database.
+
+    Exits with a non-zero status if any query regressed by more
+    than --threshold compared to --baseline.
+    """
+    if 0 < synthetic_types < 3:
+        raise click.BadParameter(
+            'the synthetic schema needs at least 3 types',
+            param_hint='--synthetic-types')
+
+    base = None
+    if baseline:
+        with open(baseline) as f:
+            data = json.load(f)
+        if data.get('version') != BASELINE_VERSION:
+            raise click.ClickException(
+                f'unsupported baseline format in {baseline}')
+        base = data['results']
+
+    compiler = tb.new_compiler()
+    results: Dict[str, Result] = {}
+
+    for schema_name, schema, queries in load_schemas(synthetic_types):
+        for query_name, query in queries.items():
+            name = f'{schema_name}/{query_name}'
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = bench_query(
+                compiler,
+                schema,
+                query,
+                iterations=iterations,
+                warmup=warmup,
+                cold=not warm,
+            )
+
+    regressions = print_results(results, base, threshold=threshold)
+
+    if save_baseline:
+        data = {
+            'version': BASELINE_VERSION,
+            'results': {
+                name: {'phases': res.phases, 'peak_alloc': res.peak_alloc}
+                for name, res in results.items()
+            },
+        }
+        with open(save_baseline, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    if regressions:
+        click.secho(
+            f'{len(regressions)} regression(s) over {threshold:.0%}: '
+            f'{", ".join(regressions)}',
+            fg='red', err=True,
+        )
+        sys.exit(1)
+
+
+def sql_tree(depth: int, width: int, n: int = 0) -> pgast.SelectStmt:
+    """Generate an SQL tree resembling a compiled deep shape.
+
+    Every query has *width* output columns and two nested subqueries,
+    down to *depth* levels.
+    """
+    alias = f'q~{n}'
+
+    def col(name: str) -> pgast.ColumnRef:
+        return pgast.ColumnRef(name=[alias, name])
+
+    targets = []
+    for i in range(width):
+        targets.append(pgast.ResTarget(
+            name=f'f{i}',
+            val=pgast.FuncCall(
+                name=('edgedb', 'row'),
+                args=[
+                    col(f'c{i}'),
+                    pgast.TypeCast(
+                        arg=pgast.StringConstant(val=f'v{i}'),
+                        type_name=pgast.TypeName(name=('text',)),
+                    ),
+                ],
+            ),
+        ))
+
+    if depth > 0:
+        for i in range(2):
+            targets.append(pgast.ResTarget(
+                name=f'sub{i}',
+                val=pgast.SubLink(
+                    type=pgast.SubLinkType.EXISTS,
+                    expr=sql_tree(depth - 1, width, n * 3 + i + 1),
+                ),
+            ))
+
+    return pgast.SelectStmt(
+        target_list=targets,
+        from_clause=[
+            pgast.RelRangeVar(
+                relation=pgast.Relation(
+                    schemaname='edgedbpub', name=f'tbl-{n}'),
+                alias=pgast.Alias(aliasname=alias),
+            ),
+        ],
+        where_clause=pgast.Expr(
+            kind=pgast.ExprKind.OP,
+            name='AND',
+            lexpr=pgast.Expr(
+                kind=pgast.ExprKind.OP,
+                name='=',
+                lexpr=col('id'),
+                rexpr=pgast.NumericConstant(val='1'),
+            ),
+            rexpr=pgast.NullTest(arg=col('name'), negated=True),
+        ),
+        sort_clause=[pgast.SortBy(node=col('name'))],
+        limit_count=pgast.NumericConstant(val='10'),
+    )
+
+
+@edbcommands.command('bench-sql-codegen')
+@click.option(
+    '-n', '--iterations', type=int, default=20, show_default=True,
+    help='number of timed runs in every mode')
+@click.option(
+    '--depth', type=int, default=7, show_default=True,
+    help='nesting depth of the generated SQL tree')
+@click.option(
+    '--width', type=int, default=8, show_default=True,
+    help='number of output columns of every (sub)query')
+def bench_sql_codegen(*, iterations: int, depth: int, width: int):
+    """Benchmark SQL code generation on a large synthetic SQL tree."""
+    tree = sql_tree(depth, width)
+
+    for pretty in (False, True):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            codegen = pgcodegen.SQLSourceGenerator(pretty=pretty)
+            codegen.visit(tree)
+            sql = ''.join(codegen.result)
+            timings.append(time.perf_counter() - start)
+
+        print(
+            f'{"pretty" if pretty else "compact":8}'
+            f'  median {_fmt_ms(statistics.median(timings))} ms'
+            f'  min {_fmt_ms(min(timings))} ms'
+            f'  {len(sql) / 1024:.0f} KiB of SQL'
+        )
@@ -62,4 +62,5 @@ from . import inittestdb  # noqa
 from . import test  # noqa
 from . import wipe  # noqa
 from . import gen_test_dumps  # noqa
+from . import bench_compiler  # noqa
 from .profiling import cli  # noqa
@@ -114,6 +114,8 @@ if platform.uname().system != 'Windows':
 def _compile_parsers(build_lib, inplace=False):
     import parsing
 
+    from edb.common import parsing as edb_parsing
+
     import edb.edgeql.parser.grammar.single as edgeql_spec
     import edb.edgeql.parser.grammar.block as edgeql_spec2
     import edb.edgeql.parser.grammar.sdldocument as schema_spec
@@ -121,13 +123,17 @@ def _compile_parsers(build_lib, inplace=False):
     for spec in (edgeql_spec, edgeql_spec2, schema_spec):
         spec_path = pathlib.Path(spec.__file__).parent
         subpath = pathlib.Path(str(spec_path)[len(str(ROOT_PATH)) + 1:])
-        pickle_name = spec.__name__.rpartition('.')[2] + '.pickle'
-        pickle_path = subpath / pickle_name
+        spec_name = spec.__name__.rpartition('.')[2]
+        pickle_path = subpath / f'{spec_name}.pickle'
+        tables_path = subpath / f'{spec_name}.tables'
         cache = build_lib / pickle_path
+        tables = build_lib / tables_path
         cache.parent.mkdir(parents=True, exist_ok=True)
-        parsing.Spec(spec, pickleFile=str(cache), verbose=True)
+        parser_spec = parsing.Spec(spec, pickleFile=str(cache), verbose=True)
+        edb_parsing.write_parser_tables(parser_spec, spec, str(tables))
         if inplace:
             shutil.copy2(cache, ROOT_PATH / pickle_path)
+            shutil.copy2(tables, ROOT_PATH / tables_path)
 
 
 def _compile_build_meta(build_lib, version, pg_config, runstatedir,
@@ -20,6 +20,7 @@
 
 
 import copy
+import pickle
 import typing
 import unittest
 import unittest.mock
@@ -86,6 +87,64 @@ class ASTBaseTests(unittest.TestCase):
         assert ctree22.left.args[0].node['lconst'] is not lconst
         assert ctree22.left.args[0].node['lconst'].value == lconst.value
 
+    def test_common_ast_freeze(self):
+        lconst = tast.Constant(value='foo')
+        call = tast.FunctionCall(args=[lconst])
+        tree = ast.freeze(tast.BinOp(left=call, right=lconst))
+
+        with self.assertRaisesRegex(TypeError, 'cannot set'):
+            tree.op = '+'
+        with self.assertRaisesRegex(TypeError, 'cannot set'):
+            lconst.value = 'bar'
+
+        # Frozen trees are shared instead of copied.
+        assert copy.deepcopy(tree) is tree
+        parent = tast.UnaryOp(operand=tree)
+        assert copy.deepcopy(parent).operand is tree
+
+        # Shallow copies are mutable and own their containers.
+        ccall = copy.copy(call)
+        ccall.args.append(tast.Constant(value='bar'))
+        assert ccall.args[0] is lconst
+        self.assertEqual(len(call.args), 1)
+
+    def test_common_ast_immutable(self):
+        class Node(ast.ImmutableASTMixin, tast.Base):
+            __fields = ['name', 'card']
+            __ast_mutable_fields__ = frozenset(('card',))
+
+        node = Node(name='foo')
+        node.card = 1
+        with self.assertRaisesRegex(TypeError, 'cannot set'):
+            node.name = 'bar'
+
+        cnode = copy.deepcopy(node)
+        assert cnode is not node
+        self.assertEqual((cnode.name, cnode.card), ('foo', 1))
+        with self.assertRaisesRegex(TypeError, 'cannot set'):
+            cnode.name = 'bar'
+
+    def test_common_ast_init(self):
+        class Call(tast.FunctionCall):
+            def __init__(self, *, name=None, **kwargs):
+                super().__init__(name=name or 'default', **kwargs)
+
+        class MethodCall(Call):
+            __fields = ['method']
+
+        call = tast.FunctionCall(name='foo')
+        self.assertEqual((call.name, call.args), ('foo', []))
+        self.assertIsNot(tast.FunctionCall().args, call.args)
+        self.assertFalse(hasattr(call, '__dict__'))
+
+        mcall = MethodCall(method='bar')
+        self.assertEqual(
+            (mcall.name, mcall.method, mcall.args), ('default', 'bar', []))
+        self.assertFalse(hasattr(mcall, '__dict__'))
+
+        ccall = pickle.loads(pickle.dumps(call))
+        self.assertEqual((ccall.name, ccall.args), ('foo', []))
+
     @unittest.mock.patch(
         'edb.common.ast.base._check_type',
         ast.base._check_type_real,
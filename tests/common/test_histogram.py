@@ -0,0 +1,49 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from __future__ import annotations
+from typing import *  # NoQA
+
+import math
+import unittest
+
+from edb.common.histogram import Histogram
+
+
+class HistogramTests(unittest.TestCase):
+    def test_common_histogram_01(self) -> None:
+        h = Histogram(buckets=(10, 1, 5))
+        self.assertEqual(h.get_buckets(), [(1, 0), (5, 0), (10, 0),
+                                           (math.inf, 0)])
+        self.assertEqual(h.quantile(0.5), 0.0)
+
+        for v in (0.5, 1, 2, 7, 100):
+            h.observe(v)
+
+        self.assertEqual(h.count, 5)
+        self.assertEqual(h.sum, 110.5)
+        self.assertEqual(h.get_buckets(), [(1, 2), (5, 3), (10, 4),
+                                           (math.inf, 5)])
+        self.assertEqual(h.quantile(0.4), 1)
+        self.assertEqual(h.quantile(0.5), 5)
+        self.assertEqual(h.quantile(0.99), math.inf)
+
+        h.reset()
+        self.assertEqual(h.count, 0)
+        self.assertEqual(h.sum, 0.0)
+        self.assertEqual(h.get_buckets()[-1], (math.inf, 0))
@@ -0,0 +1,51 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from __future__ import annotations
+from typing import *  # NoQA
+
+import time
+import unittest
+
+from edb.common.phasetimer import PhaseTimer
+
+
+class PhaseTimerTests(unittest.TestCase):
+    def test_common_phasetimer_01(self) -> None:
+        t = PhaseTimer()
+        with t.phase('outer'):
+            with t.phase('inner'):
+                time.sleep(0.02)
+            with t.phase('inner'):
+                time.sleep(0.02)
+
+        self.assertEqual(set(t.phases), {'outer', 'inner'})
+        self.assertGreaterEqual(t.phases['inner'], 0.04)
+        # Nested time is not counted towards the enclosing phase.
+        self.assertLess(t.phases['outer'], 0.02)
+
+        with self.assertRaises(ZeroDivisionError):
+            with t.phase('outer'):
+                1 / 0
+        self.assertEqual(t._nested, [])
+
+        phases = {'inner': 1.0}
+        t.drain_into(phases)
+        self.assertEqual(t.phases, {})
+        self.assertGreaterEqual(phases['inner'], 1.04)
+        self.assertIn('outer', phases)
@@ -222,6 +222,48 @@ class TestConstraintsSchema(tb.QueryTestCase):
                     };
                 """)
 
+    async def test_constraints_exclusive_across_ancestry_bulk(self):
+        async with self._run_and_rollback():
+            await self.con.execute("""
+                INSERT test::UniqueName {
+                    name := 'exclusive_bulk_50'
+                };
+            """)
+
+            with self.assertRaisesRegex(
+                    edgedb.ConstraintViolationError,
+                    'name violates exclusivity constraint'):
+                await self.con.execute("""
+                    FOR x IN {<str>std::_gen_series(0, 99)}
+                    UNION (
+                        INSERT test::UniqueNameInherited {
+                            name := 'exclusive_bulk_' ++ x
+                        }
+                    );
+                """)
+
+        async with self._run_and_rollback():
+            await self.con.execute("""
+                INSERT test::UniqueName {
+                    name := 'exclusive_bulk_ok'
+                };
+
+                FOR x IN {<str>std::_gen_series(0, 99)}
+                UNION (
+                    INSERT test::UniqueNameInherited {
+                        name := 'exclusive_bulk_' ++ x
+                    }
+                );
+            """)
+
+            await self.assert_query_result(
+                r"""
+                    SELECT count(test::UniqueName
+                                 FILTER .name LIKE 'exclusive_bulk_%');
+                """,
+                [101],
+            )
+
     async def test_constraints_exclusive_case_insensitive(self):
         async with self._run_and_rollback():
             with self.assertRaisesRegex(
@@ -16,6 +16,7 @@
 # limitations under the License.
 #
 
+import asyncio
 import decimal
 import re
 import uuid
@@ -8482,6 +8483,248 @@ type test::Foo {
                 };
             ''')
 
+    async def _assert_link_target_indexes(
+            self, source, link, *, inline, table):
+        # Check whether the target of the link is indexed in the
+        # inline column of the *source* table and in the link table.
+        column = await self._get_backend_column(source, link)
+        await self._assert_backend_indexes(
+            f"schema::ObjectType FILTER .name = '{source}'",
+            column,
+            [rf'USING btree \({re.escape(column)}\)$'] if inline else [],
+        )
+        await self._assert_backend_indexes(
+            f"schema::Link FILTER .name = '{link}' "
+            f"AND .source.name = '{source}'",
+            'target',
+            [r'USING btree \(target\)$'] if table else [],
+        )
+
+    async def test_edgeql_ddl_link_index_target_01(self):
+        await self.con.execute('''
+            SET MODULE test;
+
+            CREATE TYPE Target {
+                CREATE PROPERTY name -> str;
+            };
+            CREATE TYPE Source {
+                CREATE LINK tgt -> Target;
+                CREATE MULTI LINK tgts -> Target;
+                CREATE LINK tgt_lp -> Target {
+                    CREATE PROPERTY note -> str;
+                };
+            };
+
+            INSERT Source {
+                tgt := (INSERT Target { name := 'a' }),
+                tgts := (INSERT Target { name := 'b' }),
+                tgt_lp := (INSERT Target { name := 'c' }),
+            };
+        ''')
+
+        await self.assert_query_result(
+            r'''
+                SELECT schema::Link {
+                    name,
+                    index_target,
+                }
+                FILTER .source.name = 'test::Source'
+                       AND .name LIKE 'tgt%'
+                ORDER BY .name;
+            ''',
+            [
+                {'name': 'tgt', 'index_target': True},
+                {'name': 'tgt_lp', 'index_target': True},
+                {'name': 'tgts', 'index_target': True},
+            ],
+        )
+
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgt', inline=True, table=False)
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgts', inline=False, table=True)
+        # Single links with link properties are stored both inline
+        # and in a link table.
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgt_lp', inline=True, table=True)
+
+        await self.con.execute('''
+            ALTER TYPE Source {
+                ALTER LINK tgt SET index_target := false;
+                ALTER LINK tgts SET index_target := false;
+                ALTER LINK tgt_lp SET index_target := false;
+            };
+        ''')
+
+        await self.assert_query_result(
+            r'''
+                SELECT schema::Link {
+                    name,
+                    index_target,
+                }
+                FILTER .source.name = 'test::Source'
+                       AND .name LIKE 'tgt%'
+                ORDER BY .name;
+            ''',
+            [
+                {'name': 'tgt', 'index_target': False},
+                {'name': 'tgt_lp', 'index_target': False},
+                {'name': 'tgts', 'index_target': False},
+            ],
+        )
+
+        for link in ('tgt', 'tgts', 'tgt_lp'):
+            await self._assert_link_target_indexes(
+                'test::Source', link, inline=False, table=False)
+
+        await self.assert_query_result(
+            r'''
+                SELECT Target {
+                    name,
+                    n := count(.<tgt UNION .<tgts UNION .<tgt_lp),
+                }
+                ORDER BY .name;
+            ''',
+            [
+                {'name': 'a', 'n': 1},
+                {'name': 'b', 'n': 1},
+                {'name': 'c', 'n': 1},
+            ],
+        )
+
+        # Cardinality changes must respect the setting.
+        await self.con.execute('''
+            ALTER TYPE Source {
+                ALTER LINK tgt SET MULTI;
+                ALTER LINK tgts SET SINGLE USING (SELECT .tgts LIMIT 1);
+            };
+        ''')
+
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgt', inline=False, table=False)
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgts', inline=False, table=False)
+
+        await self.con.execute('''
+            ALTER TYPE Source {
+                ALTER LINK tgt RESET index_target;
+                ALTER LINK tgts RESET index_target;
+                ALTER LINK tgt_lp SET index_target := true;
+            };
+        ''')
+
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgt', inline=False, table=True)
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgts', inline=True, table=False)
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgt_lp', inline=True, table=True)
+
+        await self.assert_query_result(
+            r'''
+                SELECT Source {
+                    tgt: {name},
+                    tgts: {name},
+                    tgt_lp: {name},
+                };
+            ''',
+            [{
+                'tgt': [{'name': 'a'}],
+                'tgts': {'name': 'b'},
+                'tgt_lp': {'name': 'c'},
+            }],
+        )
+
+        await self.con.execute('''
+            ALTER TYPE Source {
+                ALTER LINK tgt SET SINGLE USING (SELECT .tgt LIMIT 1);
+                ALTER LINK tgts SET MULTI;
+            };
+        ''')
+
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgt', inline=True, table=False)
+        await self._assert_link_target_indexes(
+            'test::Source', 'tgts', inline=False, table=True)
+
+        await self.assert_query_result(
+            r'''
+                SELECT Target {
+                    name,
+                    n := count(.<tgt UNION .<tgts UNION .<tgt_lp),
+                }
+                ORDER BY .name;
+            ''',
+            [
+                {'name': 'a', 'n': 1},
+                {'name': 'b', 'n': 1},
+                {'name': 'c', 'n': 1},
+            ],
+        )
+
+    async def test_edgeql_ddl_link_index_target_02(self):
+        await self.con.execute('''
+            SET MODULE test;
+
+            CREATE TYPE Target;
+            CREATE TYPE Base {
+                CREATE MULTI LINK tgts -> Target {
+                    SET index_target := false;
+                };
+            };
+            CREATE TYPE Derived EXTENDING Base;
+        ''')
+
+        await self.assert_query_result(
+            r'''
+                SELECT schema::ObjectType {
+                    name,
+                    links: {
+                        index_target,
+                    } FILTER .name = 'tgts',
+                }
+                FILTER .name IN {'test::Base', 'test::Derived'}
+                ORDER BY .name;
+            ''',
+            [
+                {'name': 'test::Base', 'links': [{'index_target': False}]},
+                {'name': 'test::Derived', 'links': [{'index_target': False}]},
+            ],
+        )
+
+        for source in ('test::Base', 'test::Derived'):
+            await self._assert_link_target_indexes(
+                source, 'tgts', inline=False, table=False)
+
+        await self.con.execute('''
+            ALTER TYPE Base {
+                ALTER LINK tgts SET index_target := true;
+            };
+        ''')
+
+        await self.assert_query_result(
+            r'''
+                SELECT schema::ObjectType {
+                    name,
+                    links: {
+                        index_target,
+                    } FILTER .name = 'tgts',
+                }
+                FILTER .name IN {'test::Base', 'test::Derived'}
+                ORDER BY .name;
+            ''',
+            [
+                {'name': 'test::Base', 'links': [{'index_target': True}]},
+                {'name': 'test::Derived', 'links': [{'index_target': True}]},
+            ],
+        )
+
+        # The inherited link has its own link table, which must be
+        # indexed as well.
+        for source in ('test::Base', 'test::Derived'):
+            await self._assert_link_target_indexes(
+                source, 'tgts', inline=False, table=True)
+
     async def test_edgeql_ddl_required_01(self):
         # Test that required qualifier cannot be dropped if it was not
         # actually set on the particular property.
@@ -8867,6 +9110,435 @@ type test::Foo {
                 }
             """)
 
+    async def _get_backend_column(self, source, name):
+        ptr_id = await self.con.query_one(f'''
+            SELECT (
+                SELECT schema::Pointer
+                FILTER .source.name = '{source}' AND .name = '{name}'
+                LIMIT 1
+            ).id;
+        ''')
+        return str(ptr_id)
+
+    async def _assert_backend_indexes(self, subject, column, expected):
+        # Check the definitions of the backend indexes keyed on *column*
+        # of the table of the object type or link selected by *subject*:
+        # each of the *expected* patterns must match exactly one index.
+        # Identifiers are compared without quotes.
+        defs = await self.con.query(f'''
+            SELECT sys::_get_backend_index_defs(
+                (SELECT {subject} LIMIT 1).id
+            );
+        ''')
+        defs = [
+            d for d in (d.replace('"', '') for d in defs)
+            if re.search(rf'USING \w+ \({re.escape(column)}[ )]', d)
+        ]
+
+        self.assertEqual(len(defs), len(expected), defs)
+        for pattern in expected:
+            matching = [d for d in defs if re.search(pattern, d)]
+            self.assertEqual(len(matching), 1, (pattern, defs))
+
+    async def test_edgeql_ddl_index_kind_01(self):
+        await self.con.execute(r"""
+            CREATE TYPE test::Article {
+                CREATE PROPERTY title -> str;
+                CREATE PROPERTY archived -> bool;
+                CREATE INDEX ON (.title);
+                CREATE INDEX ON (.title) {
+                    SET kind := 'GIN';
+                };
+                CREATE INDEX ON (.title) {
+                    SET kind := 'GiST';
+                    SET predicate := .archived = false;
+                    SET include := .archived;
+                };
+            };
+        """)
+
+        await self.assert_query_result(
+            r"""
+                SELECT schema::ObjectType {
+                    indexes: {
+                        kind,
+                    } ORDER BY .kind
+                }
+                FILTER .name = 'test::Article';
+            """,
+            [{
+                'indexes': [
+                    {'kind': 'BTree'},
+                    {'kind': 'GIN'},
+                    {'kind': 'GiST'},
+                ],
+            }],
+        )
+
+        title = await self._get_backend_column('test::Article', 'title')
+        archived = await self._get_backend_column(
+            'test::Article', 'archived')
+        title_re = re.escape(title)
+        archived_re = re.escape(archived)
+
+        await self._assert_backend_indexes(
+            "schema::ObjectType FILTER .name = 'test::Article'",
+            title,
+            [
+                rf'USING btree \({title_re}\)$',
+                rf'USING gin \({title_re} gin_trgm_ops\)$',
+                rf'USING gist \({title_re} gist_trgm_ops\) '
+                rf'INCLUDE \({archived_re}\) WHERE \({archived_re} = false\)$',
+            ],
+        )
+
+    async def test_edgeql_ddl_index_kind_02(self):
+        await self.con.execute(r"""
+            CREATE TYPE test::Article2 {
+                CREATE PROPERTY title -> str;
+                CREATE PROPERTY archived -> bool;
+                CREATE INDEX ON (.title);
+                CREATE INDEX ON (.title) {
+                    SET kind := 'GiST';
+                    SET predicate := .archived = false;
+                };
+            };
+        """)
+
+        async with self.assertRaisesRegexTx(
+            edgedb.InvalidReferenceError,
+            r"GiST index on \(\.title\) does not exist on "
+            r"object type 'test::Article2'"
+        ):
+            await self.con.execute(r"""
+                ALTER TYPE test::Article2 {
+                    ALTER INDEX ON (.title) {
+                        SET kind := 'GiST';
+                        SET include := .archived;
+                    };
+                };
+            """)
+
+        async with self.assertRaisesRegexTx(
+            edgedb.SchemaDefinitionError,
+            r"cannot reset the kind of an index"
+        ):
+            await self.con.execute(r"""
+                ALTER TYPE test::Article2 {
+                    ALTER INDEX ON (.title) {
+                        RESET kind;
+                    };
+                };
+            """)
+
+        await self.con.execute(r"""
+            ALTER TYPE test::Article2 {
+                ALTER INDEX ON (.title) {
+                    SET kind := 'GiST';
+                    SET predicate := .archived = false;
+                    SET include := .archived;
+                };
+            };
+        """)
+
+        title = await self._get_backend_column('test::Article2', 'title')
+        archived = await self._get_backend_column(
+            'test::Article2', 'archived')
+        title_re = re.escape(title)
+        archived_re = re.escape(archived)
+
+        await self._assert_backend_indexes(
+            "schema::ObjectType FILTER .name = 'test::Article2'",
+            title,
+            [
+                rf'USING btree \({title_re}\)$',
+                rf'USING gist \({title_re} gist_trgm_ops\) '
+                rf'INCLUDE \({archived_re}\) WHERE \({archived_re} = false\)$',
+            ],
+        )
+
+        await self.con.execute(r"""
+            ALTER TYPE test::Article2 {
+                DROP INDEX ON (.title) {
+                    SET kind := 'GiST';
+                    SET predicate := .archived = false;
+                };
+            };
+        """)
+
+        await self._assert_backend_indexes(
+            "schema::ObjectType FILTER .name = 'test::Article2'",
+            title,
+            [
+                rf'USING btree \({title_re}\)$',
+            ],
+        )
+
+    async def test_edgeql_ddl_index_kind_03(self):
+        await self.con.execute(r"""
+            CREATE TYPE test::Article3 {
+                CREATE PROPERTY title -> str;
+                CREATE INDEX ON (.title);
+                CREATE INDEX ON (.title) {
+                    SET kind := 'GIN';
+                };
+            };
+            CREATE TYPE test::News3 EXTENDING test::Article3;
+        """)
+
+        title = await self._get_backend_column('test::News3', 'title')
+        title_re = re.escape(title)
+
+        await self._assert_backend_indexes(
+            "schema::ObjectType FILTER .name = 'test::News3'",
+            title,
+            [
+                rf'USING btree \({title_re}\)$',
+                rf'USING gin \({title_re} gin_trgm_ops\)$',
+            ],
+        )
+
+        await self.con.execute(r"""
+            ALTER TYPE test::Article3 {
+                DROP INDEX ON (.title) {
+                    SET kind := 'GIN';
+                };
+            };
+        """)
+
+        await self._assert_backend_indexes(
+            "schema::ObjectType FILTER .name = 'test::News3'",
+            title,
+            [
+                rf'USING btree \({title_re}\)$',
+            ],
+        )
+
+    async def test_edgeql_ddl_index_online_01(self):
+        await self.con.execute(r"""
+            CREATE TYPE test::OnlineIdx {
+                CREATE PROPERTY name -> str;
+            };
+
+            INSERT test::OnlineIdx { name := 'a' };
+        """)
+
+        await self.con.execute(r"""
+            CONFIGURE SESSION SET online_index_build := true;
+        """)
+        try:
+            await self.con.execute(r"""
+                ALTER TYPE test::OnlineIdx {
+                    CREATE INDEX ON (.name);
+                };
+            """)
+        finally:
+            await self.con.execute(r"""
+                CONFIGURE SESSION RESET online_index_build;
+            """)
+
+        await self.assert_query_result(
+            r"""
+                SELECT schema::ObjectType {
+                    indexes: {
+                        expr
+                    }
+                }
+                FILTER .name = 'test::OnlineIdx';
+            """,
+            [{
+                'indexes': [{
+                    'expr': '.name'
+                }]
+            }],
+        )
+
+    async def test_edgeql_ddl_index_online_02(self):
+        await self.con.execute(r"""
+            CREATE TYPE test::OnlineIdx2 {
+                CREATE PROPERTY name -> str;
+            };
+        """)
+
+        await self.con.execute(r"""
+            CONFIGURE SESSION SET online_index_build := true;
+        """)
+        try:
+            async with self._run_and_rollback():
+                with self.assertRaisesRegex(
+                    edgedb.QueryError,
+                    r"online index build cannot be performed in a "
+                    r"transaction block"
+                ):
+                    await self.con.execute(r"""
+                        ALTER TYPE test::OnlineIdx2 {
+                            CREATE INDEX ON (.name);
+                        };
+                    """)
+        finally:
+            await self.con.execute(r"""
+                CONFIGURE SESSION RESET online_index_build;
+            """)
+
+    async def test_edgeql_ddl_index_online_03(self):
+        # Only CREATE INDEX CONCURRENTLY waits for the transactions
+        # writing to the table in the "waiting for writers" phase,
+        # instead of blocking on a lock.  The DDL is issued with query()
+        # to go through the OptimisticExecute path.
+        await self.con.execute(r"""
+            CREATE TYPE test::OnlineIdx3 {
+                CREATE PROPERTY name -> str;
+            };
+        """)
+
+        writer = await self.connect(database=self.get_database_name())
+        monitor = await self.connect(database=self.get_database_name())
+        build = None
+        try:
+            await writer.execute('START TRANSACTION')
+            await writer.execute(r"""
+                INSERT test::OnlineIdx3 { name := 'a' };
+            """)
+
+            await self.con.execute(r"""
+                CONFIGURE SESSION SET online_index_build := true;
+            """)
+            build = asyncio.create_task(self.con.query(r"""
+                ALTER TYPE test::OnlineIdx3 {
+                    CREATE INDEX ON (.name);
+                };
+            """))
+
+            for _ in range(100):
+                phases = await monitor.query(r"""
+                    SELECT sys::get_index_build_progress().phase;
+                """)
+                if 'waiting for writers before build' in phases:
+                    break
+                await asyncio.sleep(0.1)
+            else:
+                self.fail('the index is not being built concurrently')
+
+            await writer.execute('COMMIT')
+            task, build = build, None
+            await task
+        finally:
+            if build is not None:
+                await writer.execute('ROLLBACK')
+                try:
+                    await build
+                except edgedb.EdgeDBError:
+                    pass
+            await writer.aclose()
+            await monitor.aclose()
+            await self.con.execute(r"""
+                CONFIGURE SESSION RESET online_index_build;
+            """)
+
+        await self.assert_query_result(
+            r"""
+                SELECT schema::ObjectType {
+                    indexes: {
+                        expr
+                    }
+                }
+                FILTER .name = 'test::OnlineIdx3';
+            """,
+            [{
+                'indexes': [{
+                    'expr': '.name'
+                }]
+            }],
+        )
+
+    async def test_edgeql_ddl_index_online_04(self):
+        # The DDL transaction fails after the online build has completed,
+        # so the built index must be dropped.  Were it left behind,
+        # inserting a non-numeric code would fail in its expression.
+        await self.con.execute(r"""
+            CREATE TYPE test::OnlineIdx4 {
+                CREATE PROPERTY code -> str;
+                CREATE PROPERTY val -> str;
+            };
+
+            INSERT test::OnlineIdx4 { code := '1' };
+        """)
+
+        await self.con.execute(r"""
+            CONFIGURE SESSION SET online_index_build := true;
+        """)
+        try:
+            with self.assertRaisesRegex(
+                edgedb.MissingRequiredError,
+                r"missing value for required property 'val'"
+            ):
+                await self.con.execute(r"""
+                    ALTER TYPE test::OnlineIdx4 {
+                        CREATE INDEX ON (<int64>.code);
+                        ALTER PROPERTY val {
+                            SET REQUIRED USING (<str>{});
+                        };
+                    };
+                """)
+        finally:
+            await self.con.execute(r"""
+                CONFIGURE SESSION RESET online_index_build;
+            """)
+
+        await self.con.execute(r"""
+            INSERT test::OnlineIdx4 { code := 'x' };
+        """)
+
+        await self.assert_query_result(
+            r"""
+                SELECT schema::ObjectType {
+                    indexes: {
+                        expr
+                    }
+                }
+                FILTER .name = 'test::OnlineIdx4';
+            """,
+            [{
+                'indexes': []
+            }],
+        )
+
+    async def test_edgeql_ddl_index_online_05(self):
+        await self.con.execute(r"""
+            CREATE TYPE test::OnlineIdx5 {
+                CREATE PROPERTY name -> str;
+            };
+        """)
+
+        await self.con.execute(r"""
+            CONFIGURE SESSION SET online_index_build := true;
+        """)
+        try:
+            # The builds would be committed separately from the rest
+            # of the script.
+            with self.assertRaisesRegex(
+                edgedb.QueryError,
+                r"online index build cannot be performed in a "
+                r"transaction block"
+            ):
+                await self.con.execute(r"""
+                    ALTER TYPE test::OnlineIdx5 {
+                        CREATE INDEX ON (.name);
+                    };
+                    INSERT test::OnlineIdx5 { name := 'a' };
+                """)
+        finally:
+            await self.con.execute(r"""
+                CONFIGURE SESSION RESET online_index_build;
+            """)
+
+        await self.assert_query_result(
+            r"""
+                SELECT test::OnlineIdx5 { name };
+            """,
+            [],
+        )
+
     async def test_edgeql_ddl_errors_01(self):
         await self.con.execute('''
             WITH MODULE test
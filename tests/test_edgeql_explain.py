@@ -0,0 +1,123 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+
+import json
+import os.path
+
+import edgedb
+
+from edb.testbase import server as tb
+
+
+class TestEdgeQLExplain(tb.QueryTestCase):
+
+    SCHEMA = os.path.join(os.path.dirname(__file__), 'schemas',
+                          'issues.esdl')
+
+    SETUP = os.path.join(os.path.dirname(__file__), 'schemas',
+                         'issues_setup.edgeql')
+
+    def _walk_plan(self, plan):
+        yield plan
+        for subplan in plan.get('Plans', ()):
+            yield from self._walk_plan(subplan)
+
+    async def _explain(self, query):
+        result = json.loads(await self.con.query_one(query))
+        self.assertIsInstance(result, list)
+        self.assertEqual(len(result), 1)
+        return list(self._walk_plan(result[0]['Plan']))
+
+    async def test_edgeql_explain_01(self):
+        nodes = await self._explain(r'''
+            EXPLAIN
+            WITH MODULE test
+            SELECT User { name } FILTER .name = 'Elvis';
+        ''')
+
+        self.assertTrue(any('EdgeQL Path' in n for n in nodes))
+        self.assertTrue(all('Actual Rows' not in n for n in nodes))
+
+    async def test_edgeql_explain_02(self):
+        nodes = await self._explain(r'''
+            EXPLAIN ANALYZE
+            WITH MODULE test
+            SELECT Issue { name, owner: { name } };
+        ''')
+
+        self.assertIn('Actual Rows', nodes[0])
+        self.assertTrue(any('EdgeQL Path' in n for n in nodes))
+
+    async def test_edgeql_explain_03(self):
+        async with self._run_and_rollback():
+            await self._explain(r'''
+                EXPLAIN ANALYZE
+                WITH MODULE test
+                UPDATE User FILTER .name = 'Elvis'
+                SET { name := 'Elvis Presley' };
+            ''')
+
+            # EXPLAIN ANALYZE runs the query.
+            await self.assert_query_result(
+                r'''
+                    WITH MODULE test
+                    SELECT User FILTER .name = 'Elvis';
+                ''',
+                [],
+            )
+
+    async def test_edgeql_explain_04(self):
+        async with self.assertRaisesRegexTx(
+            edgedb.QueryError,
+            'EXPLAIN does not support query parameters',
+        ):
+            await self.con.query_one(
+                r'''
+                    EXPLAIN
+                    WITH MODULE test
+                    SELECT User FILTER .name = <str>$name;
+                ''',
+                name='Elvis',
+            )
+
+    async def test_edgeql_explain_05(self):
+        # Plans are only produced for EXPLAIN statements compiled by
+        # the server, there is no function to explain arbitrary SQL.
+        async with self.assertRaisesRegexTx(
+            edgedb.InvalidReferenceError,
+            r"function 'sys::_explain' does not exist",
+        ):
+            await self.con.query_one(
+                r'''
+                    SELECT sys::_explain(
+                        'SELECT 1', true, <json>'{}');
+                ''',
+            )
+
+    async def test_edgeql_explain_06(self):
+        result = json.loads(await self.con.query_json(r'''
+            EXPLAIN
+            WITH MODULE test
+            SELECT User { name } FILTER .name = 'Elvis';
+        '''))
+
+        self.assertEqual(len(result), 1)
+        nodes = list(self._walk_plan(result[0][0]['Plan']))
+        self.assertTrue(any('EdgeQL Path' in n for n in nodes))
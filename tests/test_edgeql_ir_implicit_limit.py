@@ -0,0 +1,57 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2021-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import os.path
+
+from edb.testbase import lang as tb
+
+from edb import edgeql
+from edb.edgeql import compiler
+from edb.edgeql import parser as qlparser
+
+
+class TestEdgeQLImplicitLimit(tb.BaseEdgeQLCompilerTest):
+    """Unit tests for implicit limits on cached query trees."""
+
+    SCHEMA = os.path.join(os.path.dirname(__file__), 'schemas',
+                          'cards.esdl')
+
+    def setUp(self):
+        qlparser.clear_parse_cache()
+
+    def _compile_cached(self, source):
+        # The parse cache hands out the same frozen tree every time.
+        [qltree] = qlparser.parse_block_cached(source)
+        ir = compiler.compile_ast_to_ir(
+            qltree,
+            self.schema,
+            options=compiler.CompilerOptions(implicit_limit=5),
+        )
+        return qltree, ir
+
+    def test_edgeql_ir_implicit_limit_01(self):
+        source = edgeql.Source.from_string(
+            'WITH MODULE test SELECT User { f := (SELECT .friends) };')
+
+        first, _ = self._compile_cached(source)
+        second, _ = self._compile_cached(source)
+
+        self.assertIs(first, second)
+        self.assertIsNone(first.limit)
+        self.assertIsNone(first.result.elements[0].compexpr.limit)
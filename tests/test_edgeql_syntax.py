@@ -17,13 +17,18 @@
 #
 
 
+import os
 import re
+import tempfile
 import unittest  # NOQA
 
 from edb import errors
 
+from edb import edgeql
+from edb.common import parsing as edb_parsing
 from edb.testbase import lang as tb
 from edb.edgeql import generate_source as edgeql_to_source
+from edb.edgeql import parser as edgeql_parser_pkg
 from edb.edgeql.parser import parser as edgeql_parser
 
 
@@ -4503,3 +4508,171 @@ aa';
         """
         DESCRIBE ROLES AS DDL;
         """
+
+    def test_edgeql_syntax_explain_01(self):
+        """
+        EXPLAIN SELECT User;
+        """
+
+    def test_edgeql_syntax_explain_02(self):
+        """
+        EXPLAIN ANALYZE SELECT User FILTER (.name = 'x');
+        """
+
+    def test_edgeql_syntax_explain_03(self):
+        """
+        EXPLAIN ANALYZE WITH x := 1 UPDATE User SET { age := x };
+        """
+
+    @tb.must_fail(errors.EdgeQLSyntaxError,
+                  r"Unexpected 'EXPLAIN'",
+                  line=2, col=17)
+    def test_edgeql_syntax_explain_04(self):
+        """
+        EXPLAIN EXPLAIN SELECT User;
+        """
+
+
+class TestEdgeQLParseCache(unittest.TestCase):
+
+    def setUp(self):
+        edgeql_parser_pkg.clear_parse_cache()
+
+    def test_edgeql_parse_cache_01(self):
+        source = edgeql.Source.from_string('SELECT 1; SELECT User;')
+        first = edgeql_parser_pkg.parse_block_cached(source)
+        second = edgeql_parser_pkg.parse_block_cached(source)
+
+        self.assertEqual(
+            [edgeql_to_source(s) for s in first],
+            [edgeql_to_source(s) for s in second])
+        self.assertIsNot(first[0], second[0])
+
+        # Mutating a handed-out tree must not affect the cache.
+        first[1].result = first[0].result
+        third = edgeql_parser_pkg.parse_block_cached(source)
+        self.assertEqual(edgeql_to_source(third[1]), 'SELECT User')
+
+    def test_edgeql_parse_cache_02(self):
+        # Same token stream, different whitespace: the trees must
+        # carry the contexts of their own source text.
+        src1 = edgeql.Source.from_string('SELECT User;')
+        src2 = edgeql.Source.from_string('SELECT   User;')
+        edgeql_parser_pkg.parse_block_cached(src1)
+        tree = edgeql_parser_pkg.parse_block_cached(src2)[0]
+        self.assertEqual(tree.result.context.buffer, 'SELECT   User;')
+
+    def test_edgeql_parse_cache_03(self):
+        first = edgeql_parser_pkg.parse_fragment_cached('.name ++ "!"')
+        second = edgeql_parser_pkg.parse_fragment_cached('.name ++ "!"')
+        self.assertIsNot(first, second)
+        self.assertIsInstance(first, edgeql.ast.BinOp)
+        self.assertEqual(edgeql_to_source(first), edgeql_to_source(second))
+
+        # Schema expression trees get normalized in place, which
+        # must not affect the cache.
+        first.op = '='
+        third = edgeql_parser_pkg.parse_fragment_cached('.name ++ "!"')
+        self.assertEqual(
+            edgeql_to_source(third),
+            edgeql_to_source(edgeql_parser_pkg.parse_fragment('.name ++ "!"')))
+
+
+class TestEdgeQLParserTables(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        parser = edgeql_parser.EdgeQLBlockParser()
+        cls.mod = parser.get_parser_spec_module()
+        cls.spec = edb_parsing.Spec(
+            cls.mod, pickleFile=parser.localpath(cls.mod, 'pickle'))
+
+    def _write_tables(self, tmpdir):
+        path = os.path.join(tmpdir, 'block.tables')
+        edb_parsing.write_parser_tables(self.spec, self.mod, path)
+        return path
+
+    def _parse_with(self, spec, query):
+        parser_cls = type(
+            'Parser', (edgeql_parser.EdgeQLBlockParser,),
+            {'parser_spec': spec})
+        return parser_cls().parse(query)
+
+    def test_edgeql_parser_tables_01(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            compiled = edb_parsing.CompiledSpec.load(
+                self.mod, self._write_tables(tmpdir))
+            self.assertIsNotNone(compiled)
+
+            query = '''
+                WITH MODULE test
+                SELECT User {
+                    name,
+                    friends: { name } FILTER .name LIKE 'A%'
+                } ORDER BY .name LIMIT 10;
+                INSERT User { name := 'Alice' };
+                CREATE TYPE Foo EXTENDING Bar {
+                    CREATE PROPERTY baz -> str;
+                };
+            '''
+
+            expected = self._parse_with(self.spec, query)
+            result = self._parse_with(compiled, query)
+            self.assertEqual(
+                [edgeql_to_source(s) for s in result],
+                [edgeql_to_source(s) for s in expected])
+
+            with self.assertRaisesRegex(
+                    errors.EdgeQLSyntaxError, "Unexpected ';'"):
+                self._parse_with(compiled, 'SELECT (1;')
+
+    def test_edgeql_parser_tables_02(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = self._write_tables(tmpdir)
+
+            # Tables with a different grammar fingerprint are ignored.
+            with open(path, 'r+b') as f:
+                f.seek(len(edb_parsing.TABLES_MAGIC))
+                f.write(b'\x00' * 4)
+
+            self.assertIsNone(edb_parsing.CompiledSpec.load(self.mod, path))
+            self.assertIsNone(edb_parsing.CompiledSpec.load(
+                self.mod, os.path.join(tmpdir, 'missing.tables')))
+
+
+class TestEdgeQLParseBlockIter(unittest.TestCase):
+
+    def test_edgeql_parse_block_iter_01(self):
+        script = '''
+            ;;
+            CREATE TYPE Foo {
+                CREATE PROPERTY bar -> str;
+                CREATE PROPERTY baz := (SELECT 1);
+            };
+            SELECT [1, 2];
+            SELECT Foo  # no trailing semicolon
+        '''
+        statements = list(edgeql_parser_pkg.parse_block_iter(script))
+        self.assertEqual(
+            [edgeql_to_source(s) for s in statements],
+            [edgeql_to_source(s) for s in edgeql.parse_block(script)])
+        self.assertEqual(len(statements), 3)
+
+    def test_edgeql_parse_block_iter_02(self):
+        statements = edgeql_parser_pkg.parse_block_iter(
+            'SELECT 1; SELECT (2;')
+        self.assertIsInstance(next(statements), edgeql.ast.SelectQuery)
+        with self.assertRaises(errors.EdgeQLSyntaxError):
+            next(statements)
+
+    def test_edgeql_parse_block_iter_03(self):
+        source = edgeql.Source.from_string('SELECT 1; SELECT 2; SELECT 1;')
+        tokens = source.tokens()
+        keys = [
+            edgeql_parser_pkg._StatementSource(
+                source, tokens[start:end] + [tokens[-1]]).cache_key()
+            for start, end in edgeql.tokenizer.iter_statement_spans(tokens)
+        ]
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(keys[0], keys[2])
+        self.assertNotEqual(keys[0], keys[1])
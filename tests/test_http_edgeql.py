@@ -17,7 +17,12 @@
 #
 
 
+import gzip
+import json
 import os
+import socket
+import time
+import zlib
 
 import edgedb
 
@@ -257,3 +262,221 @@ class TestHttpEdgeQL(tb.EdgeQLTestCase):
                 r'''SELECT <str>$x ?? '-default' ''',
                 variables={'x': None},
             )
+
+    def test_http_edgeql_batch_01(self):
+        result = self.http_batch_request([
+            {'query': 'SELECT 1 + 1;'},
+            {
+                'query': 'SELECT Setting.value FILTER .name = <str>$name;',
+                'variables': {'name': 'perks'},
+            },
+            {'query': 'SELECT <str>$x;'},
+        ])
+
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0], {'data': [2]})
+        self.assertEqual(result[1], {'data': ['full']})
+        self.assertEqual(result[2]['error']['type'], 'QueryError')
+        self.assertIn('no value for the $x query parameter',
+                      result[2]['error']['message'])
+
+    def test_http_edgeql_batch_02(self):
+        result = self.http_batch_request(
+            [
+                {'query': 'SELECT count(Setting);'},
+                {'query': 'DELETE Setting;'},
+                {'query': 'SELECT count(Setting);'},
+            ],
+            read_only=True,
+        )
+
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0], {'data': [3]})
+        self.assertEqual(
+            result[1]['error']['type'], 'UnsupportedCapabilityError')
+        self.assertEqual(result[2], {'data': [3]})
+
+    def test_http_edgeql_batch_03(self):
+        with self.http_con() as con:
+            con.request(
+                'POST', self.http_addr, body=b'[]',
+                headers={'Content-Type': 'application/json'})
+            data, headers, status = self.http_con_read_response(con)
+
+            self.assertEqual(status, 400)
+            self.assertIn(b'the batch is empty', data)
+
+    def test_http_edgeql_batch_04(self):
+        # A failed query must not abort the read-only transaction
+        # of the rest of the batch.
+        result = self.http_batch_request(
+            [
+                {'query': 'SELECT 1 / 0;'},
+                {'query': 'SELECT 1 + 1;'},
+            ],
+            read_only=True,
+        )
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]['error']['type'], 'DivisionByZeroError')
+        self.assertEqual(result[1], {'data': [2]})
+
+    def test_http_edgeql_batch_05(self):
+        # None of the items is executed, so no backend connection
+        # or transaction is needed.
+        result = self.http_batch_request(
+            [
+                {'query': 'SELECT 1 +;'},
+                {'query': 'DELETE Setting;'},
+            ],
+            read_only=True,
+        )
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]['error']['type'], 'EdgeQLSyntaxError')
+        self.assertEqual(
+            result[1]['error']['type'], 'UnsupportedCapabilityError')
+
+        result = self.http_batch_request([{'query': 'SELECT count(Setting);'}])
+        self.assertEqual(result, [{'data': [3]}])
+
+    def test_http_edgeql_stream_01(self):
+        query = r"""
+            FOR x IN {1, 2, 3}
+            UNION (str_repeat('a', 70000) ++ <str>x)
+        """
+
+        with self.http_con() as con:
+            for _ in range(2):  # repeat to test prepared pgcon statements
+                con.request(
+                    'POST', self.http_addr,
+                    body=json.dumps({'query': query}).encode(),
+                    headers={'Content-Type': 'application/json'})
+                data, headers, status = self.http_con_read_response(con)
+
+                self.assertEqual(status, 200)
+                self.assertEqual(headers.get('transfer-encoding'), 'chunked')
+                self.assertNotIn('content-length', headers)
+                self.assertEqual(
+                    sorted(json.loads(data)['data']),
+                    ['a' * 70000 + str(i) for i in range(1, 4)])
+
+    def test_http_edgeql_stream_02(self):
+        with self.http_con() as con:
+            con.request(
+                'POST', self.http_addr,
+                body=json.dumps({'query': 'SELECT 1 + 1'}).encode(),
+                headers={'Content-Type': 'application/json'})
+            data, headers, status = self.http_con_read_response(con)
+
+            self.assertEqual(status, 200)
+            self.assertNotIn('transfer-encoding', headers)
+            self.assertEqual(headers['content-length'], str(len(data)))
+            self.assertEqual(json.loads(data), {'data': [2]})
+
+    def test_http_edgeql_compression_01(self):
+        query = "SELECT str_repeat('a', 5000)"
+
+        for encoding, decompress in [('gzip', gzip.decompress),
+                                     ('deflate', zlib.decompress)]:
+            with self.http_con() as con:
+                con.request(
+                    'POST', self.http_addr,
+                    body=json.dumps({'query': query}).encode(),
+                    headers={
+                        'Content-Type': 'application/json',
+                        'Accept-Encoding': f'br;q=1.0, {encoding}',
+                    })
+                data, headers, status = self.http_con_read_response(con)
+
+                self.assertEqual(status, 200)
+                self.assertEqual(headers['content-encoding'], encoding)
+                self.assertLess(len(data), 5000)
+                self.assertEqual(
+                    json.loads(decompress(data)), {'data': ['a' * 5000]})
+
+    def test_http_edgeql_compression_02(self):
+        query = r"""
+            FOR x IN {1, 2, 3}
+            UNION (str_repeat('a', 70000) ++ <str>x)
+        """
+
+        with self.http_con() as con:
+            con.request(
+                'POST', self.http_addr,
+                body=json.dumps({'query': query}).encode(),
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept-Encoding': 'gzip',
+                })
+            data, headers, status = self.http_con_read_response(con)
+
+            self.assertEqual(status, 200)
+            self.assertEqual(headers['content-encoding'], 'gzip')
+            self.assertEqual(headers.get('transfer-encoding'), 'chunked')
+            self.assertEqual(
+                sorted(json.loads(gzip.decompress(data))['data']),
+                ['a' * 70000 + str(i) for i in range(1, 4)])
+
+    def test_http_edgeql_compression_03(self):
+        with self.http_con() as con:
+            con.request(
+                'POST', self.http_addr,
+                body=json.dumps(
+                    {'query': "SELECT str_repeat('a', 5000)"}).encode(),
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept-Encoding': 'gzip;q=0',
+                })
+            data, headers, status = self.http_con_read_response(con)
+
+            self.assertEqual(status, 200)
+            self.assertNotIn('content-encoding', headers)
+            self.assertEqual(json.loads(data), {'data': ['a' * 5000]})
+
+
+class TestHttpEdgeQLLimits(tb.EdgeQLTestCase):
+
+    HTTP_PORT_OPTIONS = {
+        'idle_timeout': 1,
+        'max_connections': 2,
+        'max_request_size': 1024,
+    }
+
+    TRANSACTION_ISOLATION = False
+
+    def test_http_edgeql_limits_request_size_01(self):
+        with self.http_con() as con:
+            con.request(
+                'POST', self.http_addr,
+                body=json.dumps(
+                    {'query': f"SELECT '{'a' * 2000}'"}).encode(),
+                headers={'Content-Type': 'application/json'})
+            data, headers, status = self.http_con_read_response(con)
+
+            self.assertEqual(status, 413)
+            self.assertEqual(headers['connection'], 'close')
+
+    def test_http_edgeql_limits_idle_timeout_01(self):
+        with self.http_con() as con:
+            data, headers, status = self.http_con_request(
+                con, {'query': 'SELECT 1'})
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(data), {'data': [1]})
+
+            time.sleep(2)
+
+            with self.assertRaises(OSError):
+                self.http_con_request(con, {'query': 'SELECT 1'})
+
+    def test_http_edgeql_limits_connections_01(self):
+        with self.http_con() as con1, self.http_con() as con2:
+            for con in (con1, con2):
+                data, headers, status = self.http_con_request(
+                    con, {'query': 'SELECT 1'})
+                self.assertEqual(status, 200)
+
+            with socket.create_connection(
+                    (self.http_host, self.http_port)) as sock:
+                self.assertTrue(
+                    sock.recv(1024).startswith(b'HTTP/1.1 503 '))
@@ -17,6 +17,7 @@
 #
 
 
+import hashlib
 import json
 import os
 import uuid
@@ -130,6 +131,148 @@ class TestGraphQLFunctional(tb.GraphQLTestCase):
             with self.assertRaises(OSError):
                 self.http_con_request(con, {}, path='non-existant')
 
+    def test_graphql_http_persisted_01(self):
+        query = '''
+            {
+                Setting(order: {value: {dir: ASC}}) {
+                    value
+                }
+            }
+        '''
+        extensions = json.dumps({
+            'persistedQuery': {
+                'version': 1,
+                'sha256Hash': hashlib.sha256(query.encode()).hexdigest(),
+            }
+        })
+
+        with self.http_con() as con:
+            # Unknown hash without the query text.
+            data, headers, status = self.http_con_request(
+                con, {'extensions': extensions})
+            self.assertEqual(status, 200)
+            self.assertEqual(
+                json.loads(data)['errors'][0]['extensions']['code'],
+                'PERSISTED_QUERY_NOT_FOUND')
+
+            # Register the query.
+            data, headers, status = self.http_con_request(
+                con, {'query': query, 'extensions': extensions})
+            self.assertEqual(status, 200)
+            self.assertEqual(
+                json.loads(data)['data'],
+                {'Setting': [{'value': 'blue'}, {'value': 'full'},
+                             {'value': 'none'}]})
+
+            # Now the hash alone is enough.
+            for _ in range(3):
+                data, headers, status = self.http_con_request(
+                    con, {'extensions': extensions})
+                self.assertEqual(status, 200)
+                self.assertEqual(
+                    json.loads(data)['data'],
+                    {'Setting': [{'value': 'blue'}, {'value': 'full'},
+                                 {'value': 'none'}]})
+
+    def test_graphql_http_persisted_02(self):
+        extensions = json.dumps({
+            'persistedQuery': {
+                'version': 1,
+                'sha256Hash': hashlib.sha256(b'{ Foo { id } }').hexdigest(),
+            }
+        })
+
+        with self.http_con() as con:
+            data, headers, status = self.http_con_request(
+                con, {'query': '{ Setting { value } }',
+                      'extensions': extensions})
+            self.assertEqual(status, 200)
+            self.assertIn(
+                'does not match the query',
+                json.loads(data)['errors'][0]['message'])
+
+            data, headers, status = self.http_con_request(
+                con, {'query': '{ Setting { value } }',
+                      'extensions': json.dumps({'persistedQuery': {}})})
+            self.assertEqual(status, 400)
+            self.assertIn(b'unsupported "persistedQuery" version', data)
+
+    def test_graphql_http_batch_01(self):
+        result = self.http_batch_request([
+            {
+                'query': '''
+                    {
+                        Setting(order: {value: {dir: ASC}}) {
+                            value
+                        }
+                    }
+                ''',
+            },
+            {
+                'query': '''
+                    query($name: String!) {
+                        User(filter: {name: {eq: $name}}) {
+                            name
+                        }
+                    }
+                ''',
+                'variables': {'name': 'Alice'},
+            },
+            {
+                'query': '''
+                    {
+                        NON_EXISTING_TYPE {
+                            name
+                        }
+                    }
+                ''',
+            },
+        ], read_only=True)
+
+        self.assertEqual(len(result), 3)
+        self.assertEqual(
+            result[0],
+            {'data': {'Setting': [{'value': 'blue'}, {'value': 'full'},
+                                  {'value': 'none'}]}})
+        self.assertEqual(
+            result[1],
+            {'data': {'User': [{'name': 'Alice'}]}})
+        self.assertIn('QueryError:', result[2]['errors'][0]['message'])
+
+    def test_graphql_http_batch_02(self):
+        # A failed operation must not abort the read-only transaction
+        # of the rest of the batch.
+        result = self.http_batch_request([
+            {
+                'query': '''
+                    mutation insert_Setting {
+                        insert_Setting(data: [{
+                            name: "batch",
+                            value: "read-only",
+                        }]) {
+                            name
+                        }
+                    }
+                ''',
+            },
+            {
+                'query': '''
+                    {
+                        Setting(order: {value: {dir: ASC}}) {
+                            value
+                        }
+                    }
+                ''',
+            },
+        ], read_only=True)
+
+        self.assertEqual(len(result), 2)
+        self.assertIn('errors', result[0])
+        self.assertEqual(
+            result[1],
+            {'data': {'Setting': [{'value': 'blue'}, {'value': 'full'},
+                                  {'value': 'none'}]}})
+
     def test_graphql_functional_query_01(self):
         for _ in range(10):  # repeat to test prepared pgcon statements
             self.assert_graphql_query_result(r"""
@@ -883,6 +883,85 @@ class TestLinkTargetDeleteDeclarative(stb.QueryTestCase):
                 ]
             )
 
+    async def test_link_on_target_delete_bulk_01(self):
+        async with self._run_and_rollback():
+            await self.con.execute("""
+                SET MODULE test;
+
+                FOR x IN {<str>std::_gen_series(0, 99)}
+                UNION (
+                    INSERT Source1 {
+                        name := 'Source1.' ++ x,
+                        tgt1_restrict := (
+                            INSERT Target1 {
+                                name := 'Target1.' ++ x
+                            }
+                        ),
+                    });
+            """)
+
+            with self.assertRaisesRegex(
+                    edgedb.ConstraintViolationError,
+                    'deletion of test::Target1.* is prohibited by link'):
+                await self.con.execute("""
+                    DELETE test::Target1;
+                """)
+
+    async def test_link_on_target_delete_bulk_02(self):
+        async with self._run_and_rollback():
+            await self.con.execute("""
+                SET MODULE test;
+
+                FOR x IN {<str>std::_gen_series(0, 99)}
+                UNION (
+                    INSERT Source1 {
+                        name := 'Source1.' ++ x,
+                        tgt1_allow := (
+                            INSERT Target1 {
+                                name := 'Target1.allow.' ++ x
+                            }
+                        ),
+                        tgt1_del_source := (
+                            INSERT Target1 {
+                                name := 'Target1.del.' ++ x
+                            }
+                        ),
+                    });
+            """)
+
+            await self.con.execute("""
+                DELETE (
+                    SELECT test::Target1
+                    FILTER .name LIKE 'Target1.allow.%'
+                );
+            """)
+
+            await self.assert_query_result(
+                r'''
+                    WITH MODULE test
+                    SELECT (
+                        count(Source1),
+                        count(Source1.tgt1_allow),
+                    );
+                ''',
+                [[100, 0]]
+            )
+
+            await self.con.execute("""
+                DELETE (
+                    SELECT test::Target1
+                    FILTER .name LIKE 'Target1.del.%'
+                );
+            """)
+
+            await self.assert_query_result(
+                r'''
+                    WITH MODULE test
+                    SELECT count(Source1);
+                ''',
+                [0]
+            )
+
 
 class TestLinkTargetDeleteMigrations(stb.DDLTestCase):
 
@@ -17,6 +17,8 @@
 #
 
 
+import uuid
+
 from edb.testbase import protocol
 from edb.testbase.protocol.test import ProtocolTestCase
 
@@ -172,3 +174,54 @@ class TestProtocol(ProtocolTestCase):
             protocol.ReadyForCommand,
             transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
         )
+
+    async def test_proto_plan_cache_mode_01(self):
+        await self.con.connect()
+
+        for mode in ('force_generic_plan', 'force_custom_plan', 'auto'):
+            await self.con.send(
+                protocol.OptimisticExecute(
+                    headers=[
+                        protocol.Header(code=0xFF05, value=mode.encode()),
+                    ],
+                    io_format=protocol.IOFormat.BINARY,
+                    expected_cardinality=protocol.Cardinality.MANY,
+                    command_text='SELECT 1',
+                    # empty tuple
+                    input_typedesc_id=uuid.UUID(int=0xFF).bytes,
+                    # std::int64
+                    output_typedesc_id=uuid.UUID(int=0x105).bytes,
+                    arguments=b'\0\0\0\0',
+                ),
+                protocol.Sync(),
+            )
+            await self.con.recv_match(protocol.Data)
+            await self.con.recv_match(
+                protocol.CommandComplete,
+                status='SELECT'
+            )
+            await self.con.recv_match(
+                protocol.ReadyForCommand,
+                transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
+            )
+
+        await self.con.send(
+            protocol.Prepare(
+                headers=[
+                    protocol.Header(code=0xFF05, value=b'sometimes'),
+                ],
+                io_format=protocol.IOFormat.BINARY,
+                expected_cardinality=protocol.Cardinality.ONE,
+                statement_name=b'',
+                command='SELECT 1',
+            ),
+            protocol.Sync(),
+        )
+        await self.con.recv_match(
+            protocol.ErrorResponse,
+            message='PLAN_CACHE_MODE header must be one of',
+        )
+        await self.con.recv_match(
+            protocol.ReadyForCommand,
+            transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
+        )
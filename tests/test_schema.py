@@ -198,6 +198,44 @@ _123456789_123456789_123456789 -> str
             }
         """
 
+    @tb.must_fail(errors.SchemaDefinitionError,
+                  "GIN indexes cannot include additional properties")
+    def test_schema_bad_index_01(self):
+        """
+            type Base {
+                property tags -> array<str>;
+                property name -> str;
+                index on (.tags) {
+                    kind := 'GIN';
+                    include := .name;
+                }
+            }
+        """
+
+    @tb.must_fail(errors.SchemaDefinitionError,
+                  "index can only include properties of the indexed object")
+    def test_schema_bad_index_02(self):
+        """
+            type Base {
+                property name -> str;
+                index on (.name) {
+                    include := (.name, len(.name));
+                }
+            }
+        """
+
+    @tb.must_fail(errors.SchemaDefinitionError,
+                  "index predicate must be of type std::bool, not std::str")
+    def test_schema_bad_index_03(self):
+        """
+            type Base {
+                property name -> str;
+                index on (.name) {
+                    predicate := .name;
+                }
+            }
+        """
+
     def test_schema_computable_cardinality_inference_01(self):
         schema = self.load_schema("""
             type Object {
@@ -1182,6 +1220,39 @@ _123456789_123456789_123456789 -> str
             )
         )
 
+    def test_schema_callables_generation(self):
+        schema = self.load_schema("""
+            type A;
+            type B extending A;
+            type C;
+        """)
+        gen = schema.get_callables_generation()
+
+        # New types and views derived during query compilation do
+        # not affect the resolution of existing calls.
+        schema = self.run_ddl(schema, '''
+            CREATE TYPE test::D;
+        ''')
+        A = schema.get('test::A')
+        schema, _ = A.derive_subtype(
+            schema,
+            name=s_name.QualName('__derived__', 'A_view'),
+            mark_derived=True,
+            transient=True,
+        )
+        self.assertEqual(schema.get_callables_generation(), gen)
+
+        schema = self.run_ddl(schema, '''
+            ALTER TYPE test::B EXTENDING test::C;
+        ''')
+        self.assertNotEqual(schema.get_callables_generation(), gen)
+        gen = schema.get_callables_generation()
+
+        schema = self.run_ddl(schema, '''
+            CREATE FUNCTION test::f(a: int64) -> int64 USING (a);
+        ''')
+        self.assertNotEqual(schema.get_callables_generation(), gen)
+
 
 class TestGetMigration(tb.BaseSchemaLoadTest):
     """Test migration deparse consistency.
@@ -3463,6 +3534,43 @@ class TestGetMigration(tb.BaseSchemaLoadTest):
             };
         """])
 
+    def test_schema_migrations_equivalence_49(self):
+        # DDL generated for annotations and constraints must only set
+        # the attributes declared by the respective AST nodes.
+        self._assert_migration_equivalence([r"""
+            abstract inheritable annotation anno;
+            abstract constraint max_trimmed(max: std::int64)
+                extending std::max_len_value;
+
+            type Base {
+                annotation anno := 'base';
+                property name -> str {
+                    annotation anno := 'name';
+                    constraint max_trimmed(10) on (str_trim(__subject__));
+                    constraint one_of('a', 'b');
+                }
+            };
+        """, r"""
+            abstract inheritable annotation anno;
+            abstract constraint max_trimmed(max: std::int64)
+                extending std::max_len_value;
+
+            type Base {
+                annotation anno := 'changed';
+                property name -> str {
+                    constraint max_trimmed(20) on (str_trim(__subject__));
+                    constraint one_of('a', 'b', 'c');
+                }
+            };
+
+            type Derived extending Base {
+                overloaded property name -> str {
+                    annotation anno := 'derived';
+                    constraint exclusive on (str_lower(__subject__));
+                }
+            };
+        """])
+
     def test_schema_migrations_equivalence_compound_01(self):
         # Check that union types can be referenced in computables
         # Bug #2002.
@@ -4215,6 +4323,34 @@ class TestGetMigration(tb.BaseSchemaLoadTest):
             }
         """])
 
+    def test_schema_migrations_equivalence_index_06(self):
+        self._assert_migration_equivalence([r"""
+            type Base {
+                property first_name -> str;
+                property archived -> bool;
+                index on (.first_name);
+            }
+        """, r"""
+            type Base {
+                property first_name -> str;
+                property archived -> bool;
+                index on (.first_name) {
+                    # make the index a partial trigram index
+                    kind := 'GiST';
+                    predicate := .archived = false;
+                }
+            }
+        """, r"""
+            type Base {
+                property first_name -> str;
+                property archived -> bool;
+                index on (.first_name) {
+                    # include a property instead
+                    include := .archived;
+                }
+            }
+        """])
+
     def test_schema_migrations_equivalence_constraint_01(self):
         self._assert_migration_equivalence([r"""
             type Base {
@@ -17,6 +17,7 @@
 #
 
 
+from edb import edgeql
 from edb.testbase import lang as tb
 from edb.server import compiler as edbcompiler
 
@@ -50,3 +51,78 @@ class TestServerCompiler(tb.BaseSchemaLoadTest):
                 }
             ''',
         )
+
+    def test_server_compiler_compile_phases(self):
+        compiler = tb.new_compiler()
+        context = edbcompiler.new_compiler_context(
+            modaliases={None: 'test'},
+            schema=self.schema,
+            single_statement=True,
+        )
+
+        units = compiler._compile(
+            ctx=context,
+            source=edgeql.Source.from_string('SELECT Foo { bar }'),
+        )
+
+        self.assertEqual(len(units), 1)
+        phases = units[0].compile_phases
+        self.assertEqual(
+            set(phases),
+            {'parse', 'ql_to_ir', 'inference', 'ir_to_sql', 'codegen',
+             'descriptors', 'other'},
+        )
+        self.assertTrue(all(t >= 0 for t in phases.values()))
+
+    def test_server_compiler_migration_round_trips(self):
+        compiler = tb.new_compiler()
+        context = edbcompiler.new_compiler_context(
+            modaliases={None: 'test'},
+            schema=self.schema,
+        )
+
+        units = compiler._compile(
+            ctx=context,
+            source=edgeql.Source.from_string('''
+                START MIGRATION TO {
+                    module test {
+                        type Foo {
+                            property bar -> str;
+                        };
+                        type Spam {
+                            link foo -> Foo;
+                        };
+                    };
+                };
+                POPULATE MIGRATION;
+                CREATE TYPE test::Ham;
+                DROP TYPE test::Ham;
+                COMMIT MIGRATION;
+            '''),
+        )
+
+        # Statements inside of a migration block are not sent to
+        # the backend, only START (the transaction) and COMMIT
+        # (the DDL of the whole block and the transaction) are.
+        self.assertEqual(
+            sum(unit.backend_round_trips for unit in units), 2)
+
+    def test_server_compiler_batch_reflection_writes(self):
+        a = {'name': '"a"'}
+        b = {'name': '"b"'}
+        blocks = [
+            ('INSERT X', a),
+            ('INSERT X', b),
+            ('UPDATE Y', a),
+            ('UPDATE Y', a),
+            ('INSERT X', a),
+        ]
+
+        self.assertEqual(
+            list(edbcompiler.compiler._batch_reflection_writes(blocks)),
+            [
+                ('INSERT X', [a, b]),
+                ('UPDATE Y', [a]),
+                ('INSERT X', [a]),
+            ],
+        )
@@ -349,6 +349,33 @@ class TestServerConfigUtils(unittest.TestCase):
             }
         )
 
+    def test_server_config_06(self):
+        enumspec = spec.Spec(
+            spec.Setting(
+                'mode',
+                type=str,
+                default='a',
+                enum_values=('a', 'b')),
+        )
+
+        storage = immutables.Map()
+        op = ops.Operation(
+            ops.OpCode.CONFIG_SET,
+            config.ConfigScope.SESSION,
+            'mode',
+            'b')
+        storage = op.apply(enumspec, storage)
+        self.assertEqual(config.lookup('mode', storage, spec=enumspec), 'b')
+
+        op = ops.Operation(
+            ops.OpCode.CONFIG_SET,
+            config.ConfigScope.SESSION,
+            'mode',
+            'c')
+        with self.assertRaisesRegex(
+                errors.ConfigurationError, "expected one of 'a', 'b'"):
+            op.apply(enumspec, storage)
+
 
 class TestServerConfig(tb.QueryTestCase, tb.OldCLITestCaseMixin):
 
@@ -889,6 +916,37 @@ class TestServerConfig(tb.QueryTestCase, tb.OldCLITestCaseMixin):
                 CONFIGURE SYSTEM RESET multiprop;
             ''')
 
+    async def test_server_proto_configure_08(self):
+        with self.assertRaisesRegex(
+                edgedb.ConfigurationError,
+                "invalid value 'bogus' for the 'plan_cache_mode' setting"):
+            await self.con.execute('''
+                CONFIGURE SESSION SET plan_cache_mode := 'bogus';
+            ''')
+
+        with self.assertRaisesRegex(
+                edgedb.ConfigurationError,
+                "invalid value 'bogus' for the 'plan_cache_mode' setting"):
+            await self.con.execute('''
+                CONFIGURE SYSTEM SET plan_cache_mode := 'bogus';
+            ''')
+
+        try:
+            await self.con.execute('''
+                CONFIGURE SESSION SET plan_cache_mode := 'force_custom_plan';
+            ''')
+
+            await self.assert_query_result(
+                '''
+                SELECT cfg::Config.plan_cache_mode
+                ''',
+                ['force_custom_plan'],
+            )
+        finally:
+            await self.con.execute('''
+                CONFIGURE SESSION RESET plan_cache_mode;
+            ''')
+
     async def test_server_proto_configure_describe_system_config(self):
         try:
             conf1 = "CONFIGURE SYSTEM SET singleprop := '1337';"
@@ -694,6 +694,34 @@ class TestServerConnectionPool(unittest.TestCase):
 
         asyncio.run(main())
 
+    def test_connpool_prefer(self):
+        # Idle connections accepted by the `prefer` callback must be
+        # handed out ahead of the ones released before them.
+
+        async def test():
+            pool = connpool.Pool(
+                connect=self.make_fake_connect(),
+                disconnect=self.make_fake_disconnect(),
+                max_capacity=5,
+            )
+
+            conns = [await pool.acquire('A') for _ in range(3)]
+            for conn in conns:
+                pool.release('A', conn)
+
+            conn = await pool.acquire('A', prefer=lambda c: c is conns[1])
+            self.assertIs(conn, conns[1])
+            pool.release('A', conn)
+
+            conn = await pool.acquire('A', prefer=lambda c: False)
+            self.assertIsNot(conn, conns[1])
+            pool.release('A', conn)
+
+        async def main():
+            await asyncio.wait_for(test(), timeout=5)
+
+        asyncio.run(main())
+
 
 HTML_TPL = R'''<!DOCTYPE html>
 <html>
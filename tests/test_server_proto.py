@@ -1935,6 +1935,141 @@ class TestServerProto(tb.QueryTestCase):
             self.assertEqual(
                 result, "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
 
+    async def test_server_proto_tx_20(self):
+        # Large scripts executed in a transaction block are compiled
+        # and executed in batches, make sure the statements of later
+        # batches see the effects of the earlier ones.
+        typename = f'test_{uuid.uuid4().hex}'
+        padding = 'x' * 100
+        inserts = ''.join(
+            f"INSERT {typename} {{ name := '{i}_{padding}' }};\n"
+            for i in range(2500)
+        )
+
+        async with self.con.transaction():
+            await self.con.execute(f'''
+                CREATE TYPE {typename} {{
+                    CREATE PROPERTY name -> str;
+                }};
+                {inserts}
+                ALTER TYPE {typename} {{
+                    CREATE PROPERTY extra -> str;
+                }};
+                {inserts}
+                UPDATE {typename} SET {{ extra := .name }};
+            ''')
+
+            self.assertEqual(
+                await self.con.query_one(f'''
+                    SELECT count({typename} FILTER .extra = .name)
+                '''),
+                5000)
+
+    async def test_server_proto_tx_21(self):
+        # A failure in a later batch of a large script aborts the
+        # whole transaction.
+        padding = 'x' * 100
+        inserts = ''.join(
+            f"INSERT test::TransactionTest {{ name := 'tx_21_{padding}' }};\n"
+            for i in range(2500)
+        )
+
+        with self.assertRaises(edgedb.DivisionByZeroError):
+            async with self.con.transaction():
+                await self.con.execute(f'''
+                    {inserts}
+                    SELECT 1 / 0;
+                ''')
+
+        self.assertEqual(
+            await self.con.query_one(f'''
+                SELECT count(
+                    test::TransactionTest
+                    FILTER .name = 'tx_21_{padding}'
+                )
+            '''),
+            0)
+
+    async def test_server_proto_tx_22(self):
+        # The next batch of a large script is compiled while the
+        # current one is executed.  When the current batch fails, the
+        # error must be interpreted in the schema of the failed batch,
+        # not in the one of the batch compiled ahead.
+        typename = f'test_{uuid.uuid4().hex}'
+        padding = 'x' * 100
+
+        def inserts(prefix):
+            return ''.join(
+                f"INSERT {typename} {{ name := '{prefix}_{i}_{padding}' }};\n"
+                for i in range(1000)
+            )
+
+        with self.assertRaises(edgedb.ConstraintViolationError):
+            async with self.con.transaction():
+                await self.con.execute(f'''
+                    CREATE TYPE {typename} {{
+                        CREATE PROPERTY name -> str {{
+                            CREATE CONSTRAINT exclusive;
+                        }};
+                    }};
+                    INSERT {typename} {{ name := 'dup' }};
+                    INSERT {typename} {{ name := 'dup' }};
+                    {inserts('a')}
+                    ALTER TYPE {typename} {{
+                        ALTER PROPERTY name {{
+                            DROP CONSTRAINT exclusive;
+                        }};
+                    }};
+                    {inserts('b')}
+                ''')
+
+    async def test_server_proto_tx_23(self):
+        # A syntax error in the first batch of a large script must be
+        # reported as is.
+        padding = 'x' * 100
+        inserts = ''.join(
+            f"INSERT test::TransactionTest {{ name := 'tx_23_{padding}' }};\n"
+            for i in range(2500)
+        )
+
+        with self.assertRaises(edgedb.EdgeQLSyntaxError):
+            async with self.con.transaction():
+                await self.con.execute(f'''
+                    SELECT 1 +;
+                    {inserts}
+                ''')
+
+        self.assertEqual(await self.con.query_one('SELECT 42'), 42)
+
+    async def test_server_proto_tx_24(self):
+        # A syntax error in a later batch of a large script is found
+        # while the previous batch is executed, it aborts the whole
+        # transaction.
+        padding = 'x' * 100
+        inserts = ''.join(
+            f"INSERT test::TransactionTest {{ name := 'tx_24_{padding}' }};\n"
+            for i in range(2500)
+        )
+
+        for _ in range(2):
+            # The second run makes sure that no stale compiler state
+            # is left behind by the first one.
+            with self.assertRaises(edgedb.EdgeQLSyntaxError):
+                async with self.con.transaction():
+                    await self.con.execute(f'''
+                        {inserts}
+                        SELECT 1 +;
+                    ''')
+
+        self.assertEqual(
+            await self.con.query_one(f'''
+                SELECT count(
+                    test::TransactionTest
+                    FILTER .name = 'tx_24_{padding}'
+                )
+            '''),
+            0)
+
 
 class TestServerProtoMigration(tb.QueryTestCase):
 